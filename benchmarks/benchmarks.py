@@ -0,0 +1,300 @@
+"""Benchmarks of the point, route and stop detection hot paths, written in the style of airspeed velocity (asv): every
+class is a parametrized benchmark suite, setup prepares the inputs outside of the timing and every time_* method is
+timed. They can be run with asv or with benchmarks/run.py, which needs no further dependencies.
+
+The trace sizes default to 1e3, 1e4 and 1e5 fixes and can be changed with the environment variable
+GEODETECTION_BENCHMARK_SIZES, e.g. GEODETECTION_BENCHMARK_SIZES=1000,10000000. Benchmarks on lists of Point objects
+are skipped above ROUTE_MAX_SIZE fixes and dense distance matrices above MATRIX_MAX_SIZE stays, which would not fit into
+memory on most machines.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generators import GENERATORS, stay_centroids
+from geoDetection import distance_matrix as dm
+from geoDetection import point as pt
+from geoDetection import stop_detection as sd
+from geoDetection.point_t import PointT
+from geoDetection.route import Route
+from geoDetection.trajectory import Trajectory
+from geoDetection.trajectory_store import TrajectoryStore
+
+SIZES = [int(float(size)) for size in os.environ.get('GEODETECTION_BENCHMARK_SIZES', '1e3,1e4,1e5').split(',')]
+ROUTE_MAX_SIZE = 1_000_000
+# the dense distance matrix of more stays would not fit into memory
+MATRIX_MAX_SIZE = 10_000
+TIME_THRESHOLD = pd.Timedelta('10min')
+DISTANCE_THRESHOLD = 100
+
+_TRACES = {}
+
+
+def _get_trajectory(n, trace):
+    """
+    Returns the trace, generating each trace only once per process.
+    """
+    key = (n, trace)
+    if key not in _TRACES:
+        _TRACES[key] = GENERATORS[trace](n)
+    return _TRACES[key]
+
+
+class _TraceBenchmark:
+    params = (SIZES, list(GENERATORS))
+    param_names = ['n', 'trace']
+    timeout = 3_600
+
+    def setup(self, n, trace):
+        self.trajectory = _get_trajectory(n, trace)
+
+    def _setup_route(self, n):
+        if n > ROUTE_MAX_SIZE:
+            raise NotImplementedError("Routes of this size do not fit into memory.")
+        self.route = self.trajectory.to_route()
+
+
+class PointOperations(_TraceBenchmark):
+    """Creating points and measuring distances one point at a time."""
+
+    def setup(self, n, trace):
+        super().setup(n, trace)
+        self._setup_route(n)
+        self.coordinates = self.trajectory.x_lon.tolist(), self.trajectory.y_lat.tolist()
+        self.timestamps = self.trajectory.get_timestamps()
+
+    def time_point_init(self, n, trace):
+        for x_lon, y_lat, timestamp in zip(*self.coordinates, self.timestamps):
+            PointT([x_lon, y_lat], timestamp)
+
+    def time_get_distance(self, n, trace):
+        route = self.route
+        for i in range(len(route) - 1):
+            pt.get_distance(route[i], route[i + 1])
+
+
+class RouteConstruction(_TraceBenchmark):
+    """Building routes and trajectories."""
+
+    def setup(self, n, trace):
+        super().setup(n, trace)
+        self._setup_route(n)
+        self.points = list(self.route)
+
+    def time_route_init(self, n, trace):
+        Route(self.points)
+
+    def time_route_append(self, n, trace):
+        route = Route()
+        for point in self.points:
+            route.append(point)
+
+    def time_route_from_trajectory(self, n, trace):
+        Route.from_trajectory(self.trajectory)
+
+    def time_trajectory_from_route(self, n, trace):
+        Trajectory.from_route(self.route)
+
+
+class Conversion(_TraceBenchmark):
+    """Unit and projection conversions of routes and trajectories."""
+
+    def setup(self, n, trace):
+        super().setup(n, trace)
+        self._setup_route(n)
+
+    def time_route_to_degrees(self, n, trace):
+        self.route.to_degrees()
+
+    def time_route_to_cartesian(self, n, trace):
+        self.route.to_cartesian()
+
+    def time_trajectory_to_degrees(self, n, trace):
+        self.trajectory.to_degrees()
+
+    def time_trajectory_to_cartesian(self, n, trace):
+        self.trajectory.to_cartesian()
+
+
+class Copy(_TraceBenchmark):
+    """Deep copies of routes and trajectories."""
+
+    def setup(self, n, trace):
+        super().setup(n, trace)
+        self._setup_route(n)
+
+    def time_route_deep_copy(self, n, trace):
+        self.route.deep_copy()
+
+    def time_trajectory_deep_copy(self, n, trace):
+        self.trajectory.deep_copy()
+
+
+class Speed(_TraceBenchmark):
+    """Maximum speed and segment kinematics of routes and trajectories."""
+
+    def setup(self, n, trace):
+        super().setup(n, trace)
+        self._setup_route(n)
+        self.interval = pd.Timedelta('30s')
+
+    def time_route_max_speed(self, n, trace):
+        self.route.max_speed(self.interval)
+
+    def time_trajectory_max_speed(self, n, trace):
+        self.trajectory.max_speed(self.interval)
+
+    def time_route_kinematics(self, n, trace):
+        self.route.get_kinematics()
+
+    def time_trajectory_kinematics(self, n, trace):
+        self.trajectory.get_kinematics()
+
+
+class Centroid(_TraceBenchmark):
+    """The centroid of a whole route and the centroids of groups of 100 consecutive fixes."""
+
+    def setup(self, n, trace):
+        super().setup(n, trace)
+        self._setup_route(n)
+        self.labels = np.arange(n) // 100
+
+    def time_calculate_centroid(self, n, trace):
+        sd.calculate_centroid(self.route)
+
+    def time_calculate_centroids(self, n, trace):
+        sd.calculate_centroids(self.trajectory.x_lon, self.trajectory.y_lat, self.trajectory.timestamps, self.labels)
+
+    def time_calculate_centroids_spherical(self, n, trace):
+        sd.calculate_centroids(self.trajectory.x_lon, self.trajectory.y_lat, self.trajectory.timestamps, self.labels,
+                               method='spherical')
+
+
+class StopDetection(_TraceBenchmark):
+    """Both phases of extract_pois, on their own and combined."""
+
+    def setup(self, n, trace):
+        super().setup(n, trace)
+        self.stays = sd.extract_stays(self.trajectory, TIME_THRESHOLD, DISTANCE_THRESHOLD)
+        self.centroids = sd.get_stay_centroids(self.trajectory, self.stays)
+
+    def time_extract_stays(self, n, trace):
+        sd.extract_stays(self.trajectory, TIME_THRESHOLD, DISTANCE_THRESHOLD)
+
+    def time_stay_centroids(self, n, trace):
+        sd.get_stay_centroids(self.trajectory, self.stays)
+
+    def time_aggregate_stays(self, n, trace):
+        sd.aggregate_stays(self.centroids, DISTANCE_THRESHOLD)
+
+    def time_extract_pois(self, n, trace):
+        sd.extract_pois(self.trajectory, TIME_THRESHOLD, DISTANCE_THRESHOLD)
+
+    def time_extract_pois_chunked(self, n, trace):
+        sd.extract_pois_chunked(sd.iter_time_chunks(self.trajectory, pd.Timedelta('1D')), TIME_THRESHOLD,
+                                DISTANCE_THRESHOLD)
+
+    def track_stays(self, n, trace):
+        return len(self.stays)
+
+    track_stays.unit = 'stays'
+
+
+class StopDetectionMethods(_TraceBenchmark):
+    """Phase 1 of extract_pois with the approximate distance methods."""
+    params = (SIZES, list(GENERATORS), ['equirectangular', 'local'])
+    param_names = ['n', 'trace', 'distance_method']
+
+    def setup(self, n, trace, distance_method):
+        super().setup(n, trace)
+
+    def time_extract_stays(self, n, trace, distance_method):
+        sd.extract_stays(self.trajectory, TIME_THRESHOLD, DISTANCE_THRESHOLD, distance_method)
+
+
+class Aggregation:
+    """Phase 2 of extract_pois with the aggregation backends, on sets of stays."""
+    params = (SIZES, list(sd.AGGREGATION_METHODS), [1, 3])
+    param_names = ['n', 'aggregation_method', 'min_points']
+    timeout = 3_600
+
+    def setup(self, n, aggregation_method, min_points):
+        self.stays = stay_centroids(n)
+
+    def time_aggregate_stays(self, n, aggregation_method, min_points):
+        sd.aggregate_stays(self.stays, DISTANCE_THRESHOLD, min_points, aggregation_method=aggregation_method)
+
+    def track_clusters(self, n, aggregation_method, min_points):
+        return len(sd.aggregate_stays(self.stays, DISTANCE_THRESHOLD, min_points,
+                                      aggregation_method=aggregation_method))
+
+    track_clusters.unit = 'clusters'
+
+
+class Simplification(_TraceBenchmark):
+    """Simplifying trajectories before the stop detection."""
+
+    def time_douglas_peucker(self, n, trace):
+        self.trajectory.simplify(10)
+
+    def time_douglas_peucker_synchronized(self, n, trace):
+        self.trajectory.simplify(10, synchronized=True)
+
+    def time_resample(self, n, trace):
+        self.trajectory.resample(pd.Timedelta('30s'))
+
+    def time_collapse_stationary(self, n, trace):
+        self.trajectory.collapse_stationary(DISTANCE_THRESHOLD / 4)
+
+
+class Store(_TraceBenchmark):
+    """Writing trajectories into a TrajectoryStore and reading time ranges from it."""
+
+    def setup(self, n, trace):
+        super().setup(n, trace)
+        # the directory is removed when the benchmark object is garbage collected
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = TrajectoryStore.write(self.directory.name, {'user': self.trajectory})
+        timestamps = self.trajectory.timestamps
+        self.start, self.end = pd.Timestamp(timestamps[n // 4]), pd.Timestamp(timestamps[n // 2])
+
+    def time_write(self, n, trace):
+        TrajectoryStore.write(os.path.join(self.directory.name, 'written'), {'user': self.trajectory})
+
+    def time_get_range(self, n, trace):
+        self.store.get('user', self.start, self.end)
+
+    def time_sum_range(self, n, trace):
+        trajectory = self.store.get('user', self.start, self.end)
+        trajectory.x_lon.sum() + trajectory.y_lat.sum()
+
+
+
+class DistanceMatrix:
+    """Dense distance matrices of sets of stays."""
+    params = (SIZES, [1, None])
+    param_names = ['n', 'max_workers']
+    timeout = 3_600
+
+    def setup(self, n, max_workers):
+        if n > MATRIX_MAX_SIZE:
+            raise NotImplementedError("Distance matrices of this size do not fit into memory.")
+        self.stays = stay_centroids(n)
+
+    def time_get_distance_matrix(self, n, max_workers):
+        dm.get_distance_matrix(self.stays, max_workers=max_workers)
+
+
+class PairsWithin:
+    """The sparse pairs of stays within the distance threshold."""
+    params = (SIZES, [1, None])
+    param_names = ['n', 'max_workers']
+    timeout = 3_600
+
+    def setup(self, n, max_workers):
+        self.stays = stay_centroids(n)
+
+    def time_get_pairs_within(self, n, max_workers):
+        dm.get_pairs_within(self.stays, DISTANCE_THRESHOLD, max_workers=max_workers)
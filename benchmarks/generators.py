@@ -0,0 +1,177 @@
+"""Synthetic GPS traces for the benchmarks. All generators are vectorized, so traces of 1e7 fixes can be generated in a
+few seconds, and deterministic for a given seed, so benchmark results of different commits are comparable.
+
+Every generator returns a Trajectory in 'latlon' format and 'radians' unit with timestamps.
+"""
+import numpy as np
+
+from geoDetection import point_vector as pv
+from geoDetection.trajectory import Trajectory
+
+ORIGIN = (13.40, 52.52)     # longitude and latitude in degrees, Berlin
+START = np.datetime64('2021-01-04T00:00:00', 'ns')     # a Monday
+_NS_PER_SECOND = 1_000_000_000
+_SECONDS_PER_DAY = 86_400
+
+
+def _to_trajectory(east, north, seconds, origin):
+    """
+    Converts local coordinates in meters around origin and seconds since START into a Trajectory.
+    """
+    lon_0, lat_0 = np.radians(origin)
+    x_lon = lon_0 + east / (pv.HAVERSINE_EARTH_RADIUS * np.cos(lat_0))
+    y_lat = lat_0 + north / pv.HAVERSINE_EARTH_RADIUS
+    timestamps = START.view(np.int64) + np.round(seconds * _NS_PER_SECOND).astype(np.int64)
+    return Trajectory(x_lon, y_lat, timestamps)
+
+
+def _moves_and_dwells(n, rng, move_points, dwell_points, move_interval, dwell_interval, speed, noise, axis_aligned):
+    """
+    Generates n fixes alternating between moves and dwells. Returns east and north in meters and seconds.
+    """
+    # alternate move and dwell segments until n fixes are covered
+    n_segments = 2 * (n // (move_points[0] + dwell_points[0]) + 1)
+    lengths = np.where(np.arange(n_segments) % 2 == 0, rng.integers(*move_points, n_segments),
+                       rng.integers(*dwell_points, n_segments))
+    n_segments = int(np.searchsorted(np.cumsum(lengths), n)) + 1
+    is_dwell = np.repeat(np.arange(n_segments) % 2 == 1, lengths[:n_segments])[:n]
+
+    intervals = np.where(is_dwell, rng.uniform(*dwell_interval, n), rng.uniform(*move_interval, n))
+    if axis_aligned:
+        # streets of a grid: every move follows one of four directions
+        headings = np.repeat(rng.integers(0, 4, n_segments) * np.pi / 2, lengths[:n_segments])[:n]
+    else:
+        headings = np.cumsum(rng.normal(0, 0.3, n))
+    steps = np.where(is_dwell, 0.0, rng.uniform(*speed, n) * intervals)
+    east = np.cumsum(steps * np.cos(headings)) + rng.normal(0, noise, n)
+    north = np.cumsum(steps * np.sin(headings)) + rng.normal(0, noise, n)
+    return east, north, np.cumsum(intervals)
+
+
+def random_walk(n, seed=0, origin=ORIGIN):
+    """
+    A random walk with dwell periods: moves of 20 - 200 fixes at 1 - 15 m/s alternate with dwells of 30 - 300 fixes,
+    with 10 m of GPS noise and sampling intervals of 5 - 30 s while moving and 30 - 60 s while dwelling.
+
+    Parameters
+    ----------
+    n : int
+        The number of fixes.
+    seed : int
+        The seed of the random number generator.
+    origin : tuple
+        The start point as (longitude, latitude) in degrees.
+
+    Returns
+    -------
+    Trajectory
+        The trace.
+    """
+    rng = np.random.default_rng(seed)
+    east, north, seconds = _moves_and_dwells(n, rng, (20, 200), (30, 300), (5, 30), (30, 60), (1, 15), 10, False)
+    return _to_trajectory(east, north, seconds, origin)
+
+
+def commuting(n, seed=0, origin=ORIGIN, interval=60):
+    """
+    A daily commute sampled every interval seconds: on weekdays home until about 8:00, work until about 17:00, on
+    weekends home with an afternoon trip to a leisure place. Trips take about 30 minutes, leave times vary by an hour,
+    fixes have 15 m of GPS noise.
+
+    Parameters
+    ----------
+    n : int
+        The number of fixes.
+    seed : int
+        The seed of the random number generator.
+    origin : tuple
+        The home as (longitude, latitude) in degrees.
+    interval : float
+        The sampling interval in seconds.
+
+    Returns
+    -------
+    Trajectory
+        The trace.
+    """
+    rng = np.random.default_rng(seed)
+    places = np.array([[0.0, 0.0], [6_000.0, 2_500.0], [-3_000.0, 4_000.0]])     # home, work, leisure
+    seconds = np.arange(n) * float(interval)
+    days = (seconds // _SECONDS_PER_DAY).astype(np.int64)
+    time_of_day = seconds - days * _SECONDS_PER_DAY
+    n_days = int(days[-1]) + 1 if n > 0 else 0
+    weekend = np.arange(n_days) % 7 >= 5
+    hour = 3_600.0
+    # leave home, arrive, leave the destination and arrive at home again, per day
+    leave = np.where(weekend, 14 * hour, 8 * hour) + rng.uniform(-0.5, 0.5, n_days) * hour
+    trip = rng.uniform(0.4, 0.6, n_days) * hour
+    stay = np.where(weekend, 3 * hour, 9 * hour) + rng.uniform(-0.5, 0.5, n_days) * hour
+    times = np.stack([leave, leave + trip, leave + trip + stay, leave + 2 * trip + stay], axis=1)[days]
+    destination = places[np.where(weekend, 2, 1)][days]
+    # progress from home (0) to the destination (1) along a straight line
+    progress = np.clip(np.minimum((time_of_day - times[:, 0]) / (times[:, 1] - times[:, 0]),
+                                  (times[:, 3] - time_of_day) / (times[:, 3] - times[:, 2])), 0, 1)
+    east = places[0, 0] + progress * (destination[:, 0] - places[0, 0]) + rng.normal(0, 15, n)
+    north = places[0, 1] + progress * (destination[:, 1] - places[0, 1]) + rng.normal(0, 15, n)
+    return _to_trajectory(east, north, seconds, origin)
+
+
+def dense_urban(n, seed=0, origin=ORIGIN):
+    """
+    A dense urban trace sampled every second: walks and drives along a street grid at 1 - 12 m/s, short stops of
+    30 - 1800 fixes at traffic lights, shops and offices, 8 m of GPS noise and 0.1 % multipath outliers of up to
+    300 m.
+
+    Parameters
+    ----------
+    n : int
+        The number of fixes.
+    seed : int
+        The seed of the random number generator.
+    origin : tuple
+        The start point as (longitude, latitude) in degrees.
+
+    Returns
+    -------
+    Trajectory
+        The trace.
+    """
+    rng = np.random.default_rng(seed)
+    east, north, seconds = _moves_and_dwells(n, rng, (30, 300), (30, 1800), (1, 1), (1, 1), (1, 12), 8, True)
+    outliers = rng.random(n) < 0.001
+    east[outliers] += rng.uniform(-300, 300, outliers.sum())
+    north[outliers] += rng.uniform(-300, 300, outliers.sum())
+    return _to_trajectory(east, north, seconds, origin)
+
+
+def stay_centroids(n, seed=0, origin=ORIGIN, places=None, extent=50_000):
+    """
+    Centroids of n stays at places spread uniformly over a square of extent meters, with 40 m of scatter around their
+    place, as input to the aggregation phase of extract_pois. Timestamps are one hour apart.
+
+    Parameters
+    ----------
+    n : int
+        The number of stays.
+    seed : int
+        The seed of the random number generator.
+    origin : tuple
+        The south west corner of the square as (longitude, latitude) in degrees.
+    places : int, optional
+        The number of places. Defaults to one place per 10 stays.
+    extent : float
+        The side length of the square in meters.
+
+    Returns
+    -------
+    Trajectory
+        The stays.
+    """
+    rng = np.random.default_rng(seed)
+    places = rng.uniform(0, extent, (max(1, n // 10) if places is None else places, 2))
+    visited = places[rng.integers(0, len(places), n)]
+    return _to_trajectory(visited[:, 0] + rng.normal(0, 40, n), visited[:, 1] + rng.normal(0, 40, n),
+                          np.arange(n) * 3_600.0, origin)
+
+
+GENERATORS = {'random_walk': random_walk, 'commuting': commuting, 'dense_urban': dense_urban}
@@ -0,0 +1,169 @@
+"""Runs the benchmarks of benchmarks/benchmarks.py without asv and stores the results as JSON, one file per commit, so
+they can be compared across commits.
+
+Usage, from the repository root:
+    python -m benchmarks.run                                  # run all, store in benchmarks/results/<commit>.json
+    python -m benchmarks.run --filter StopDetection --repeat 3
+    python -m benchmarks.run --compare benchmarks/results/<other commit>.json
+"""
+import argparse
+import inspect
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import benchmarks
+
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+# a timed call is repeated until a sample takes at least this long, to measure fast benchmarks precisely
+MIN_SAMPLE_DURATION_S = 0.1
+
+
+def get_commit():
+    """
+    Returns the abbreviated hash of the checked out commit, marked as dirty if there are uncommitted changes.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + '-dirty' if dirty else commit
+
+
+def get_suites(pattern=None):
+    """
+    Returns the benchmark suites as (name, class, benchmark method names), keeping only benchmarks whose
+    'Class.method' name contains pattern.
+    """
+    suites = []
+    for name, suite in inspect.getmembers(benchmarks, inspect.isclass):
+        if name.startswith('_') or suite.__module__ != benchmarks.__name__:
+            continue
+        methods = [method for method in dir(suite) if method.startswith(('time_', 'track_')) and
+                   (pattern is None or pattern in f"{name}.{method}")]
+        if methods:
+            suites.append((name, suite, methods))
+    return suites
+
+
+def time_benchmark(function, params, repeat):
+    """
+    Times function(*params) and returns the durations of repeat samples in seconds per call.
+    """
+    start = time.perf_counter()
+    function(*params)
+    duration = time.perf_counter() - start
+    number = max(1, int(MIN_SAMPLE_DURATION_S / duration)) if duration > 0 else 1000
+    samples = [duration] if number == 1 else []
+    while len(samples) < repeat:
+        start = time.perf_counter()
+        for _ in range(number):
+            function(*params)
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def run(pattern=None, repeat=5, verbose=True):
+    """
+    Runs all benchmarks matching pattern.
+
+    Returns
+    -------
+    results : dict
+        The results by benchmark name, e.g. 'StopDetection.time_extract_stays(n=1000, trace=commuting)', holding the
+        minimal and median duration in seconds and the samples, or the value of track_* benchmarks.
+    """
+    results = {}
+    for name, suite, methods in get_suites(pattern):
+        for params in itertools.product(*suite.params):
+            label = ', '.join(f"{param_name}={param}" for param_name, param in zip(suite.param_names, params))
+            instance = suite()
+            try:
+                instance.setup(*params)
+            except NotImplementedError:
+                if verbose:
+                    print(f"{name}({label}): skipped")
+                continue
+            for method in methods:
+                key = f"{name}.{method}({label})"
+                function = getattr(instance, method)
+                if method.startswith('track_'):
+                    results[key] = {'value': function(*params), 'unit': getattr(function, 'unit', None)}
+                    message = f"{results[key]['value']} {results[key]['unit'] or ''}"
+                else:
+                    samples = time_benchmark(function, params, repeat)
+                    results[key] = {'min': min(samples), 'median': statistics.median(samples), 'samples': samples}
+                    message = f"{results[key]['min'] * 1e3:.3f} ms"
+                if verbose:
+                    print(f"{key}: {message}", flush=True)
+    return results
+
+
+def save(results, path=None):
+    """
+    Stores results with the commit and the environment they were measured in and returns the path of the file.
+    """
+    commit = get_commit()
+    if path is None:
+        os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+        path = os.path.join(RESULTS_DIRECTORY, f"{commit}.json")
+    document = {'commit': commit, 'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version,
+                'numpy': np.__version__, 'machine': platform.platform(), 'processor': platform.processor(),
+                'results': results}
+    with open(path, 'w') as file:
+        json.dump(document, file, indent=1)
+    return path
+
+
+def compare(results, baseline_path, threshold=1.1):
+    """
+    Prints the ratio of the minimal durations of results and of the stored baseline and returns the names of the
+    benchmarks that got slower than threshold times the baseline.
+    """
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    print(f"compared to {baseline['commit']} ({baseline['date']}):")
+    regressions = []
+    for key, result in results.items():
+        before = baseline['results'].get(key)
+        if before is None or 'min' not in result or 'min' not in before:
+            continue
+        ratio = result['min'] / before['min']
+        marker = ''
+        if ratio > threshold:
+            marker = '  slower'
+            regressions.append(key)
+        elif ratio < 1 / threshold:
+            marker = '  faster'
+        print(f"{ratio:7.2f}x  {key}{marker}")
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Runs the geoDetection benchmarks.")
+    parser.add_argument('--filter', help="only run benchmarks whose 'Class.method' name contains this string")
+    parser.add_argument('--repeat', type=int, default=5, help="number of samples per benchmark")
+    parser.add_argument('--output', help="path of the results file, defaults to benchmarks/results/<commit>.json")
+    parser.add_argument('--compare', help="path of a results file to compare with")
+    parser.add_argument('--threshold', type=float, default=1.1,
+                        help="ratio above which a benchmark counts as regression when comparing")
+    arguments = parser.parse_args(arguments)
+    results = run(arguments.filter, arguments.repeat)
+    print(f"results stored in {save(results, arguments.output)}")
+    if arguments.compare and compare(results, arguments.compare, arguments.threshold):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
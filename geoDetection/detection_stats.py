@@ -0,0 +1,116 @@
+"""Provides counters and phase timers to instrument the stop detection.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class DetectionStats:
+    """Counters and timers of one or more runs of the stop detection. A DetectionStats object is passed as stats to
+    extract_pois (or to extract_stays and aggregate_stays), which add their counts and the durations of their phases.
+    Counts of several runs add up, so a fresh object is needed for the numbers of a single run.
+
+    The counters are:
+        points: the route points processed in phase 1.
+        distance_evaluations: the point distances computed in vectorized passes, i.e. those not decided by the
+            bounding box of the candidate stay or, in phase 2, by the grid index.
+        exact_evaluations: the distances close to the threshold, which were computed again with point.get_distance.
+        cache_hits, cache_misses: the lookups of the DistanceCache of the candidate stay.
+        stays_opened: the candidate stays started by a point arriving at an empty candidate stay.
+        stays_closed: the candidate stays that lasted long enough and became stays.
+        points_evicted: the points dropped from the front of a candidate stay that did not last long enough.
+        neighbour_pairs: the pairs of stays within the merge distance in phase 2.
+        cluster_merges: the merges of two clusters into one in phase 2.
+        pois: the places of interest found.
+
+    Without a DetectionStats object, the stop detection only keeps a few local counters, so instrumentation that is
+    switched off costs nothing measurable.
+    """
+    COUNTERS = ('points', 'distance_evaluations', 'exact_evaluations', 'cache_hits', 'cache_misses', 'stays_opened',
+                'stays_closed', 'points_evicted', 'neighbour_pairs', 'cluster_merges', 'pois')
+
+    def __init__(self, callback=None, log_level=logging.DEBUG):
+        """
+        Creates a new DetectionStats object with all counters and timers at zero.
+
+        Parameters
+        ----------
+        callback : callable, optional
+            Called with the result of get_stats whenever a run is reported, e.g. to feed a metrics pipeline.
+        log_level : int
+            The level at which reports are logged to the 'geoDetection.detection_stats' logger.
+        """
+        self.callback = callback
+        self.log_level = log_level
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.timings = {}
+
+    def add(self, **counts):
+        """
+        Increases counters.
+
+        Parameters
+        ----------
+        counts : int
+            The increments by counter name.
+        """
+        counters = self.counters
+        for name, count in counts.items():
+            if name not in counters:
+                raise ValueError(f"Unknown counter {name}, the counters are {self.COUNTERS}.")
+            counters[name] += count
+
+    @contextmanager
+    def timer(self, phase):
+        """
+        Returns a context manager adding the time spent in its body to the duration of phase.
+
+        Parameters
+        ----------
+        phase : str
+            The name of the phase, e.g. 'extract_stays'.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0.0) + time.perf_counter() - start
+
+    def reset(self):
+        """
+        Sets all counters and timers to zero.
+        """
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.timings = {}
+
+    def get_stats(self):
+        """
+        Returns the counters and timers.
+
+        Returns
+        -------
+        stats : dict
+            The counters by name and the durations of the phases in seconds under 'timings'.
+        """
+        stats = dict(self.counters)
+        stats['timings'] = dict(self.timings)
+        return stats
+
+    def report(self, name='extract_pois'):
+        """
+        Logs the counters and timers and passes them to the callback.
+
+        Parameters
+        ----------
+        name : str
+            The name of the run, which prefixes the log message.
+        """
+        stats = self.get_stats()
+        if logger.isEnabledFor(self.log_level):
+            counters = ', '.join(f"{counter}={count}" for counter, count in self.counters.items())
+            timings = ', '.join(f"{phase}={duration:.6f}s" for phase, duration in self.timings.items())
+            logger.log(self.log_level, "%s: %s; %s", name, counters, timings)
+        if self.callback is not None:
+            self.callback(stats)
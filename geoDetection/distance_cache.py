@@ -0,0 +1,97 @@
+"""Provides a bounded memo for distance computations keyed by point indices.
+"""
+from collections import OrderedDict
+
+
+class DistanceCache:
+    """A mapping from point indices (or pairs of them) to computed distances, holding at most maxsize entries. When it
+    is full, the least recently used entry is evicted. Pairs are stored order-independently, i.e. the distance a -> b
+    is found when b -> a is looked up. Hits and misses are counted to tune maxsize.
+    """
+
+    def __init__(self, maxsize=128):
+        """
+        Creates a new, empty DistanceCache.
+
+        Parameters
+        ----------
+        maxsize : int
+            The maximal number of entries. A maxsize of 0 disables caching.
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize may not be negative.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def _key(key):
+        if isinstance(key, tuple) and len(key) == 2 and key[1] < key[0]:
+            return key[1], key[0]
+        return key
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self._key(key) in self._entries
+
+    def get(self, key):
+        """
+        Returns the cached value of key and marks it as recently used.
+
+        Parameters
+        ----------
+        key : int or tuple
+            A point index or a pair of point indices.
+
+        Returns
+        -------
+        object
+            The cached value or None, if key is not cached.
+        """
+        key = self._key(key)
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+        Caches value for key, evicting the least recently used entry if the cache is full.
+
+        Parameters
+        ----------
+        key : int or tuple
+            A point index or a pair of point indices.
+        value : object
+            The distance or distances to cache.
+        """
+        if self.maxsize == 0:
+            return
+        key = self._key(key)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all entries. The counters are kept.
+        """
+        self._entries.clear()
+
+    def get_stats(self):
+        """
+        Returns the counters of this cache.
+
+        Returns
+        -------
+        stats : dict
+            The number of hits and misses, the current size and maxsize.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
@@ -0,0 +1,196 @@
+"""Provides the distances between all pairs of many points, as a dense distance matrix or as the sparse set of pairs
+within a radius. Both are computed in tiles of a few hundred points, so the intermediate arrays of a tile stay in the
+CPU caches, and the tiles can be spread over a pool of threads, as numpy releases the GIL in its array operations.
+
+Points are passed like in point_vector: as an array_like of shape (n, 2), a Route or a Trajectory. Distances are in
+meters for 'latlon' points and in coordinate units for 'cartesian' points, like pv.get_distances.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from geoDetection import point_vector as pv
+from geoDetection.spatial_index import chord_length
+
+# the number of points per side of a tile: a dense tile of doubles takes 2 MB, a sparse tile 32 kB per axis
+DEFAULT_TILE_SIZE = 512
+DEFAULT_SPARSE_TILE_SIZE = 64
+# the distance methods, for which the distance from a to b equals the distance from b to a
+_SYMMETRIC_METHODS = ('haversine', 'equirectangular')
+
+
+def _run(function, tasks, max_workers):
+    """
+    Calls function for every task, in a pool of max_workers threads (all processors if None), and returns the results
+    in the order of the tasks.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers <= 1 or len(tasks) <= 1:
+        return [function(task) for task in tasks]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(function, tasks))
+
+
+def get_distance_matrix(points_a, points_b=None, geo_reference_system='latlon', coordinates_unit='radians',
+                        method='haversine', tile_size=DEFAULT_TILE_SIZE, max_workers=None, dtype=np.float64):
+    """
+    Calculates the distances between every point of points_a and every point of points_b, like pv.get_distances in
+    'matrix' mode, tile by tile. Without points_b, the distances between all points of points_a are calculated, and for
+    symmetric methods only the tiles above the diagonal are computed and mirrored.
+
+    Parameters
+    ----------
+    points_a : array_like, Route or Trajectory
+        The start points.
+    points_b : array_like, Route or Trajectory, optional
+        The end points. Defaults to points_a.
+    geo_reference_system : {'latlon', 'cartesian'}
+        The geo reference system of array inputs.
+    coordinates_unit : {'radians', 'degrees'}
+        The coordinates unit of array inputs.
+    method : {'haversine', 'equirectangular', 'local'}
+        How distances between 'latlon' points are computed, see point_vector.
+    tile_size : int
+        The number of points per side of a tile.
+    max_workers : int, optional
+        The number of threads. Defaults to the number of processors, 1 computes all tiles in the calling thread.
+    dtype : numpy.dtype
+        The type of the matrix, e.g. float32 to halve its memory.
+
+    Returns
+    -------
+    distances : numpy.ndarray
+        The (len(points_a), len(points_b)) distance matrix.
+    """
+    if method not in pv.DISTANCE_METHODS:
+        raise ValueError(f"method needs to be one of {pv.DISTANCE_METHODS}.")
+    if tile_size < 1:
+        raise ValueError("tile_size needs to be positive.")
+    x_a, y_a, geo_ref = pv.get_coordinates(points_a, geo_reference_system, coordinates_unit)
+    x_a, y_a = x_a.ravel(), y_a.ravel()
+    if points_b is None:
+        x_b, y_b = x_a, y_a
+    else:
+        x_b, y_b, geo_ref_b = pv.get_coordinates(points_b, geo_reference_system, coordinates_unit)
+        x_b, y_b = x_b.ravel(), y_b.ravel()
+        if geo_ref != geo_ref_b:
+            raise ValueError("Both point sets need to have the same geo_reference_system.")
+    mirror = points_b is None and (geo_ref == 'cartesian' or method in _SYMMETRIC_METHODS)
+    distances = np.empty((len(x_a), len(x_b)), dtype=dtype)
+
+    def compute(tile):
+        i, j = tile
+        rows, columns = slice(i, i + tile_size), slice(j, j + tile_size)
+        block = pv._get_distances(x_a[rows, np.newaxis], y_a[rows, np.newaxis], x_b[columns], y_b[columns], geo_ref,
+                                  method)
+        distances[rows, columns] = block
+        if mirror and i != j:
+            distances[columns, rows] = block.T
+
+    tiles = [(i, j) for i in range(0, len(x_a), tile_size)
+             for j in range(i if mirror else 0, len(x_b), tile_size)]
+    _run(compute, tiles, max_workers)
+    return distances
+
+
+def _get_morton_codes(keys):
+    """
+    Returns the Morton (Z-order) codes of non-negative integer grid keys of shape (n, dimensions). Points close in
+    space get close codes. Keys too large for 63 bits are coarsened, which only makes the order less local.
+    """
+    dimensions = keys.shape[1]
+    bits = 63 // dimensions
+    coarsening = max(0, int(keys.max(initial=0)).bit_length() - bits)
+    keys = keys >> coarsening
+    codes = np.zeros(len(keys), dtype=np.int64)
+    for bit in range(bits):
+        for axis in range(dimensions):
+            codes |= ((keys[:, axis] >> bit) & 1) << (bit * dimensions + axis)
+    return codes
+
+
+def get_pairs_within(points, radius, geo_reference_system='latlon', coordinates_unit='radians',
+                     tile_size=DEFAULT_SPARSE_TILE_SIZE, max_workers=None):
+    """
+    Returns all pairs of distinct points within radius of each other, without building the dense distance matrix.
+    'latlon' distances are computed with pv.haversine, 'cartesian' distances are euclidean.
+
+    The points are sorted along a Z-order curve over a grid with cells of the size of radius, and the sorted points
+    are split into tiles. Pairs of tiles whose bounding boxes are more than radius apart are skipped, the others are
+    compared as dense blocks in the embedding, and only the candidates found there get a distance. For 'latlon'
+    points, the embedding consists of their 3D unit vectors, so tiles work across the poles and the antimeridian. The
+    memory needed grows with the number of pairs found and tile_size, not with the square of the number of points.
+
+    Parameters
+    ----------
+    points : array_like, Route or Trajectory
+        The points.
+    radius : float
+        The radius in meters ('latlon') or coordinate units ('cartesian').
+    geo_reference_system : {'latlon', 'cartesian'}
+        The geo reference system of array inputs.
+    coordinates_unit : {'radians', 'degrees'}
+        The coordinates unit of array inputs.
+    tile_size : int
+        The number of points per tile.
+    max_workers : int, optional
+        The number of threads. Defaults to the number of processors, 1 computes all tiles in the calling thread.
+
+    Returns
+    -------
+    first, second, distances : numpy.ndarray, numpy.ndarray, numpy.ndarray
+        The indices of the pairs with first < second, sorted by first and second, and their distances.
+    """
+    if radius < 0:
+        raise ValueError("radius may not be negative.")
+    if tile_size < 1:
+        raise ValueError("tile_size needs to be positive.")
+    x, y, geo_ref = pv.get_coordinates(points, geo_reference_system, coordinates_unit)
+    x, y = x.ravel(), y.ravel()
+    n = len(x)
+    if n < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    if geo_ref == 'latlon':
+        # the chord between unit vectors grows monotonically with the great-circle distance
+        embedding = pv.get_unit_vectors(x, y)
+        cell_size = max(chord_length(radius) * (1 + 1e-9), 1e-12)
+    else:
+        embedding = np.stack([x, y], axis=-1)
+        cell_size = max(radius * (1 + 1e-9), 1e-12)
+    keys = np.floor((embedding - embedding.min(axis=0)) / cell_size).astype(np.int64)
+    order = np.argsort(_get_morton_codes(keys), kind='stable')
+    x, y, embedding = x[order], y[order], embedding[order]
+
+    starts = np.arange(0, n, tile_size)
+    lows, highs = np.minimum.reduceat(embedding, starts), np.maximum.reduceat(embedding, starts)
+    # the pairs of tiles whose bounding boxes are within radius, with the first tile not after the second
+    tile_pairs = []
+    for i in range(len(starts)):
+        gaps = np.maximum(0, np.maximum(lows[i:] - highs[i], lows[i] - highs[i:]))
+        tile_pairs.extend((i, i + j) for j in np.flatnonzero(np.einsum('ij,ij->i', gaps, gaps) <= cell_size ** 2))
+
+    def compute(tile_pair):
+        i, j = starts[tile_pair[0]], starts[tile_pair[1]]
+        rows, columns = slice(i, i + tile_size), slice(j, j + tile_size)
+        # the squared distances in the embedding are cheap and select the candidates, only those get a distance
+        squared = 0
+        for axis in range(embedding.shape[1]):
+            squared = squared + np.square(embedding[rows, axis, np.newaxis] - embedding[columns, axis])
+        candidates = squared <= cell_size ** 2
+        if i == j:
+            candidates &= np.triu(np.ones(candidates.shape, dtype=bool), 1)
+        row, column = np.nonzero(candidates)
+        row, column = row + i, column + j
+        distances = pv._get_distances(x[row], y[row], x[column], y[column], geo_ref)
+        within = distances <= radius
+        return row[within], column[within], distances[within]
+
+    results = _run(compute, tile_pairs, max_workers)
+    first = order[np.concatenate([result[0] for result in results])]
+    second = order[np.concatenate([result[1] for result in results])]
+    distances = np.concatenate([result[2] for result in results])
+    first, second = np.minimum(first, second), np.maximum(first, second)
+    pair_order = np.lexsort((second, first))
+    return first[pair_order], second[pair_order], distances[pair_order]
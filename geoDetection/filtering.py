@@ -0,0 +1,275 @@
+"""
+Removes GPS outliers from routes and smooths them before stop detection. Multipath jumps of a few fixes break candidate
+stays early, so filtering them out gives extract_pois fewer and cleaner points.
+
+All functions take a Route or Trajectory with timestamps in 'latlon' format and return an object of the same type, so
+they can be chained in front of extract_pois:
+
+    pois = extract_pois(median_filter(filter_speed_outliers(route, 50)), time_threshold, distance_threshold)
+"""
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from geoDetection import point_vector as pv
+from geoDetection.route_arrays import get_timed_arrays, select_points
+from geoDetection.trajectory import Trajectory
+
+# the number of maps composed per block by _affine_scan
+_SCAN_BLOCK = 64
+
+
+def _replace_coordinates(route, x_lon, y_lat):
+    """
+    Returns a copy of route with the coordinates (in radians) replaced, as an object of the same type as route.
+    """
+    trajectory = route.copy() if isinstance(route, Trajectory) else Trajectory.from_route(route)
+    if trajectory.get_coordinates_unit() == 'degrees':
+        x_lon, y_lat = np.degrees(x_lon), np.degrees(y_lat)
+    trajectory.x_lon, trajectory.y_lat = x_lon, y_lat
+    return trajectory if isinstance(route, Trajectory) else trajectory.to_route()
+
+
+def _exceeds_speed(x_lon, y_lat, timestamps, first, second, max_speed, accuracy):
+    """
+    Checks for the pairs of points (first, second), whether the second point cannot be reached from the first one
+    without exceeding max_speed.
+    """
+    distances = pv.haversine(x_lon[first], y_lat[first], x_lon[second], y_lat[second])
+    return distances - accuracy > max_speed * (timestamps[second] - timestamps[first]) / 1e9
+
+
+def filter_speed_outliers(route, max_speed, max_burst=3, accuracy=0.0):
+    """
+    Removes fixes, whose implied speed from their neighbours exceeds max_speed.
+
+    The route is split at every segment exceeding max_speed into runs of consecutive fixes. A run of at most max_burst
+    fixes is an outlier, if its preceding and its following fix can be connected without exceeding max_speed, i.e. if
+    the route jumps away and back. Runs at the start or the end of the route are outliers, if they are shorter than
+    their neighbouring run. The check is vectorized over all runs and repeated until no outliers are left.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        A route with timestamps in 'latlon' format.
+    max_speed : float
+        The maximal plausible speed in meters per second.
+    max_burst : int
+        The maximal number of consecutive fixes forming a single outlier.
+    accuracy : float
+        A distance in meters every segment may cover in addition to max_speed, to account for the position error of
+        fixes sampled at high rates.
+
+    Returns
+    -------
+    rt.Route or Trajectory
+        The route without outliers, of the same type as route. Routes keep their point objects.
+    """
+    if max_speed <= 0:
+        raise ValueError("max_speed needs to be positive.")
+    x_lon, y_lat, timestamps = get_timed_arrays(route)
+    keep = np.ones(len(x_lon), dtype=bool)
+    while True:
+        indices = np.flatnonzero(keep)
+        if len(indices) < 2:
+            break
+        exceeds = _exceeds_speed(x_lon, y_lat, timestamps, indices[:-1], indices[1:], max_speed, accuracy)
+        if not exceeds.any():
+            break
+        # runs of fixes separated by segments exceeding max_speed
+        runs = np.concatenate([[0], np.cumsum(exceeds)])
+        lengths = np.bincount(runs)
+        ends = np.cumsum(lengths) - 1
+        starts = ends - lengths + 1
+        outliers = lengths <= max_burst
+        outliers[1:-1] &= ~_exceeds_speed(x_lon, y_lat, timestamps, indices[ends[:-2]], indices[starts[2:]],
+                                          max_speed, accuracy)
+        outliers[0] &= lengths[0] < lengths[1]
+        outliers[-1] &= lengths[-1] < lengths[-2]
+        # of adjacent outlier runs only the first is removed, the following are checked again with their new neighbour
+        outliers[1:] &= ~outliers[:-1].copy()
+        if not outliers.any():
+            break
+        keep[indices[outliers[runs]]] = False
+    return select_points(route, keep)
+
+
+def median_filter(route, window=5):
+    """
+    Smooths a route by replacing every fix by the median of the fixes in a window centered on it, separately for
+    longitudes and latitudes. The window is truncated at the ends of the route by repeating the first and last fix.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        A route with timestamps in 'latlon' format.
+    window : int
+        The odd number of fixes in a window.
+
+    Returns
+    -------
+    rt.Route or Trajectory
+        The smoothed route, of the same type as route.
+    """
+    if window < 1 or window % 2 == 0:
+        raise ValueError("window needs to be a positive odd number.")
+    x_lon, y_lat, _ = get_timed_arrays(route)
+    if len(x_lon) == 0 or window == 1:
+        return route.copy() if isinstance(route, Trajectory) else route.deep_copy()
+    half = window // 2
+    # longitudes are unwrapped, so routes crossing the antimeridian are smoothed continuously
+    x_lon = np.median(sliding_window_view(np.pad(np.unwrap(x_lon), half, mode='edge'), window), axis=1)
+    y_lat = np.median(sliding_window_view(np.pad(y_lat, half, mode='edge'), window), axis=1)
+    return _replace_coordinates(route, (x_lon + np.pi) % (2 * np.pi) - np.pi, y_lat)
+
+
+def _affine_scan(m_00, m_01, m_10, m_11, positions, velocities):
+    """
+    Evaluates the recursion x_k = M_k x_(k-1) + o_k for all k, starting from x_(-1) = 0. The 2x2 matrices M_k are given
+    by their entries, the offsets o_k by their position and velocity rows, which hold one column per axis.
+
+    The maps are split into blocks, which are composed in _SCAN_BLOCK vectorized steps over all blocks at once. The
+    states at the ends of the blocks follow the recursion of the composed maps, which is evaluated in the same way, and
+    are finally passed into the following blocks.
+    """
+    n = len(m_00)
+    blocks = -(-n // _SCAN_BLOCK)
+    padding = blocks * _SCAN_BLOCK - n
+
+    def split(values, fill):
+        # the padding consists of identity maps; the blocks are stored column-wise, so every step reads whole rows
+        padded = np.concatenate([values, np.full((padding,) + values.shape[1:], fill, dtype=np.float64)])
+        return np.ascontiguousarray(padded.reshape((blocks, _SCAN_BLOCK) + values.shape[1:]).swapaxes(0, 1))
+
+    m_00, m_01, m_10, m_11 = split(m_00, 1.0), split(m_01, 0.0), split(m_10, 0.0), split(m_11, 1.0)
+    positions, velocities = split(positions, 0.0), split(velocities, 0.0)
+    for j in range(1, _SCAN_BLOCK):
+        # compose the maps from the start of every block up to j
+        a_00, a_01, a_10, a_11 = m_00[j], m_01[j], m_10[j], m_11[j]
+        b_00, b_01, b_10, b_11 = m_00[j - 1], m_01[j - 1], m_10[j - 1], m_11[j - 1]
+        previous_positions, previous_velocities = positions[j - 1], velocities[j - 1]
+        positions[j], velocities[j] = \
+            a_00[:, np.newaxis] * previous_positions + a_01[:, np.newaxis] * previous_velocities + positions[j], \
+            a_10[:, np.newaxis] * previous_positions + a_11[:, np.newaxis] * previous_velocities + velocities[j]
+        m_00[j], m_01[j], m_10[j], m_11[j] = \
+            a_00 * b_00 + a_01 * b_10, a_00 * b_01 + a_01 * b_11, a_10 * b_00 + a_11 * b_10, a_10 * b_01 + a_11 * b_11
+    if blocks > 1:
+        end_positions, end_velocities = _affine_scan(m_00[-1], m_01[-1], m_10[-1], m_11[-1], positions[-1],
+                                                     velocities[-1])
+        start_positions, start_velocities = end_positions[:-1], end_velocities[:-1]
+        positions[:, 1:] += m_00[:, 1:, np.newaxis] * start_positions + m_01[:, 1:, np.newaxis] * start_velocities
+        velocities[:, 1:] += m_10[:, 1:, np.newaxis] * start_positions + m_11[:, 1:, np.newaxis] * start_velocities
+    shape = (blocks * _SCAN_BLOCK,) + positions.shape[2:]
+    return positions.swapaxes(0, 1).reshape(shape)[:n], velocities.swapaxes(0, 1).reshape(shape)[:n]
+
+
+def kalman_filter(route, measurement_noise=10.0, process_noise=1.0, smooth=True):
+    """
+    Smooths a route with a constant velocity Kalman filter using the actual time between fixes. The fixes are
+    projected onto a plane around the first fix, where east and north are filtered independently.
+
+    The filter runs once forward over the route. With smooth, a Rauch-Tung-Striebel pass runs backwards as well, so
+    every fix is estimated from all fixes and positions do not lag behind during moves. Only the covariances, which
+    do not depend on the fixes, are computed one fix at a time, the states are computed with vectorized prefix scans.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        A route with timestamps in 'latlon' format, spanning at most a few hundred kilometers.
+    measurement_noise : float
+        The standard deviation of the position error of a fix in meters.
+    process_noise : float
+        The standard deviation of random accelerations in meters per second squared.
+    smooth : bool
+        If True, the forward filter is followed by a backward smoothing pass.
+
+    Returns
+    -------
+    rt.Route or Trajectory
+        The smoothed route, of the same type as route.
+    """
+    if measurement_noise <= 0:
+        raise ValueError("measurement_noise needs to be positive.")
+    x_lon, y_lat, timestamps = get_timed_arrays(route)
+    n = len(x_lon)
+    if n == 0:
+        return route.copy() if isinstance(route, Trajectory) else route.deep_copy()
+    lon_0, lat_0 = float(x_lon[0]), float(y_lat[0])
+    east, north = pv.to_local(np.unwrap(x_lon), y_lat, lon_0, lat_0)
+    measurements = np.stack([east, north], axis=-1)
+    intervals = np.diff(timestamps) / 1e9
+    r = measurement_noise ** 2
+    q = process_noise ** 2
+
+    # the covariances do not depend on the measurements and are the same for both axes, so only the predicted
+    # covariances are computed one fix at a time, in a few operations per fix; once the covariance converged, it stays
+    # the same while the intervals do
+    p_00, p_01, p_11 = r, 0.0, 100.0 ** 2
+    predicted = [(p_00, p_01, p_11)]
+    interval_list = intervals.tolist()
+    # the number of following fixes with the same interval
+    repeats = np.zeros(len(interval_list), dtype=np.int64)
+    if len(interval_list) > 0:
+        changes = np.flatnonzero(np.diff(intervals)) + 1
+        run_ends = np.append(changes, len(interval_list))
+        repeats = run_ends[np.searchsorted(run_ends, np.arange(len(interval_list)), side='right')] - \
+            np.arange(len(interval_list)) - 1
+    repeats = repeats.tolist()
+    k = 0
+    while k < len(interval_list):
+        dt = interval_list[k]
+        before = p_00, p_01, p_11
+        p_00 = p_00 + dt * (2 * p_01 + dt * p_11) + q * dt ** 4 / 4
+        p_01 = p_01 + dt * p_11 + q * dt ** 3 / 2
+        p_11 = p_11 + q * dt ** 2
+        predicted.append((p_00, p_01, p_11))
+        gain_0, gain_1 = p_00 / (p_00 + r), p_01 / (p_00 + r)
+        p_00, p_01, p_11 = (1 - gain_0) * p_00, (1 - gain_0) * p_01, p_11 - gain_1 * p_01
+        k += 1
+        if k < len(interval_list) and interval_list[k] == dt and \
+                abs(p_00 - before[0]) + abs(p_01 - before[1]) + abs(p_11 - before[2]) <= \
+                1e-12 * (p_00 + abs(p_01) + p_11):
+            predicted.extend([predicted[-1]] * repeats[k - 1])
+            k += repeats[k - 1]
+    predicted = np.array(predicted)
+    gain_0 = predicted[:, 0] / (predicted[:, 0] + r)
+    gain_1 = predicted[:, 1] / (predicted[:, 0] + r)
+    gain_0[0] = gain_1[0] = 0
+
+    # the state (position and velocity, per axis) follows the affine recursion x_k = (I - g_k H) F_k x_(k-1) + g_k z_k
+    # with the transition F_k = [[1, dt], [0, 1]], starting from the first fix at rest
+    dt = np.concatenate([[0.0], intervals])
+    m_00, m_10 = 1 - gain_0, -gain_1
+    m_01, m_11 = m_00 * dt, 1 - gain_1 * dt
+    m_00[0] = m_01[0] = m_10[0] = m_11[0] = 0
+    positions, velocities = gain_0[:, np.newaxis] * measurements, gain_1[:, np.newaxis] * measurements
+    positions[0], velocities[0] = measurements[0], 0
+    positions, velocities = _affine_scan(m_00, m_01, m_10, m_11, positions, velocities)
+
+    if smooth:
+        # Rauch-Tung-Striebel: x_k = x_k + C_k (x_(k+1) - F_(k+1) x_k) with the gain C_k = P_k F_(k+1)^T Q_(k+1)^-1 of
+        # the updated covariance P and the predicted covariance Q, again an affine recursion, backwards
+        q_00, q_01, q_11 = predicted.T
+        # the updated covariances
+        p_00, p_01, p_11 = (1 - gain_0) * q_00, (1 - gain_0) * q_01, q_11 - gain_1 * q_01
+        p_00, p_01, p_11, q_00, q_01, q_11 = p_00[:-1], p_01[:-1], p_11[:-1], q_00[1:], q_01[1:], q_11[1:]
+        determinants = q_00 * q_11 - q_01 * q_01
+        a_00, a_01, a_10, a_11 = p_00 + intervals * p_01, p_01, p_01 + intervals * p_11, p_11
+        c_00, c_01, c_10, c_11 = (np.zeros(n) for _ in range(4))
+        c_00[:-1] = (a_00 * q_11 - a_01 * q_01) / determinants
+        c_01[:-1] = (a_01 * q_00 - a_00 * q_01) / determinants
+        c_10[:-1] = (a_10 * q_11 - a_11 * q_01) / determinants
+        c_11[:-1] = (a_11 * q_00 - a_10 * q_01) / determinants
+        # offsets x_k - C_k F_(k+1) x_k
+        dt = np.append(intervals, 0.0)
+        cf_01, cf_11 = c_00 * dt + c_01, c_10 * dt + c_11
+        offset_positions = positions - c_00[:, np.newaxis] * positions - cf_01[:, np.newaxis] * velocities
+        offset_velocities = velocities - c_10[:, np.newaxis] * positions - cf_11[:, np.newaxis] * velocities
+        positions, velocities = _affine_scan(c_00[::-1], c_01[::-1], c_10[::-1], c_11[::-1], offset_positions[::-1],
+                                             offset_velocities[::-1])
+        positions = positions[::-1]
+
+    x_lon = lon_0 + positions[:, 0] / (pv.HAVERSINE_EARTH_RADIUS * math.cos(lat_0))
+    y_lat = lat_0 + positions[:, 1] / pv.HAVERSINE_EARTH_RADIUS
+    return _replace_coordinates(route, (x_lon + np.pi) % (2 * np.pi) - np.pi, y_lat)
@@ -0,0 +1,56 @@
+"""Provides placeholders for heavy or optional dependencies, which are only imported when they are used for the first
+time. This keeps importing geoDetection fast and lets the core point, route and stop detection functionality work
+without optional dependencies such as torch.
+"""
+import importlib
+
+
+class LazyModule:
+    """A placeholder for a module, which imports the module on the first attribute access and delegates to it.
+    """
+
+    def __init__(self, name, purpose=None):
+        """
+        Creates a new LazyModule.
+
+        Parameters
+        ----------
+        name : str
+            The importable name of the module, e.g. 'pandas'.
+        purpose : str, optional
+            What the module is needed for. Used in the error message if the module is not installed.
+        """
+        self.__name = name
+        self.__purpose = purpose
+        self.__module = None
+
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+    def __repr__(self):
+        state = 'loaded' if self.is_loaded() else 'not loaded'
+        return f"<LazyModule '{self.__name}' ({state})>"
+
+    def load(self):
+        """
+        Imports the module, if it has not been imported yet.
+
+        Returns
+        -------
+        module
+            The imported module.
+        """
+        if self.__module is None:
+            try:
+                self.__module = importlib.import_module(self.__name)
+            except ImportError as error:
+                purpose = f" for {self.__purpose}" if self.__purpose else ""
+                raise ImportError(f"The optional dependency '{self.__name}' is required{purpose}, but it is not "
+                                  f"installed.") from error
+        return self.__module
+
+    def is_loaded(self):
+        """
+        Returns True, if the module has already been imported.
+        """
+        return self.__module is not None
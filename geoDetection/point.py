@@ -2,9 +2,14 @@
 """
 
 import math
+import sys
 import warnings
 import numpy as np
-import haversine as hs
+
+from geoDetection import point_vector as pv
+from geoDetection.lazy_import import LazyModule
+
+hs = LazyModule('haversine', 'distance calculations')
 
 
 def get_bearing(point_a, point_b):
@@ -37,7 +42,16 @@ def get_bearing(point_a, point_b):
     return bearing
 
 
-def get_distance(point_a, point_b):
+def _get_degrees(point):
+    """
+    Returns [y_lat, x_lon] of a 'latlon' point in degrees.
+    """
+    if point.get_coordinates_unit() == 'degrees':
+        return [point.y_lat, point.x_lon]
+    return [math.degrees(point.y_lat), math.degrees(point.x_lon)]
+
+
+def get_distance(point_a, point_b, method='haversine'):
     """
     Calculates the distance between two points.
 
@@ -47,22 +61,34 @@ def get_distance(point_a, point_b):
         The start point.
     point_b : Point
         The end point.
+    method : {'haversine', 'equirectangular', 'local'}
+        How the distance between 'latlon' points is computed: exactly on the sphere, by the equirectangular
+        approximation around the mean latitude or in the plane around point_a. See point_vector for the error bounds of
+        the approximations.
 
     Returns
     -------
     distance : float
         The distance between point_a and point_b in meters.
     """
+    if method not in pv.DISTANCE_METHODS:
+        raise ValueError(f"method needs to be one of {pv.DISTANCE_METHODS}.")
     geo_ref_a = point_a.get_geo_reference_system()
     geo_ref_b = point_b.get_geo_reference_system()
     if geo_ref_a != geo_ref_b:
         raise ValueError("Both points need to have the same geo_reference_system.")
     if point_a.get_coordinates_unit() != point_b.get_coordinates_unit():
         warnings.warn('Coordinates do not have the same unit and will be converted before calculation.')
-    if geo_ref_a == 'latlon':
-        point_a = point_a.to_degrees(ignore_warnings=True)
-        point_b = point_b.to_degrees(ignore_warnings=True)
-        distance = hs.haversine([point_a.y_lat, point_a.x_lon], [point_b.y_lat, point_b.x_lon], hs.Unit.METERS)
+    if geo_ref_a == 'latlon' and method != 'haversine':
+        point_a = point_a.to_radians(ignore_warnings=True)
+        point_b = point_b.to_radians(ignore_warnings=True)
+        reference_latitude = point_a.y_lat if method == 'local' else (point_a.y_lat + point_b.y_lat) * 0.5
+        d_lon = (point_b.x_lon - point_a.x_lon + math.pi) % (2 * math.pi) - math.pi
+        distance = pv.HAVERSINE_EARTH_RADIUS * math.hypot(d_lon * math.cos(reference_latitude),
+                                                          point_b.y_lat - point_a.y_lat)
+    elif geo_ref_a == 'latlon':
+        # the same values to_degrees would produce, without copying the points
+        distance = hs.haversine(_get_degrees(point_a), _get_degrees(point_b), hs.Unit.METERS)
     else:   # distance in cartesian plane
         distance = math.sqrt(math.pow(point_b.x_lon - point_a.x_lon, 2) + math.pow(point_b.y_lat - point_a.y_lat, 2))
     return distance
@@ -113,8 +139,15 @@ def get_interpolated_point(start_point, end_point, ratio):
 
 class Point(list):
     """A point specifying a geographical location.
+
+    The coordinates are only stored as the two list items; x_lon and y_lat are properties reading them. Points use
+    __slots__ instead of a per-instance __dict__, the geo reference system and coordinates unit are interned strings
+    shared by all points and the earth radius is a class constant.
     """
 
+    __slots__ = ('__geo_reference_system', '__coordinates_unit', 'measurement_value', 'measurement_type')
+    __earth_radius = 6_371_000
+
     def __init__(self, coordinates, geo_reference_system="latlon", coordinates_unit="radians", measurement_value=None,
                  measurement_type=None):
         """
@@ -144,9 +177,6 @@ class Point(list):
         self.set_geo_reference_system(geo_reference_system)
         self.__coordinates_unit = None
         self.set_coordinates_unit(coordinates_unit)
-        self.__earth_radius = 6_371_000
-        self.x_lon = coordinates[0]
-        self.y_lat = coordinates[1]
         self.measurement_value = measurement_value
         self.measurement_type = measurement_type
         if not self.is_coordinates_unit_valid():
@@ -158,6 +188,80 @@ class Point(list):
             if type(coordinates[i]) not in (int, float, np.float64):
                 raise ValueError("Coordinates need to be of type int or float.")
 
+    @classmethod
+    def from_validated(cls, x_lon, y_lat, geo_reference_system, coordinates_unit, measurement_value=None,
+                       measurement_type=None):
+        """
+        Creates a new Point object from values that have already been validated, e.g. column-wise by a bulk
+        constructor. No checks are performed.
+
+        Parameters
+        ----------
+        x_lon, y_lat : float
+            The x- and y-coordinate of the point.
+        geo_reference_system : {'latlon', 'cartesian'}
+            Geographical reference system of the coordinates.
+        coordinates_unit : {'radians', 'degrees'}
+            The coordinates unit of the point.
+        measurement_value : float
+            The (optional) measurement value of the point.
+        measurement_type : string
+            The type of the (optional) measurement of the point.
+
+        Returns
+        -------
+        Point
+            The new point.
+        """
+        point = cls.__new__(cls)
+        list.extend(point, (x_lon, y_lat))
+        point.__geo_reference_system = sys.intern(geo_reference_system)
+        point.__coordinates_unit = sys.intern(coordinates_unit)
+        point.measurement_value = measurement_value
+        point.measurement_type = measurement_type
+        return point
+
+    def set_validated_(self, x_lon, y_lat, geo_reference_system, coordinates_unit):
+        """
+        Sets coordinates, geo reference system and coordinates unit of this point at once, e.g. after a vectorized
+        conversion of a whole route. No checks are performed.
+
+        Parameters
+        ----------
+        x_lon, y_lat : float
+            The new x- and y-coordinate.
+        geo_reference_system : {'latlon', 'cartesian'}
+            The new geographical reference system.
+        coordinates_unit : {'radians', 'degrees'}
+            The new coordinates unit.
+        """
+        list.__setitem__(self, 0, x_lon)
+        list.__setitem__(self, 1, y_lat)
+        self.__geo_reference_system = sys.intern(geo_reference_system)
+        self.__coordinates_unit = sys.intern(coordinates_unit)
+
+    def __reduce__(self):
+        return Point.from_validated, (self.x_lon, self.y_lat, self.__geo_reference_system, self.__coordinates_unit,
+                                      self.measurement_value, self.measurement_type)
+
+    @property
+    def x_lon(self):
+        """The x-coordinate respectively longitude of this point."""
+        return list.__getitem__(self, 0)
+
+    @x_lon.setter
+    def x_lon(self, value):
+        list.__setitem__(self, 0, value)
+
+    @property
+    def y_lat(self):
+        """The y-coordinate respectively latitude of this point."""
+        return list.__getitem__(self, 1)
+
+    @y_lat.setter
+    def y_lat(self, value):
+        list.__setitem__(self, 1, value)
+
     def append(self, obj):
         warnings.warn("Point class does not provide append functionality. Use set instead.")
 
@@ -179,10 +283,6 @@ class Point(list):
             The modified point instance.
         """
         super().__setitem__(key, value)
-        if key == 0:
-            self.x_lon = value
-        if key == 1:
-            self.y_lat = value
         return self
 
     def set_x_lon(self, value):
@@ -220,7 +320,7 @@ class Point(list):
         """
         if value not in ("cartesian", "latlon"):
             raise ValueError("Geo reference system can only be 'latlon' or 'cartesian'.")
-        self.__geo_reference_system = value
+        self.__geo_reference_system = sys.intern(value)
 
     def set_measurement(self, value, type):
         """
@@ -338,7 +438,7 @@ class Point(list):
         """
         if value not in ("radians", "degrees"):
             raise ValueError("Coordinates unit can only be 'radians' or 'degrees'.")
-        self.__coordinates_unit = value
+        self.__coordinates_unit = sys.intern(value)
 
     def get_coordinates_unit(self):
         """
@@ -484,15 +584,16 @@ class Point(list):
 
     def deep_copy(self):
         """
-        Creates a deep copy of this point preserving its properties.
+        Creates a deep copy of this point preserving its properties. The point has been validated on creation, so the
+        copy skips validation.
 
         Returns
         -------
         Point
             A deep copy of this point.
         """
-        return Point(self, geo_reference_system=self.__geo_reference_system, coordinates_unit=self.__coordinates_unit,
-                     measurement_value=self.measurement_value, measurement_type=self.measurement_type)
+        return Point.from_validated(self.x_lon, self.y_lat, self.__geo_reference_system, self.__coordinates_unit,
+                                    self.measurement_value, self.measurement_type)
 
     def is_coordinates_unit_valid(self):
         return self.get_geo_reference_system() == 'cartesian' or \
@@ -1,9 +1,12 @@
 """Provides a point datatype for geo-coordinates and timestamps and their manipulation.
 """
-import pandas
+import numbers
 
+from geoDetection.lazy_import import LazyModule
 from geoDetection.point import Point, get_interpolated_point as get_interpolated
 
+pandas = LazyModule('pandas', 'timestamps')
+
 
 def get_interpolated_point(start_point, end_point, ratio):
     """
@@ -34,8 +37,13 @@ def get_interpolated_point(start_point, end_point, ratio):
 
 class PointT(Point):
     """A point specifying a geographical location and a timestamp.
+
+    The timestamp is stored as int64 nanoseconds since epoch (timestamp_ns) plus its timezone, the pandas.Timestamp is
+    only built when the timestamp property is read.
     """
 
+    __slots__ = ('timestamp_ns', '__timezone')
+
     def __init__(self, coordinates, timestamp, geo_reference_system="latlon", coordinates_unit='radians',
                  measurement_value=None, measurement_type=None):
         """
@@ -65,15 +73,83 @@ class PointT(Point):
         else:
             raise TypeError("Timestamp needs to be of type pandas.Timestamp.")
 
+    @property
+    def timestamp(self):
+        """The timestamp (pandas.Timestamp) assigned to this point."""
+        return pandas.Timestamp(self.timestamp_ns, tz=self.__timezone)
+
+    @timestamp.setter
+    def timestamp(self, value):
+        self.timestamp_ns = value.value
+        self.__timezone = value.tz
+
+    def get_timezone(self):
+        """
+        Returns the timezone of this point's timestamp.
+
+        Returns
+        -------
+        tzinfo or None
+            The timezone or None, if the timestamp is timezone-naive.
+        """
+        return self.__timezone
+
+    def __reduce__(self):
+        return PointT.from_validated, (self.x_lon, self.y_lat, self.get_geo_reference_system(),
+                                       self.get_coordinates_unit(), self.measurement_value, self.measurement_type,
+                                       self.timestamp_ns, self.__timezone)
+
+    @classmethod
+    def from_validated(cls, x_lon, y_lat, geo_reference_system, coordinates_unit, measurement_value=None,
+                       measurement_type=None, timestamp=None, timezone=None):
+        """
+        Creates a new PointT object from values that have already been validated, e.g. column-wise by a bulk
+        constructor. No checks are performed.
+
+        Parameters
+        ----------
+        x_lon, y_lat : float
+            The x- and y-coordinate of the point.
+        geo_reference_system : {'latlon', 'cartesian'}
+            Geographical reference system of the coordinates.
+        coordinates_unit : {'radians', 'degrees'}
+            The coordinates unit of the point.
+        measurement_value : float
+            The (optional) measurement value of the point.
+        measurement_type : string
+            The type of the (optional) measurement of the point.
+        timestamp : pandas.Timestamp or int
+            The timestamp assigned to the point, either as pandas.Timestamp or in nanoseconds since epoch (Python or
+            numpy integer).
+        timezone : tzinfo, optional
+            The timezone of a timestamp given in nanoseconds.
+
+        Returns
+        -------
+        PointT
+            The new point.
+        """
+        if timestamp is None:
+            raise ValueError("A PointT needs a timestamp.")
+        point = super().from_validated(x_lon, y_lat, geo_reference_system, coordinates_unit, measurement_value,
+                                       measurement_type)
+        if isinstance(timestamp, numbers.Integral):
+            point.timestamp_ns = int(timestamp)
+            point.__timezone = timezone
+        else:
+            point.timestamp = timestamp
+        return point
+
     def deep_copy(self):
         """
-        Creates a deep copy of this point preserving its properties.
+        Creates a deep copy of this point preserving its properties. The point has been validated on creation, so the
+        copy skips validation.
 
         Returns
         -------
         Point
             A deep copy of this point.
         """
-        return PointT(self, timestamp=self.timestamp, geo_reference_system=self.get_geo_reference_system(),
-                      coordinates_unit=self.get_coordinates_unit(), measurement_value=self.measurement_value,
-                      measurement_type=self.measurement_type)
+        return PointT.from_validated(self.x_lon, self.y_lat, self.get_geo_reference_system(),
+                                     self.get_coordinates_unit(), self.measurement_value, self.measurement_type,
+                                     self.timestamp_ns, self.__timezone)
@@ -0,0 +1,489 @@
+"""Provides batched versions of the point functions get_distance, get_bearing and add_vector, operating on numpy arrays
+of coordinates instead of single Point objects.
+
+Points can be passed as
+    - an array_like of shape (2,) or (n, 2) holding [x_lon, y_lat] pairs,
+    - a Route (or any list of Point objects),
+    - a Trajectory.
+Route and Trajectory inputs carry their own geo_reference_system and coordinates_unit, array inputs are interpreted
+according to the geo_reference_system and coordinates_unit parameters.
+
+The distance and bearing functions support the following modes:
+    - 'pairwise': element-wise between points_a[i] and points_b[i] (a single point is broadcast against many),
+    - 'consecutive': between points_a[i] and points_a[i + 1], points_b is ignored,
+    - 'one_to_many': between the single point points_a and every point of points_b,
+    - 'matrix': between every point of points_a and every point of points_b, resulting in a (len(a), len(b)) array.
+
+Distances between 'latlon' points are computed with one of the following methods:
+    - 'haversine': the great-circle distance, as computed by point.get_distance,
+    - 'equirectangular': the euclidean distance after scaling the longitude difference by the cosine of the mean
+      latitude of both points,
+    - 'local': the euclidean distance in a local equirectangular (tangent plane) projection around a reference point,
+      which is projected once and then shared by many distance computations.
+Both approximations are accurate to millimetres at distances of a few hundred meters. get_distance_error_bound gives a
+guaranteed bound of their deviation from 'haversine'; classify_distances uses it to compare approximated distances with
+a threshold and leaves only those undecided, whose exact distance could be on the other side of the threshold.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+EARTH_RADIUS = 6_371_000    # meters, as used by Point for vector addition and the cartesian projection
+HAVERSINE_EARTH_RADIUS = 6_371_008.8    # meters, the mean earth radius used by haversine.haversine
+MODES = ('pairwise', 'consecutive', 'one_to_many', 'matrix')
+# absolute (meters) and relative bound of the difference between haversine and point.get_distance; comparisons with a
+# threshold that fall within this tolerance need to be re-evaluated with point.get_distance to be decided exactly
+DISTANCE_TOLERANCE_M = 1e-6
+DISTANCE_TOLERANCE_REL = 1e-9
+DISTANCE_METHODS = ('haversine', 'equirectangular', 'local')
+# the approximations are only used up to these latitudes and distances, beyond them the exact distance is required
+APPROXIMATION_MAX_LATITUDE = math.radians(85)
+APPROXIMATION_MAX_DISTANCE_M = 100_000
+
+# the segment-wise motion of a sequence of points, see get_kinematics
+Kinematics = namedtuple('Kinematics', ['distances', 'durations', 'speeds', 'accelerations', 'bearings'])
+
+
+def get_coordinates(points, geo_reference_system='latlon', coordinates_unit='radians'):
+    """
+    Returns the x- and y-coordinates of points as two float64 arrays. 'latlon' coordinates are returned in radians.
+    Array and Trajectory inputs in radians are returned without copying.
+
+    Parameters
+    ----------
+    points : array_like, Route or Trajectory
+        The points to extract the coordinates from.
+    geo_reference_system : {'latlon', 'cartesian'}
+        The geo reference system of array inputs.
+    coordinates_unit : {'radians', 'degrees'}
+        The coordinates unit of array inputs.
+
+    Returns
+    -------
+    x_lon, y_lat, geo_reference_system : numpy.ndarray, numpy.ndarray, str
+        The coordinates and their geo reference system.
+    """
+    if hasattr(points, 'get_geo_reference_system') and hasattr(points, 'x_lon') and \
+            isinstance(points.x_lon, np.ndarray):
+        # Trajectory
+        x_lon, y_lat = points.x_lon, points.y_lat
+        geo_reference_system = points.get_geo_reference_system()
+        coordinates_unit = points.get_coordinates_unit()
+    elif isinstance(points, list) and len(points) > 0 and hasattr(points[0], 'get_geo_reference_system'):
+        # Route or list of Point objects
+        x_lon = np.fromiter((point.x_lon for point in points), dtype=np.float64, count=len(points))
+        y_lat = np.fromiter((point.y_lat for point in points), dtype=np.float64, count=len(points))
+        geo_reference_system = points[0].get_geo_reference_system()
+        coordinates_unit = points[0].get_coordinates_unit()
+    else:
+        points = np.asarray(points, dtype=np.float64)
+        if points.size == 0:
+            points = points.reshape(0, 2)
+        if points.shape[-1:] != (2,):
+            raise ValueError("Points need to be of shape (2,) or (n, 2).")
+        x_lon, y_lat = points[..., 0], points[..., 1]
+    if geo_reference_system == 'latlon' and coordinates_unit == 'degrees':
+        x_lon, y_lat = np.radians(x_lon), np.radians(y_lat)
+    return x_lon, y_lat, geo_reference_system
+
+
+def to_cartesian(x_lon, y_lat):
+    """
+    Projects latitude and longitude coordinates (both in radians) into the cartesian plane, like Point.to_cartesian_.
+
+    Parameters
+    ----------
+    x_lon, y_lat : numpy.ndarray
+        Longitudes and latitudes in radians.
+
+    Returns
+    -------
+    x, y : numpy.ndarray, numpy.ndarray
+        The cartesian coordinates in kilometers.
+    """
+    radius = EARTH_RADIUS / 1000    # km
+    return radius * x_lon, radius * np.log(np.tan(np.pi / 4.0 + y_lat / 2.0))
+
+
+def to_latlon(x, y):
+    """
+    Projects cartesian coordinates back onto latitude and longitude (both in radians), like Point.to_latlon_.
+
+    Parameters
+    ----------
+    x, y : numpy.ndarray
+        The cartesian coordinates in kilometers.
+
+    Returns
+    -------
+    x_lon, y_lat : numpy.ndarray, numpy.ndarray
+        Longitudes and latitudes in radians.
+    """
+    radius = EARTH_RADIUS / 1000    # km
+    return x / radius, np.pi / 2 - 2 * np.arctan(np.exp(-y / radius))
+
+
+def get_unit_vectors(x_lon, y_lat):
+    """
+    Returns the 3D unit vectors of latitude and longitude coordinates (both in radians). The squared chord length
+    between two unit vectors only takes a few multiplications and grows monotonically with the great-circle distance,
+    so precomputed unit vectors let distances be compared with a threshold without trigonometric functions.
+
+    Parameters
+    ----------
+    x_lon, y_lat : numpy.ndarray
+        Longitudes and latitudes in radians.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (..., 3) holding the unit vectors.
+    """
+    cos_lat = np.cos(y_lat)
+    return np.stack([cos_lat * np.cos(x_lon), cos_lat * np.sin(x_lon), np.sin(y_lat)], axis=-1)
+
+
+def _arrange(points_a, points_b, mode, geo_reference_system, coordinates_unit):
+    """
+    Extracts the coordinates of points_a and points_b and arranges them for broadcasting according to mode.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode needs to be one of {MODES}.")
+    x_a, y_a, geo_ref_a = get_coordinates(points_a, geo_reference_system, coordinates_unit)
+    if mode == 'consecutive':
+        return x_a[:-1], y_a[:-1], x_a[1:], y_a[1:], geo_ref_a
+    x_b, y_b, geo_ref_b = get_coordinates(points_b, geo_reference_system, coordinates_unit)
+    if geo_ref_a != geo_ref_b:
+        raise ValueError("Both point sets need to have the same geo_reference_system.")
+    if mode == 'one_to_many':
+        if x_a.size != 1:
+            raise ValueError("In 'one_to_many' mode, points_a needs to be a single point.")
+        x_a, y_a = x_a.reshape(()), y_a.reshape(())
+    elif mode == 'matrix':
+        x_a, y_a = x_a[:, np.newaxis], y_a[:, np.newaxis]
+    return x_a, y_a, x_b, y_b, geo_ref_a
+
+
+def haversine(lon1, lat1, lon2, lat2):
+    """
+    Computes great-circle distances in meters with the same formula and earth radius as haversine.haversine. All
+    coordinates are in radians and broadcast against each other.
+
+    Parameters
+    ----------
+    lon1, lat1, lon2, lat2 : numpy.ndarray or float
+        Longitudes and latitudes of the start and end points in radians.
+
+    Returns
+    -------
+    numpy.ndarray
+        The distances in meters.
+    """
+    d = np.sin((lat2 - lat1) * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5) ** 2
+    return 2 * HAVERSINE_EARTH_RADIUS * np.arcsin(np.sqrt(d))
+
+
+def _wrap_longitude_difference(d_lon):
+    """
+    Maps longitude differences in radians onto [-pi, pi).
+    """
+    return (d_lon + np.pi) % (2 * np.pi) - np.pi
+
+
+def equirectangular(lon1, lat1, lon2, lat2):
+    """
+    Approximates great-circle distances in meters by the equirectangular projection around the mean latitude of each
+    pair of points. All coordinates are in radians and broadcast against each other.
+
+    Parameters
+    ----------
+    lon1, lat1, lon2, lat2 : numpy.ndarray or float
+        Longitudes and latitudes of the start and end points in radians.
+
+    Returns
+    -------
+    numpy.ndarray
+        The approximated distances in meters.
+    """
+    d_lon = _wrap_longitude_difference(lon2 - lon1) * np.cos((lat1 + lat2) * 0.5)
+    return HAVERSINE_EARTH_RADIUS * np.hypot(d_lon, lat2 - lat1)
+
+
+def to_local(x_lon, y_lat, lon0, lat0):
+    """
+    Projects latitude and longitude coordinates (both in radians) onto a local plane around the reference point
+    (lon0, lat0). Euclidean distances in this plane approximate great-circle distances near the reference point.
+
+    Parameters
+    ----------
+    x_lon, y_lat : numpy.ndarray or float
+        Longitudes and latitudes in radians.
+    lon0, lat0 : float
+        The reference point in radians.
+
+    Returns
+    -------
+    x, y : numpy.ndarray, numpy.ndarray
+        The coordinates in the local plane in meters, east and north of the reference point.
+    """
+    return HAVERSINE_EARTH_RADIUS * math.cos(lat0) * _wrap_longitude_difference(np.subtract(x_lon, lon0)), \
+        HAVERSINE_EARTH_RADIUS * np.subtract(y_lat, lat0)
+
+
+def get_distance_error_bound(distances, max_latitude, reference_offset=0.0):
+    """
+    Returns a bound of the absolute difference between approximated and great-circle distances. For 'equirectangular'
+    distances, the error is below d * (d / R)^2 / (4 cos^2(max_latitude)), where d is the distance and R the earth
+    radius, i.e. below 0.1 mm for d = 500 m at 60 degrees latitude. In a 'local' projection, the error grows by
+    2 d tan(max_latitude) reference_offset, i.e. by 0.1 mm for d = 500 m at 60 degrees latitude, if the points are
+    within 5 m of the reference latitude. The bound was validated on millions of random point pairs with a safety
+    factor of at least two.
+
+    Parameters
+    ----------
+    distances : numpy.ndarray or float
+        The approximated distances in meters.
+    max_latitude : float
+        The maximal absolute latitude in radians of all points involved, including the reference point.
+    reference_offset : float
+        For 'local' distances, the maximal absolute latitude difference in radians between the points and the
+        reference point.
+
+    Returns
+    -------
+    numpy.ndarray
+        The error bounds in meters. Beyond APPROXIMATION_MAX_LATITUDE and APPROXIMATION_MAX_DISTANCE_M, no bound is
+        guaranteed and the bound is infinite.
+    """
+    if max_latitude > APPROXIMATION_MAX_LATITUDE:
+        return np.full(np.shape(distances), np.inf)
+    distances = np.asarray(distances, dtype=np.float64)
+    cos_lat = math.cos(max_latitude)
+    relative_error = (distances / HAVERSINE_EARTH_RADIUS) ** 2 / (4 * cos_lat ** 2) + \
+        2 * math.tan(max_latitude) * reference_offset
+    bounds = DISTANCE_TOLERANCE_M + distances * relative_error
+    return np.where(distances <= APPROXIMATION_MAX_DISTANCE_M, bounds, np.inf)
+
+
+def classify_distances(distances, threshold, error_bounds=0.0):
+    """
+    Compares distances with a threshold, taking their error bounds and the tolerance between haversine and
+    point.get_distance into account.
+
+    Parameters
+    ----------
+    distances : numpy.ndarray
+        The haversine or approximated distances in meters.
+    threshold : float
+        The distance threshold in meters.
+    error_bounds : numpy.ndarray or float
+        The error bounds of the distances, 0 for haversine distances.
+
+    Returns
+    -------
+    within, undecided : numpy.ndarray, numpy.ndarray
+        Boolean masks of the distances, which are certainly at most threshold, and of those, which need to be
+        re-evaluated exactly. All other distances are certainly above threshold.
+    """
+    margin = DISTANCE_TOLERANCE_M + threshold * DISTANCE_TOLERANCE_REL + error_bounds
+    undecided = np.abs(distances - threshold) <= margin
+    return (distances < threshold) & ~undecided, undecided
+
+
+def get_distances(points_a, points_b=None, mode='pairwise', geo_reference_system='latlon',
+                  coordinates_unit='radians', method='haversine'):
+    """
+    Calculates distances between many points at once. See the module docstring for the supported modes and methods.
+
+    Parameters
+    ----------
+    points_a : array_like, Route or Trajectory
+        The start points.
+    points_b : array_like, Route or Trajectory, optional
+        The end points. Not used in 'consecutive' mode.
+    mode : {'pairwise', 'consecutive', 'one_to_many', 'matrix'}
+        How points of points_a and points_b are paired.
+    geo_reference_system : {'latlon', 'cartesian'}
+        The geo reference system of array inputs.
+    coordinates_unit : {'radians', 'degrees'}
+        The coordinates unit of array inputs.
+    method : {'haversine', 'equirectangular', 'local'}
+        How distances between 'latlon' points are computed. 'local' projects the end points onto the plane around their
+        start point.
+
+    Returns
+    -------
+    distances : numpy.ndarray
+        The distances in meters ('latlon') or in coordinate units ('cartesian').
+    """
+    if method not in DISTANCE_METHODS:
+        raise ValueError(f"method needs to be one of {DISTANCE_METHODS}.")
+    return _get_distances(*_arrange(points_a, points_b, mode, geo_reference_system, coordinates_unit), method)
+
+
+def _get_distances(x_a, y_a, x_b, y_b, geo_reference_system, method='haversine'):
+    """
+    Computes the distances between coordinate arrays (in radians for 'latlon'), which are broadcast against each other.
+    """
+    if geo_reference_system == 'latlon':
+        if method == 'equirectangular':
+            return equirectangular(x_a, y_a, x_b, y_b)
+        if method == 'local':
+            d_lon = HAVERSINE_EARTH_RADIUS * np.cos(y_a) * _wrap_longitude_difference(x_b - x_a)
+            return np.hypot(d_lon, HAVERSINE_EARTH_RADIUS * (y_b - y_a))
+        return haversine(x_a, y_a, x_b, y_b)
+    return np.hypot(x_b - x_a, y_b - y_a)
+
+
+def get_bearings(points_a, points_b=None, mode='pairwise', geo_reference_system='latlon',
+                 coordinates_unit='radians'):
+    """
+    Calculates the initial bearings between many start and end points at once. See the module docstring for the
+    supported modes.
+
+    Parameters
+    ----------
+    points_a : array_like, Route or Trajectory
+        The start points in 'latlon' format.
+    points_b : array_like, Route or Trajectory, optional
+        The end points in 'latlon' format. Not used in 'consecutive' mode.
+    mode : {'pairwise', 'consecutive', 'one_to_many', 'matrix'}
+        How points of points_a and points_b are paired.
+    geo_reference_system : {'latlon', 'cartesian'}
+        The geo reference system of array inputs.
+    coordinates_unit : {'radians', 'degrees'}
+        The coordinates unit of array inputs.
+
+    Returns
+    -------
+    bearings : numpy.ndarray
+        The initial bearings in radian.
+    """
+    lon1, lat1, lon2, lat2, geo_ref = _arrange(points_a, points_b, mode, geo_reference_system, coordinates_unit)
+    if geo_ref != 'latlon':
+        raise ValueError("Both point sets need to be in 'latlon' format.")
+    cos_lat2 = np.cos(lat2)
+    return np.arctan2(np.sin(lon2 - lon1) * cos_lat2,
+                      np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * cos_lat2 * np.cos(lon2 - lon1))
+
+
+def get_kinematics(points, timestamps=None, interval=None, geo_reference_system='latlon', coordinates_unit='radians'):
+    """
+    Calculates the motion along a sequence of points segment by segment, i.e. between consecutive points, in one pass.
+    The durations of the segments are taken from timestamps, or from interval if it is given.
+
+    Segments without elapsed time have an infinite speed, or NaN if their points coincide as well.
+
+    Parameters
+    ----------
+    points : array_like, Route or Trajectory
+        The points in chronological order.
+    timestamps : array_like, optional
+        The timestamps of the points as int64 nanoseconds since epoch.
+    interval : float, optional
+        A fixed time between consecutive points in seconds, overriding timestamps.
+    geo_reference_system : {'latlon', 'cartesian'}
+        The geo reference system of array inputs.
+    coordinates_unit : {'radians', 'degrees'}
+        The coordinates unit of array inputs.
+
+    Returns
+    -------
+    Kinematics
+        A named tuple of numpy arrays holding, for n points,
+            distances: the n - 1 segment lengths in meters ('latlon') or coordinate units ('cartesian'),
+            durations: the n - 1 segment durations in seconds,
+            speeds: the n - 1 segment speeds in meters (or coordinate units) per second,
+            accelerations: the n - 2 changes of speed between consecutive segments divided by the time between the
+                centers of the segments, in meters (or coordinate units) per second squared,
+            bearings: the n - 1 initial bearings of the segments in radian, for 'cartesian' points the angle
+                clockwise from the y-axis.
+    """
+    x_lon, y_lat, geo_ref = get_coordinates(points, geo_reference_system, coordinates_unit)
+    n = len(x_lon)
+    if interval is not None:
+        durations = np.full(max(n - 1, 0), float(interval))
+    elif timestamps is not None:
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if len(timestamps) != n:
+            raise ValueError("Timestamps and points need to be of same length.")
+        durations = np.diff(timestamps) / 1e9
+    else:
+        raise ValueError("The durations of the segments require timestamps or an interval.")
+    if geo_ref == 'latlon':
+        distances = haversine(x_lon[:-1], y_lat[:-1], x_lon[1:], y_lat[1:])
+        bearings = get_bearings(np.stack([x_lon, y_lat], axis=-1), mode='consecutive')
+    else:
+        d_x, d_y = np.diff(x_lon), np.diff(y_lat)
+        distances = np.hypot(d_x, d_y)
+        bearings = np.arctan2(d_x, d_y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        speeds = distances / durations
+        accelerations = np.diff(speeds) / ((durations[:-1] + durations[1:]) * 0.5)
+    return Kinematics(distances, durations, speeds, accelerations, bearings)
+
+
+def get_speed_percentile(speeds, percentile=100):
+    """
+    Returns a percentile of segment speeds, ignoring NaN speeds. Percentiles below 100 are robust against single
+    outliers, e.g. GPS jumps, in contrast to the maximum.
+
+    Parameters
+    ----------
+    speeds : numpy.ndarray
+        The segment speeds, see get_kinematics.
+    percentile : float
+        The percentile in [0, 100]. 100 returns the maximum speed. Otherwise the smallest speed that is greater than or
+        equal to percentile percent of the speeds is returned.
+
+    Returns
+    -------
+    float
+        The percentile of the speeds, or 0 if there are no speeds.
+    """
+    speeds = speeds[~np.isnan(speeds)]
+    if len(speeds) == 0:
+        return 0.0
+    if percentile == 100:
+        return float(speeds.max())
+    # without interpolation, infinite speeds do not turn into NaN
+    return float(np.percentile(speeds, percentile, method='higher'))
+
+
+def add_vectors(points, distances, angles, geo_reference_system='latlon', coordinates_unit='radians'):
+    """
+    Calculates the destination points when vectors, defined by their lengths and angles, are added to points. Points,
+    distances and angles broadcast against each other, e.g. a single point can be moved by many vectors.
+
+    Parameters
+    ----------
+    points : array_like, Route or Trajectory
+        The start points in 'latlon' format.
+    distances : array_like
+        Vector lengths in meters.
+    angles : array_like
+        Angles of the vectors in radian.
+    geo_reference_system : {'latlon', 'cartesian'}
+        The geo reference system of array inputs.
+    coordinates_unit : {'radians', 'degrees'}
+        The coordinates unit of array inputs.
+
+    Returns
+    -------
+    destinations : numpy.ndarray
+        Array of shape (..., 2) holding the [x_lon, y_lat] destination coordinates in radians.
+    """
+    x_lon, y_lat, geo_ref = get_coordinates(points, geo_reference_system, coordinates_unit)
+    if geo_ref != 'latlon':
+        raise NotImplementedError("Adding a vector onto a cartesian point is not available.")
+    angular_distance = np.asarray(distances, dtype=np.float64) / EARTH_RADIUS
+    angles = np.asarray(angles, dtype=np.float64)
+    sin_lat, cos_lat = np.sin(y_lat), np.cos(y_lat)
+    sin_ad, cos_ad = np.sin(angular_distance), np.cos(angular_distance)
+    latitude = np.arcsin(sin_lat * cos_ad + cos_lat * sin_ad * np.cos(angles))
+    longitude = x_lon + np.arctan2(np.sin(angles) * sin_ad * cos_lat, cos_ad - sin_lat * np.sin(latitude))
+    # normalize to [-180,180]
+    longitude = (longitude + 3 * np.pi) % (2 * np.pi) - np.pi
+    longitude, latitude = np.broadcast_arrays(longitude, latitude)
+    return np.stack([longitude, latitude], axis=-1)
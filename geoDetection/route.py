@@ -2,16 +2,28 @@
 """
 import warnings
 
-import torch
 import numpy as np
-from geoDetection.point import Point, get_distance
+from geoDetection.lazy_import import LazyModule
+from geoDetection.point import Point
 from geoDetection.point_t import PointT
+from geoDetection import point_vector as pv
+
+torch = LazyModule('torch', 'converting routes from and to tensors')
+pd = LazyModule('pandas', 'reading and exporting data frames')
 
 
 
 
 class Route(list):
     """A route indicating a sequence of points. If timestamps are given for each point, the route is sorted by time.
+
+    The route keeps track of the number of its points without timestamp, so has_timestamps is O(1), and keeps routes
+    with timestamps sorted incrementally: appending a point in chronological order is O(1), other points are inserted
+    at their position found by binary search.
+
+    The geo reference system and the coordinates unit are not cached, as points can be converted in place (e.g. with
+    Point.to_cartesian_) while they are part of a route. get_geo_reference_system and get_coordinates_unit check all
+    points, append only compares with the first point.
     """
 
     def has_timestamps(self):
@@ -23,13 +35,7 @@ class Route(list):
         bool
             True, if route is not empty and points have timestamps, else False.
         """
-        has_timestamps = False
-        if len(self) > 0:
-            has_timestamps = True
-            for point in self:
-                if not isinstance(point, PointT):
-                    has_timestamps = False
-        return has_timestamps
+        return len(self) > 0 and self._untimed_points == 0
 
     def get_coordinates_unit(self):
         """
@@ -87,6 +93,7 @@ class Route(list):
         """
         # initialize with empty list
         super().__init__()
+        self._untimed_points = 0
         if route is not None:
             # set list items if any
             super().__init__(route)
@@ -113,7 +120,8 @@ class Route(list):
                                         f"the provided points.")
                     if timestamps is not None:
                         point = PointT(point, timestamps[idx])
-                self.__setitem__(idx, point)
+                super().__setitem__(idx, point)
+            self._untimed_points = self._count_untimed_points(self)
             # make sure that provided points do have the same coordinates unit and geo reference system
             self.get_coordinates_unit()
             self.get_geo_reference_system()
@@ -121,6 +129,54 @@ class Route(list):
             if self.has_timestamps():
                 self.sort_by_time()
 
+    def __reduce__(self):
+        # rebuild copies and unpickled routes through __init__, so the bookkeeping is restored as well
+        return self.__class__, (list(self),)
+
+    @staticmethod
+    def _count_untimed_points(points):
+        return sum(1 for point in points if not isinstance(point, PointT))
+
+    def _find_insert_position(self, timestamp, right=True):
+        """
+        Returns the position right (or left) of all points with a timestamp (in nanoseconds since epoch) equal to
+        timestamp, by binary search.
+        """
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_timestamp = list.__getitem__(self, mid).timestamp_ns
+            if timestamp < mid_timestamp or (not right and timestamp == mid_timestamp):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _restore_order(self, idx):
+        """
+        Moves the point at position idx to its chronological position, if the route has timestamps.
+        """
+        if not self.has_timestamps():
+            return
+        point = list.__getitem__(self, idx)
+        # like a stable sort, a point moving left passes equal timestamps, a point moving right stops before them
+        if idx > 0 and list.__getitem__(self, idx - 1).timestamp_ns > point.timestamp_ns:
+            super().__delitem__(idx)
+            super().insert(self._find_insert_position(point.timestamp_ns, right=True), point)
+        elif idx < len(self) - 1 and list.__getitem__(self, idx + 1).timestamp_ns < point.timestamp_ns:
+            super().__delitem__(idx)
+            super().insert(self._find_insert_position(point.timestamp_ns, right=False), point)
+
+    def _remove_untimed_points(self, count):
+        """
+        Updates the bookkeeping after count points without timestamp have been removed. If only points with timestamp
+        remain, they are sorted.
+        """
+        if count:
+            self._untimed_points -= count
+            if self.has_timestamps():
+                self.sort_by_time()
+
     def __setitem__(self, key, value):
         """
         Sets the value of the point at position key.
@@ -137,9 +193,69 @@ class Route(list):
         Route
             The modified route instance.
         """
+        if isinstance(key, slice):
+            values = [point if isinstance(point, Point) else Point(point) for point in value]
+            self._untimed_points += self._count_untimed_points(values) - \
+                self._count_untimed_points(list.__getitem__(self, key))
+            super().__setitem__(key, values)
+            if self.has_timestamps():
+                self.sort_by_time()
+            return self
         if not isinstance(value, Point):
             value = Point(value)
+        had_timestamps = self.has_timestamps()
+        self._untimed_points += (not isinstance(value, PointT)) - (not isinstance(list.__getitem__(self, key), PointT))
         super().__setitem__(key, value)
+        if had_timestamps:
+            self._restore_order(key if key >= 0 else key + len(self))
+        elif self.has_timestamps():
+            self.sort_by_time()
+        return self
+
+    def __delitem__(self, key):
+        removed = list.__getitem__(self, key)
+        super().__delitem__(key)
+        self._remove_untimed_points(self._count_untimed_points(removed) if isinstance(key, slice) else
+                                    int(not isinstance(removed, PointT)))
+
+    def pop(self, index=-1):
+        point = super().pop(index)
+        self._remove_untimed_points(int(not isinstance(point, PointT)))
+        return point
+
+    def remove(self, value):
+        self.__delitem__(self.index(value))
+
+    def clear(self):
+        super().clear()
+        self._untimed_points = 0
+
+    def insert(self, index, value):
+        """
+        Inserts a point at position index. If the route has timestamps, the point is moved to its chronological
+        position instead.
+        """
+        if not isinstance(value, Point):
+            value = Point(value)
+        super().insert(index, value)
+        self._untimed_points += not isinstance(value, PointT)
+        index = min(max(index if index >= 0 else index + len(self) - 1, 0), len(self) - 1)
+        self._restore_order(index)
+
+    def extend(self, values):
+        """
+        Appends all points of values to this route, see append.
+        """
+        for value in values:
+            self.append(value)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, value):
+        super().__imul__(value)
+        self._untimed_points = self._count_untimed_points(self)
         if self.has_timestamps():
             self.sort_by_time()
         return self
@@ -161,6 +277,192 @@ class Route(list):
         """
         return cls(tensor.detach().numpy().tolist())
 
+    @classmethod
+    def from_trajectory(cls, trajectory):
+        """
+        Create a Route object from a Trajectory. The trajectory's columns have already been validated, so the points
+        are built without per-point validation and the route is not sorted again.
+
+        Parameters
+        ----------
+        trajectory : Trajectory
+            The trajectory which is to be transformed into a Route object.
+
+        Returns
+        -------
+        Route
+            The trajectory transformed into a Route object.
+        """
+        geo_reference_system = trajectory.get_geo_reference_system()
+        coordinates_unit = trajectory.get_coordinates_unit()
+        names = trajectory.measurement_type_names
+        measurement_values = [None if np.isnan(value) else value for value in trajectory.measurement_values.tolist()]
+        measurement_types = [None if code < 0 else names[code] for code in trajectory.measurement_type_codes.tolist()]
+        columns = zip(trajectory.x_lon.tolist(), trajectory.y_lat.tolist(), measurement_values, measurement_types)
+        if trajectory.timestamps is not None:
+            timezone = trajectory.timezone
+            if timezone is not None:
+                timezone = pd.Timestamp(0, tz=timezone).tz
+            points = [PointT.from_validated(x_lon, y_lat, geo_reference_system, coordinates_unit, value, type,
+                                            timestamp, timezone)
+                      for (x_lon, y_lat, value, type), timestamp in zip(columns, trajectory.timestamps.tolist())]
+        else:
+            points = [Point.from_validated(x_lon, y_lat, geo_reference_system, coordinates_unit, value, type)
+                      for x_lon, y_lat, value, type in columns]
+        route = cls()
+        list.extend(route, points)
+        route._untimed_points = 0 if trajectory.timestamps is not None else len(points)
+        return route
+
+    @classmethod
+    def from_arrays(cls, x_lon, y_lat, timestamps=None, measurement_values=None, measurement_types=None,
+                    geo_reference_system='latlon', coordinates_unit='radians'):
+        """
+        Create a Route object from coordinate, timestamp and measurement arrays. The coordinates are validated once
+        per column and the route is sorted by timestamp once.
+
+        Parameters
+        ----------
+        x_lon, y_lat : array_like
+            The x-coordinates respectively longitudes and the y-coordinates respectively latitudes of the points.
+        timestamps : array_like, optional
+            The timestamps of the points.
+        measurement_values : array_like, optional
+            The measurement values of the points.
+        measurement_types : array_like, optional
+            The measurement types of the points.
+        geo_reference_system : {'latlon', 'cartesian'}
+            Geographical reference system of the coordinates.
+        coordinates_unit : {'radians', 'degrees'}
+            The coordinates unit of the points.
+
+        Returns
+        -------
+        Route
+            The new route.
+        """
+        from geoDetection.trajectory import Trajectory
+        return cls.from_trajectory(Trajectory(x_lon, y_lat, timestamps, measurement_values, measurement_types,
+                                              geo_reference_system, coordinates_unit))
+
+    @classmethod
+    def from_dataframe(cls, data_frame, x_lon='x_lon', y_lat='y_lat', timestamp='timestamp',
+                       measurement_value='measurement_value', measurement_type='measurement_type',
+                       geo_reference_system='latlon', coordinates_unit='radians'):
+        """
+        Create a Route object from the columns of a pandas.DataFrame. Columns for timestamps and measurements are
+        optional and ignored if they are missing.
+
+        Parameters
+        ----------
+        data_frame : pandas.DataFrame
+            The data frame holding one point per row.
+        x_lon, y_lat, timestamp, measurement_value, measurement_type : str
+            The names of the columns holding the coordinates, timestamps and measurements.
+        geo_reference_system : {'latlon', 'cartesian'}
+            Geographical reference system of the coordinates.
+        coordinates_unit : {'radians', 'degrees'}
+            The coordinates unit of the points.
+
+        Returns
+        -------
+        Route
+            The new route.
+        """
+        def optional_column(name):
+            return data_frame[name].to_numpy() if name in data_frame.columns else None
+
+        return cls.from_arrays(data_frame[x_lon].to_numpy(dtype=np.float64),
+                               data_frame[y_lat].to_numpy(dtype=np.float64),
+                               data_frame[timestamp] if timestamp in data_frame.columns else None,
+                               optional_column(measurement_value), optional_column(measurement_type),
+                               geo_reference_system, coordinates_unit)
+
+    @classmethod
+    def read_parquet(cls, path, x_lon='x_lon', y_lat='y_lat', timestamp='timestamp',
+                     measurement_value='measurement_value', measurement_type='measurement_type',
+                     geo_reference_system='latlon', coordinates_unit='radians'):
+        """
+        Create a Route object from a Parquet file, reading only the needed columns. See from_dataframe.
+
+        Parameters
+        ----------
+        path : str
+            The path of the Parquet file.
+        x_lon, y_lat, timestamp, measurement_value, measurement_type : str
+            The names of the columns holding the coordinates, timestamps and measurements.
+        geo_reference_system : {'latlon', 'cartesian'}
+            Geographical reference system of the coordinates.
+        coordinates_unit : {'radians', 'degrees'}
+            The coordinates unit of the points.
+
+        Returns
+        -------
+        Route
+            The new route.
+        """
+        import pyarrow.parquet as pq
+        names = [x_lon, y_lat, timestamp, measurement_value, measurement_type]
+        available_columns = set(pq.read_schema(path).names)
+        data_frame = pd.read_parquet(path, columns=[name for name in names if name in available_columns])
+        return cls.from_dataframe(data_frame, *names, geo_reference_system, coordinates_unit)
+
+    @classmethod
+    def read_csv(cls, path, x_lon='x_lon', y_lat='y_lat', timestamp='timestamp',
+                 measurement_value='measurement_value', measurement_type='measurement_type',
+                 geo_reference_system='latlon', coordinates_unit='radians', **kwargs):
+        """
+        Create a Route object from a CSV file, reading only the needed columns. See from_dataframe.
+
+        Parameters
+        ----------
+        path : str
+            The path of the CSV file.
+        x_lon, y_lat, timestamp, measurement_value, measurement_type : str
+            The names of the columns holding the coordinates, timestamps and measurements.
+        geo_reference_system : {'latlon', 'cartesian'}
+            Geographical reference system of the coordinates.
+        coordinates_unit : {'radians', 'degrees'}
+            The coordinates unit of the points.
+        **kwargs
+            Further arguments passed to pandas.read_csv.
+
+        Returns
+        -------
+        Route
+            The new route.
+        """
+        names = [x_lon, y_lat, timestamp, measurement_value, measurement_type]
+        data_frame = pd.read_csv(path, usecols=lambda column: column in names, **kwargs)
+        return cls.from_dataframe(data_frame, *names, geo_reference_system, coordinates_unit)
+
+    def to_numpy(self):
+        """
+        Returns the coordinates of this route's points as an array.
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of shape (len(self), 2) holding the [x_lon, y_lat] coordinates.
+        """
+        coordinates = np.empty((len(self), 2))
+        coordinates[:, 0] = np.fromiter((point.x_lon for point in self), dtype=np.float64, count=len(self))
+        coordinates[:, 1] = np.fromiter((point.y_lat for point in self), dtype=np.float64, count=len(self))
+        return coordinates
+
+    def to_dataframe(self):
+        """
+        Returns the points of this route as a pandas.DataFrame.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A data frame with the columns 'x_lon', 'y_lat', 'timestamp' (if the route has timestamps),
+            'measurement_value' and 'measurement_type'.
+        """
+        from geoDetection.trajectory import Trajectory
+        return Trajectory.from_route(self).to_dataframe()
+
     def append(self, value):
         """
         Appends a point to this route.
@@ -183,26 +485,32 @@ class Route(list):
             if not isinstance(value, Point):
                 value = Point(value)
         else:
+            # the points of a route share their geo reference system and unit, so the first point represents them
+            first_point = list.__getitem__(self, 0)
+            route_geo_reference_system = first_point.get_geo_reference_system()
+            route_coordinates_unit = first_point.get_coordinates_unit()
             if route_has_timestamps and not isinstance(value, PointT):
                 raise Exception('Cannot append a point without a timestamp to a route that has timestamps.')
             if not route_has_timestamps and isinstance(value, PointT):
                 warnings.warn('A point with timestamp was added onto a route without timestamps. The point will be '
                               'appended but the timestamp is removed.')
             if not isinstance(value, Point):
-                value = Point(value, coordinates_unit=self.get_coordinates_unit())
-            if isinstance(value, Point) and value.get_geo_reference_system() != self.get_geo_reference_system():
+                value = Point(value, coordinates_unit=route_coordinates_unit)
+            if isinstance(value, Point) and value.get_geo_reference_system() != route_geo_reference_system:
                 raise Exception(f"Point with geo reference system '{value.get_geo_reference_system()}' cannot be "
-                                f"appended to a route with geo reference system '{self.get_geo_reference_system()}'.")
-            if isinstance(value, Point) and value.get_coordinates_unit() != self.get_coordinates_unit():
+                                f"appended to a route with geo reference system '{route_geo_reference_system}'.")
+            if isinstance(value, Point) and value.get_coordinates_unit() != route_coordinates_unit:
                 warnings.warn(f'Point had differing coordinates_unit than the route it was to be appended to. The '
-                              f"point was converted to '{self.get_coordinates_unit()}' before appending.")
-                if self.get_coordinates_unit() == 'degrees':
+                              f"point was converted to '{route_coordinates_unit}' before appending.")
+                if route_coordinates_unit == 'degrees':
                     value = value.to_degrees()
                 else:
                     value = value.to_radians()
-        super().append(value)
-        if self.has_timestamps():
-            self.sort_by_time()
+        self._untimed_points += not isinstance(value, PointT)
+        if self.has_timestamps() and len(self) > 0 and value.timestamp_ns < list.__getitem__(self, -1).timestamp_ns:
+            super().insert(self._find_insert_position(value.timestamp_ns, right=True), value)
+        else:
+            super().append(value)
         return self
 
     def scale(self, scale_values):
@@ -287,12 +595,13 @@ class Route(list):
         if len(self) > 0:
             if not isinstance(self[0], PointT):
                 raise Exception("sort_by_time only applies to routes with items of type PointT.")
-        self.sort(key=lambda item: item.timestamp)
+        self.sort(key=lambda item: item.timestamp_ns)
         return self
 
     def deep_copy(self):
         """
-        Creates a deep copy of this route preserving its properties.
+        Creates a deep copy of this route preserving its properties. The points are copied in bulk, without validating
+        or sorting them again.
 
         Returns
         -------
@@ -300,8 +609,8 @@ class Route(list):
             A deep copy of this route.
         """
         route_copy = Route()
-        for point in self:
-            route_copy.append(point.deep_copy())
+        list.extend(route_copy, [point.deep_copy() for point in self])
+        route_copy._untimed_points = self._untimed_points
         return route_copy
 
     def get_timestamps(self):
@@ -340,6 +649,97 @@ class Route(list):
             raise KeyError("idx is not valid. The route contains" + str(len(self)) + "points.")
         return self
 
+    def _get_homogeneous_metadata(self):
+        """
+        Returns the geo reference system and coordinates unit shared by all points of this route, or None if the
+        route is empty or its points differ.
+        """
+        if len(self) == 0:
+            return None
+        first_point = list.__getitem__(self, 0)
+        geo_reference_system = first_point.get_geo_reference_system()
+        coordinates_unit = first_point.get_coordinates_unit()
+        for point in self:
+            if point.get_geo_reference_system() != geo_reference_system or \
+                    point.get_coordinates_unit() != coordinates_unit:
+                return None
+        return geo_reference_system, coordinates_unit
+
+    def _get_conversion(self, target, ignore_warnings):
+        """
+        Checks whether this route can be converted into target ('cartesian', 'latlon', 'radians' or 'degrees') as a
+        whole and returns the vectorized conversion function and the resulting metadata. Returns None if no conversion
+        is needed, and False if the points need to be converted one by one, because their metadata differs.
+        """
+        metadata = self._get_homogeneous_metadata()
+        if metadata is None:
+            return None if len(self) == 0 else False
+        geo_reference_system, coordinates_unit = metadata
+        if target == 'cartesian':
+            if coordinates_unit == 'degrees':
+                raise ValueError("When converting into cartesian, the coordinates unit of a point needs to be in "
+                                 "'radians' format.")
+            if geo_reference_system == 'latlon':
+                return pv.to_cartesian, 'cartesian', coordinates_unit
+            if not ignore_warnings:
+                warnings.warn("Geo reference system is already cartesian.")
+        elif target == 'latlon':
+            if geo_reference_system == 'cartesian':
+                return pv.to_latlon, 'latlon', coordinates_unit
+            if not ignore_warnings:
+                warnings.warn("Geo reference system is already latlon.")
+        else:
+            if geo_reference_system != 'latlon':
+                raise ValueError("The coordinates can only be converted if the geo reference system is 'latlon.")
+            if coordinates_unit != target:
+                convert = np.degrees if target == 'degrees' else np.radians
+                return (lambda x_lon, y_lat: (convert(x_lon), convert(y_lat))), geo_reference_system, target
+            if not ignore_warnings:
+                warnings.warn(f"Coordinates unit is already '{target}'.")
+        return None
+
+    def _convert_(self, target, ignore_warnings):
+        """
+        Converts the coordinates of all points of this route into target in a single array operation.
+        """
+        conversion = self._get_conversion(target, ignore_warnings)
+        if conversion is False:
+            for point in self:
+                getattr(point, f'to_{target}_')(ignore_warnings)
+        elif conversion is not None:
+            convert, geo_reference_system, coordinates_unit = conversion
+            coordinates = self.to_numpy()
+            x_lon, y_lat = convert(coordinates[:, 0], coordinates[:, 1])
+            for point, x, y in zip(self, x_lon.tolist(), y_lat.tolist()):
+                point.set_validated_(x, y, geo_reference_system, coordinates_unit)
+
+    def _convert(self, target, ignore_warnings):
+        """
+        Returns a copy of this route with the coordinates of all points converted into target. The copy is built from
+        the converted coordinate arrays instead of a deep copy of this route.
+        """
+        conversion = self._get_conversion(target, ignore_warnings)
+        if conversion is False:
+            route_copy = self.deep_copy()
+            route_copy._convert_(target, ignore_warnings)
+            return route_copy
+        if conversion is None:
+            return self.deep_copy()
+        convert, geo_reference_system, coordinates_unit = conversion
+        coordinates = self.to_numpy()
+        x_lon, y_lat = convert(coordinates[:, 0], coordinates[:, 1])
+        # every point keeps its type, timestamps are passed on in nanoseconds like in deep_copy
+        points = [PointT.from_validated(x, y, geo_reference_system, coordinates_unit, point.measurement_value,
+                                        point.measurement_type, point.timestamp_ns, point.get_timezone())
+                  if isinstance(point, PointT) else
+                  Point.from_validated(x, y, geo_reference_system, coordinates_unit, point.measurement_value,
+                                       point.measurement_type)
+                  for point, x, y in zip(self, x_lon.tolist(), y_lat.tolist())]
+        route_copy = Route()
+        list.extend(route_copy, points)
+        route_copy._untimed_points = self._untimed_points
+        return route_copy
+
     def to_cartesian(self, ignore_warnings=False):
         """
         Returns a copy of this route with each point of the route converted from a 'latlon' to a 'cartesian' geo
@@ -355,9 +755,7 @@ class Route(list):
         route_cartesian : Route
             A copy of this route with each point in a cartesian geo reference system.
         """
-        route_copy = self.deep_copy()
-        route_copy.to_cartesian_(ignore_warnings)
-        return route_copy
+        return self._convert('cartesian', ignore_warnings)
 
     def to_cartesian_(self, ignore_warnings=False):
         """
@@ -368,8 +766,7 @@ class Route(list):
         ignore_warnings : bool
             If True, no warning is thrown, when the geo reference system is already 'cartesian'.
         """
-        for point in self:
-            point.to_cartesian_(ignore_warnings)
+        self._convert_('cartesian', ignore_warnings)
 
     def to_latlon(self, ignore_warnings=False):
         """
@@ -386,9 +783,7 @@ class Route(list):
         route_cartesian : Route
             A copy of this route with each point in a latlon geo reference system.
         """
-        route_copy = self.deep_copy()
-        route_copy.to_latlon_(ignore_warnings)
-        return route_copy
+        return self._convert('latlon', ignore_warnings)
 
     def to_latlon_(self, ignore_warnings=False):
         """
@@ -399,8 +794,7 @@ class Route(list):
         ignore_warnings : bool
             If True, no warning is thrown, when the geo reference system is already 'latlon'.
         """
-        for point in self:
-            point.to_latlon_(ignore_warnings)
+        self._convert_('latlon', ignore_warnings)
 
     def to_radians_(self, ignore_warnings=False):
         """
@@ -413,8 +807,7 @@ class Route(list):
         ignore_warnings : bool
             If True, no warning is thrown, when the coordinates unit is already 'radians'.
         """
-        for point in self:
-            point.to_radians_(ignore_warnings)
+        self._convert_('radians', ignore_warnings)
 
     def to_radians(self, ignore_warnings=False):
         """
@@ -432,9 +825,7 @@ class Route(list):
             A copy of this route where the coordinates have been converted into 'radians' if the unit is 'degrees' and
             the geo_reference_system of its points is 'latlon'.
         """
-        route_copy = self.deep_copy()
-        route_copy.to_radians_(ignore_warnings)
-        return route_copy
+        return self._convert('radians', ignore_warnings)
 
     def to_degrees_(self, ignore_warnings=False):
         """
@@ -447,8 +838,7 @@ class Route(list):
         ignore_warnings : bool
             If True, no warning is thrown, when the coordinates unit is already 'degrees'.
         """
-        for point in self:
-            point.to_degrees_(ignore_warnings)
+        self._convert_('degrees', ignore_warnings)
 
     def to_degrees(self, ignore_warnings=False):
         """
@@ -466,33 +856,124 @@ class Route(list):
             A copy of this route where the coordinates have been converted into 'degrees' if the unit is 'radians' and
             the geo_reference_system of its points is 'latlon'.
         """
-        route_copy = self.deep_copy()
-        route_copy.to_degrees_(ignore_warnings)
-        return route_copy
+        return self._convert('degrees', ignore_warnings)
+
+    def segment_distances(self):
+        """
+        Returns the distances between consecutive route points.
 
-    def max_speed(self, time_between_route_points):
+        Returns
+        -------
+        numpy.ndarray
+            len(self) - 1 distances, in meters for 'latlon' routes and in coordinate units for 'cartesian' ones.
+        """
+        return pv.get_distances(self, mode='consecutive')
+
+    def get_kinematics(self, time_between_route_points=None):
+        """
+        Returns the segment distances, durations, speeds, accelerations and bearings of this route, computed in one
+        vectorized pass, see point_vector.get_kinematics. The durations are taken from the timestamps of the route
+        points, unless time_between_route_points is given.
+
+        Parameters
+        ----------
+        time_between_route_points : pd.Timedelta, optional
+            A fixed time between consecutive route points. Required, if the route has no timestamps.
+
+        Returns
+        -------
+        pv.Kinematics
+            A named tuple of numpy arrays with the distances, durations, speeds, accelerations and bearings.
         """
-        Returns the maximum speed in kilometers per hour of the taxi when driving this route, assuming that the time
+        interval = None
+        timestamps = None
+        if time_between_route_points is not None:
+            interval = time_between_route_points.total_seconds()
+        elif self.has_timestamps():
+            timestamps = np.fromiter((point.timestamp_ns for point in self), dtype=np.int64, count=len(self))
+        elif len(self) > 1:
+            raise ValueError("The route has no timestamps, time_between_route_points needs to be given.")
+        else:
+            interval = 0.0     # there are no segments
+        return pv.get_kinematics(self, timestamps, interval)
+
+    def max_speed(self, time_between_route_points=None, percentile=100):
+        """
+        Returns the maximum speed in kilometers per hour of the taxi when driving this route. The speeds are computed
+        from the timestamps of the route points or, if time_between_route_points is given, assuming that the time
         between consecutive route points is fixed to the indicated value.
 
         Parameters
         ----------
-        time_between_route_points : pd.Timedelta
-            The time between consecutive route points.
+        time_between_route_points : pd.Timedelta, optional
+            The time between consecutive route points. Required, if the route has no timestamps.
+        percentile : float
+            A percentile of the segment speeds to return instead of the maximum, e.g. 95 to ignore GPS jumps.
 
         Returns
         -------
         maximum_speed_kmh : float
             The maximum speed of the taxi in kilometers per hour, when driving the route.
         """
-        maximum_speed_kmh = 0
-        for i in range(len(self) - 1):
-            distance = get_distance(self[i], self[i + 1])
-            current_speed_ms = distance / time_between_route_points.total_seconds()
-            current_speed_kmh = current_speed_ms * 3_600 / 1_000
-            if current_speed_kmh > maximum_speed_kmh:
-                maximum_speed_kmh = current_speed_kmh
-        return maximum_speed_kmh
+        if len(self) < 2:
+            return 0
+        speeds_ms = self.get_kinematics(time_between_route_points).speeds
+        return max(0, pv.get_speed_percentile(speeds_ms, percentile) * 3_600 / 1_000)
+
+    def simplify(self, tolerance, synchronized=False):
+        """
+        Simplifies this route with the Douglas-Peucker algorithm, see simplification.douglas_peucker.
+
+        Parameters
+        ----------
+        tolerance : float
+            The maximal deviation of a dropped point in meters.
+        synchronized : bool
+            If True, deviations are measured from the position interpolated at the time of the point, which keeps
+            stays.
+
+        Returns
+        -------
+        Route
+            A route of the kept points.
+        """
+        from geoDetection import simplification
+        return simplification.douglas_peucker(self, tolerance, synchronized)
+
+    def resample(self, interval):
+        """
+        Downsamples this route by keeping the first point of every interval, see simplification.resample.
+
+        Parameters
+        ----------
+        interval : pd.Timedelta
+            The length of the intervals.
+
+        Returns
+        -------
+        Route
+            A route of the kept points.
+        """
+        from geoDetection import simplification
+        return simplification.resample(self, interval)
+
+    def collapse_stationary(self, epsilon):
+        """
+        Collapses every group of consecutive points within epsilon of its first point into its first and last point,
+        see simplification.collapse_stationary. The result can be passed to extract_pois directly.
+
+        Parameters
+        ----------
+        epsilon : float
+            The radius of a group in meters.
+
+        Returns
+        -------
+        Route
+            A route of the kept points.
+        """
+        from geoDetection import simplification
+        return simplification.collapse_stationary(self, epsilon)
 
     def get_average_point(self):
         """
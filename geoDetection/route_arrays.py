@@ -0,0 +1,84 @@
+"""Provides the columns of routes and trajectories as numpy arrays, and selections of their points, for the vectorized
+algorithms of stop_detection, filtering and simplification. Both route types are handled alike, so these algorithms
+take either of them.
+"""
+import numpy as np
+
+from geoDetection import route as rt
+from geoDetection.trajectory import Trajectory
+
+
+def get_route_arrays(route):
+    """
+    Returns the coordinates and timestamps of a route with timestamps in 'latlon' format as arrays.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        The route to extract the arrays from.
+
+    Returns
+    -------
+    x_lon, y_lat, x_lon_deg, y_lat_deg, timestamps : numpy.ndarray
+        The coordinates in radians, the coordinates in degrees (exactly as point.get_distance sees them) and the
+        timestamps in nanoseconds.
+    """
+    if len(route) == 0:
+        empty = np.empty(0)
+        return empty, empty, empty, empty, np.empty(0, dtype=np.int64)
+    if route.get_geo_reference_system() != 'latlon':
+        raise ValueError("The route needs to be in 'latlon' format.")
+    if isinstance(route, list):
+        raw_x = np.fromiter((point.x_lon for point in route), dtype=np.float64, count=len(route))
+        raw_y = np.fromiter((point.y_lat for point in route), dtype=np.float64, count=len(route))
+        timestamps = np.fromiter((point.timestamp_ns for point in route), dtype=np.int64, count=len(route))
+    else:
+        raw_x, raw_y, timestamps = route.x_lon, route.y_lat, route.timestamps
+    if route.get_coordinates_unit() == 'degrees':
+        return np.radians(raw_x), np.radians(raw_y), raw_x, raw_y, timestamps
+    return raw_x, raw_y, np.degrees(raw_x), np.degrees(raw_y), timestamps
+
+
+def get_timed_arrays(route):
+    """
+    Returns the coordinates and timestamps of a route, which needs to have timestamps unless it is empty.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        The route with timestamps in 'latlon' format.
+
+    Returns
+    -------
+    x_lon, y_lat, timestamps : numpy.ndarray
+        The coordinates in radians and the timestamps in nanoseconds.
+    """
+    if len(route) > 0 and not route.has_timestamps():
+        raise ValueError("The route needs to have timestamps.")
+    x_lon, y_lat, _, _, timestamps = get_route_arrays(route)
+    return x_lon, y_lat, timestamps
+
+
+def select_points(route, keep):
+    """
+    Returns the points of a route selected by a boolean mask, as an object of the same type as route. Routes keep
+    their point objects.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        The route.
+    keep : numpy.ndarray
+        True for every point to select.
+
+    Returns
+    -------
+    rt.Route or Trajectory
+        The selected points in their order in route.
+    """
+    if isinstance(route, Trajectory):
+        return route[keep]
+    # the points keep their order, so the route does not need to be sorted again
+    selected = rt.Route()
+    list.extend(selected, [point for point, kept in zip(route, keep.tolist()) if kept])
+    return selected
@@ -0,0 +1,185 @@
+"""
+Simplifies routes, so that stop detection processes fewer points. Devices often report every few seconds, while
+extract_pois only needs enough fixes to resolve stays of distance_threshold.
+
+All functions take a Route or Trajectory with timestamps in 'latlon' format and return an object of the same type,
+which holds a subset of its fixes. Routes keep their point objects.
+"""
+import numpy as np
+
+from geoDetection import point_vector as pv
+from geoDetection.lazy_import import LazyModule
+from geoDetection.route_arrays import get_timed_arrays, select_points
+
+pd = LazyModule('pandas', 'timestamps')
+
+
+def douglas_peucker(route, tolerance, synchronized=False):
+    """
+    Simplifies a route with the Douglas-Peucker algorithm: the fix deviating most from the segment between the first
+    and the last fix is kept, if it deviates more than tolerance, and both halves are simplified in the same way. All
+    segments of a level of the recursion are processed at once. The fixes are projected onto a plane around the center
+    of the route.
+
+    The spatial deviation ignores time, so fixes recorded while standing still are dropped. With synchronized, the
+    deviation of a fix is measured from the position on the segment at the time of the fix instead (the synchronized
+    euclidean distance), so stays keep their fixes at both ends and their duration.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        A route with timestamps in 'latlon' format.
+    tolerance : float
+        The maximal deviation of a dropped fix in meters.
+    synchronized : bool
+        If True, deviations are measured from the position interpolated at the time of the fix.
+
+    Returns
+    -------
+    rt.Route or Trajectory
+        The simplified route, of the same type as route.
+    """
+    if tolerance < 0:
+        raise ValueError("tolerance may not be negative.")
+    x_lon, y_lat, timestamps = get_timed_arrays(route)
+    n = len(x_lon)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return select_points(route, keep)
+    keep[[0, -1]] = True
+    x_lon = np.unwrap(x_lon)
+    center = len(x_lon) // 2
+    x, y = pv.to_local(x_lon, y_lat, float(x_lon[center]), float(y_lat[center]))
+    times = (timestamps - timestamps[0]) / 1e9
+    # all segments of a recursion level are processed at once; fixes of segments within tolerance are done
+    pending = ~keep
+    while True:
+        inner = np.flatnonzero(pending)
+        if len(inner) == 0:
+            break
+        kept = np.flatnonzero(keep)
+        segments = np.searchsorted(kept, inner) - 1
+        first, last = kept[segments], kept[segments + 1]
+        d_x, d_y = x[last] - x[first], y[last] - y[first]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if synchronized:
+                fractions = (times[inner] - times[first]) / (times[last] - times[first])
+            else:
+                fractions = np.clip(((x[inner] - x[first]) * d_x + (y[inner] - y[first]) * d_y) /
+                                    (d_x * d_x + d_y * d_y), 0, 1)
+        # segments without length or duration are compared with their first fix
+        fractions[~np.isfinite(fractions)] = 0
+        deviations = np.hypot(x[inner] - x[first] - fractions * d_x, y[inner] - y[first] - fractions * d_y)
+        group_starts = np.flatnonzero(np.diff(segments, prepend=-1))
+        maxima = np.maximum.reduceat(deviations, group_starts)
+        group_maxima = np.repeat(maxima, np.diff(np.append(group_starts, len(inner))))
+        split = group_maxima > tolerance
+        pending[inner[~split]] = False
+        # the first fix deviating most is kept in every segment exceeding tolerance
+        candidates = np.flatnonzero(split & (deviations == group_maxima))
+        _, firsts = np.unique(segments[candidates], return_index=True)
+        keep[inner[candidates[firsts]]] = True
+        pending[inner[candidates[firsts]]] = False
+    return select_points(route, keep)
+
+
+def resample(route, interval):
+    """
+    Downsamples a route in time by keeping the first fix of every interval, counted from the first fix, and the last
+    fix of the route.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        A route with timestamps in 'latlon' format.
+    interval : pandas.Timedelta
+        The length of the intervals.
+
+    Returns
+    -------
+    rt.Route or Trajectory
+        The downsampled route, of the same type as route.
+    """
+    interval = pd.Timedelta(interval).value
+    if interval <= 0:
+        raise ValueError("interval needs to be positive.")
+    _, _, timestamps = get_timed_arrays(route)
+    keep = np.zeros(len(timestamps), dtype=bool)
+    if len(timestamps) > 0:
+        buckets = (timestamps - timestamps[0]) // interval
+        keep[0] = keep[-1] = True
+        keep[1:] |= buckets[1:] != buckets[:-1]
+    return select_points(route, keep)
+
+
+def get_stationary_groups(route, epsilon):
+    """
+    Splits a route into groups of consecutive fixes, which are all within epsilon of the first fix of their group.
+
+    A group is extended by windows of fixes, whose distances to the first fix are computed at once. The windows double
+    in size while all their fixes are within epsilon, so long groups take few steps. Fixes moving away more than
+    epsilon from their predecessor end their group without computing distances.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        A route with timestamps in 'latlon' format.
+    epsilon : float
+        The radius of a group in meters.
+
+    Returns
+    -------
+    starts, stops : numpy.ndarray, numpy.ndarray
+        The groups as index ranges [start, stop) into route.
+    """
+    if epsilon < 0:
+        raise ValueError("epsilon may not be negative.")
+    x_lon, y_lat, _ = get_timed_arrays(route)
+    n = len(x_lon)
+    moving = (pv.haversine(x_lon[:-1], y_lat[:-1], x_lon[1:], y_lat[1:]) > epsilon).tolist()
+    starts = []
+    start = 0
+    while start < n:
+        starts.append(start)
+        stop = start + 1
+        if stop < n and not moving[start]:
+            size = 8
+            while stop < n:
+                end = min(stop + size, n)
+                distances = pv.haversine(x_lon[start], y_lat[start], x_lon[stop:end], y_lat[stop:end])
+                outside = np.flatnonzero(distances > epsilon)
+                if len(outside) > 0:
+                    stop += int(outside[0])
+                    break
+                stop = end
+                size *= 2
+        start = stop
+    starts = np.array(starts, dtype=np.int64)
+    return starts, np.append(starts[1:], n)[:len(starts)]
+
+
+def collapse_stationary(route, epsilon):
+    """
+    Collapses every group of consecutive fixes within epsilon of its first fix (see get_stationary_groups) into its
+    first and its last fix. The time spent in the group is kept as the time between both fixes, so extract_pois can
+    process the collapsed route directly. Only the dropped fixes are not compared with distance_threshold, they are
+    within epsilon of a kept fix, so a stay may span up to distance_threshold + 2 * epsilon. On dwell-heavy traces, this
+    shrinks routes by about half the average number of fixes per stationary group.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        A route with timestamps in 'latlon' format.
+    epsilon : float
+        The radius of a group in meters, which should be well below the distance threshold of the stop detection.
+
+    Returns
+    -------
+    rt.Route or Trajectory
+        The collapsed route, of the same type as route.
+    """
+    starts, stops = get_stationary_groups(route, epsilon)
+    keep = np.zeros(len(route), dtype=bool)
+    keep[starts] = True
+    keep[stops - 1] = True
+    return select_points(route, keep)
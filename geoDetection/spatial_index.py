@@ -0,0 +1,197 @@
+"""Provides a spatial index for radius queries on geographical points.
+"""
+import math
+
+import numpy as np
+
+from geoDetection import point_vector as pv
+
+# the 26 neighbouring cells of a grid cell and the cell itself
+_NEIGHBOUR_OFFSETS = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+# the 13 neighbouring cells that follow a cell in lexicographical order; visiting only those finds every pair of
+# neighbouring cells exactly once
+_FORWARD_OFFSETS = [offset for offset in _NEIGHBOUR_OFFSETS if offset > (0, 0, 0)]
+
+
+def chord_length(distance):
+    """
+    Returns the length of the chord through the unit sphere that corresponds to a great-circle distance.
+
+    Parameters
+    ----------
+    distance : float
+        The great-circle distance in meters.
+
+    Returns
+    -------
+    float
+        The chord length on the unit sphere.
+    """
+    return 2 * math.sin(min(distance / (2 * pv.HAVERSINE_EARTH_RADIUS), math.pi / 2))
+
+
+class GridIndex:
+    """A uniform grid over the 3D unit vectors of 'latlon' points.
+
+    The great-circle distance grows monotonically with the chord between two points, so all points within a radius
+    of a point lie in its own or one of the 26 neighbouring grid cells, if the cell size is the chord length of the
+    radius. Unlike a grid over longitude and latitude, cells do not degenerate near the poles or the antimeridian.
+    Building the index costs O(n log n), a radius query touches 27 cells.
+    """
+
+    def __init__(self, x_lon, y_lat, radius):
+        """
+        Creates a new GridIndex.
+
+        Parameters
+        ----------
+        x_lon, y_lat : numpy.ndarray
+            The coordinates of the points in radians.
+        radius : float
+            The query radius in meters the grid is built for. Queries with larger radii are not supported.
+        """
+        self.x_lon = np.asarray(x_lon, dtype=np.float64)
+        self.y_lat = np.asarray(y_lat, dtype=np.float64)
+        self.radius = radius
+        # enlarge the cells slightly, so points at exactly the radius are not lost to rounding
+        self.cell_size = max(chord_length(radius) * (1 + 1e-9), 1e-12)
+        self.cells = {}
+        # the points sorted by cell, the first point and the size of every cell and the cells encoded as integers
+        self._order = np.empty(0, dtype=np.int64)
+        self._starts = self._sizes = self._codes = np.empty(0, dtype=np.int64)
+        self._radix = None
+        if len(self.x_lon) == 0:
+            return
+        keys = np.floor(pv.get_unit_vectors(self.x_lon, self.y_lat) / self.cell_size).astype(np.int64)
+        order = np.lexsort(keys.T[::-1])
+        keys = keys[order]
+        boundaries = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+        for members, key in zip(np.split(order, boundaries), keys[np.r_[0, boundaries]].tolist()):
+            self.cells[tuple(key)] = members
+        self._order = order
+        self._starts = np.r_[0, boundaries]
+        self._sizes = np.diff(np.r_[self._starts, len(order)])
+        # a margin of one cell on every side lets neighbouring keys be encoded without wrapping around
+        spans = keys.max(axis=0) - keys.min(axis=0) + 3
+        if math.prod(spans.tolist()) < 2 ** 62:
+            self._radix = (int(spans[1] * spans[2]), int(spans[2]), 1)
+            self._codes = (keys[self._starts] - keys.min(axis=0) + 1) @ np.array(self._radix, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.x_lon)
+
+    def query_radius(self, x_lon, y_lat, radius=None):
+        """
+        Returns the indices of all points within radius of a location.
+
+        Parameters
+        ----------
+        x_lon, y_lat : float
+            The location in radians.
+        radius : float, optional
+            The query radius in meters, at most the radius the index was built for. Defaults to that radius.
+
+        Returns
+        -------
+        indices, distances : numpy.ndarray, numpy.ndarray
+            The ascending indices of the points within radius and their haversine distances in meters.
+        """
+        radius = self.radius if radius is None else radius
+        if radius > self.radius:
+            raise ValueError("The query radius may not exceed the radius the index was built for.")
+        key = np.floor(pv.get_unit_vectors(x_lon, y_lat) / self.cell_size).astype(np.int64).tolist()
+        candidates = [self.cells[cell] for cell in ((key[0] + dx, key[1] + dy, key[2] + dz)
+                                                    for dx, dy, dz in _NEIGHBOUR_OFFSETS) if cell in self.cells]
+        if not candidates:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        candidates = np.sort(np.concatenate(candidates))
+        distances = pv.haversine(x_lon, y_lat, self.x_lon[candidates], self.y_lat[candidates])
+        within = distances <= radius
+        return candidates[within], distances[within]
+
+    def query_pairs(self, radius=None):
+        """
+        Returns all pairs of distinct points within radius of each other.
+
+        Parameters
+        ----------
+        radius : float, optional
+            The query radius in meters, at most the radius the index was built for. Defaults to that radius.
+
+        Returns
+        -------
+        first, second, distances : numpy.ndarray, numpy.ndarray, numpy.ndarray
+            The indices of the pairs with first < second and their haversine distances in meters.
+        """
+        radius = self.radius if radius is None else radius
+        if radius > self.radius:
+            raise ValueError("The query radius may not exceed the radius the index was built for.")
+        first, second = self.get_candidate_pairs()
+        distances = pv.haversine(self.x_lon[first], self.y_lat[first], self.x_lon[second], self.y_lat[second])
+        within = distances <= radius
+        return first[within], second[within], distances[within]
+
+    def get_candidate_pairs(self):
+        """
+        Returns all pairs of distinct points in the same or in neighbouring grid cells, which includes all pairs within
+        the radius the index was built for.
+
+        Returns
+        -------
+        first, second : numpy.ndarray, numpy.ndarray
+            The indices of the pairs with first < second, sorted by first and second.
+        """
+        if self._radix is None:
+            return self._get_candidate_pairs_by_cell()
+        codes = self._codes
+        cells = np.arange(len(codes))
+        firsts, seconds = [], []
+        for offset in [(0, 0, 0)] + _FORWARD_OFFSETS:
+            if offset == (0, 0, 0):
+                cells_a = cells_b = cells[self._sizes > 1]
+            else:
+                neighbours = codes + sum(d * radix for d, radix in zip(offset, self._radix))
+                positions = np.minimum(np.searchsorted(codes, neighbours), len(codes) - 1)
+                found = codes[positions] == neighbours
+                cells_a, cells_b = cells[found], positions[found]
+            # all pairs of points of cell a and cell b, enumerated as k = i * size_b + j
+            sizes_a, sizes_b = self._sizes[cells_a], self._sizes[cells_b]
+            counts = sizes_a * sizes_b
+            pair_cells = np.repeat(np.arange(len(counts)), counts)
+            k = np.arange(len(pair_cells)) - np.repeat(np.cumsum(counts) - counts, counts)
+            first = self._starts[cells_a][pair_cells] + k // sizes_b[pair_cells]
+            second = self._starts[cells_b][pair_cells] + k % sizes_b[pair_cells]
+            if offset == (0, 0, 0):
+                inside = first < second
+                first, second = first[inside], second[inside]
+            firsts.append(self._order[first])
+            seconds.append(self._order[second])
+        first, second = np.concatenate(firsts), np.concatenate(seconds)
+        first, second = np.minimum(first, second), np.maximum(first, second)
+        order = np.lexsort((second, first))
+        return first[order], second[order]
+
+    def _get_candidate_pairs_by_cell(self):
+        """
+        Returns the candidate pairs like get_candidate_pairs, visiting the cells one by one. This is used for grids too
+        large to encode their cells as integers.
+        """
+        firsts, seconds = [], []
+        for key, members in self.cells.items():
+            # pairs inside the cell
+            if len(members) > 1:
+                first, second = np.triu_indices(len(members), k=1)
+                firsts.append(members[first])
+                seconds.append(members[second])
+            # pairs with the following neighbouring cells
+            for dx, dy, dz in _FORWARD_OFFSETS:
+                neighbours = self.cells.get((key[0] + dx, key[1] + dy, key[2] + dz))
+                if neighbours is not None:
+                    firsts.append(np.repeat(members, len(neighbours)))
+                    seconds.append(np.tile(neighbours, len(members)))
+        if not firsts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        first, second = np.concatenate(firsts), np.concatenate(seconds)
+        first, second = np.minimum(first, second), np.maximum(first, second)
+        order = np.lexsort((second, first))
+        return first[order], second[order]
@@ -3,41 +3,160 @@ An algorithm to detect stops based on time- and space-based clustering. The impl
 approach of Primault, V. (2018) Practically Preserving and Evaluating Location Privacy.
 """
 
-from geoDetection import point as pt
+import math
+import os
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
 from geoDetection import route as rt
 from geoDetection import point_t as ptt
-import pandas as pd
+from geoDetection import point_vector as pv
+from geoDetection.distance_cache import DistanceCache
+from geoDetection.spatial_index import GridIndex, chord_length
+from geoDetection.trajectory import Trajectory
+from geoDetection.lazy_import import LazyModule
+from geoDetection.route_arrays import get_route_arrays
 import numpy as np
 
+hs = LazyModule('haversine', 'distance calculations')
+pd = LazyModule('pandas', 'timestamps')
+
+# up to this distance threshold, the bounding box corners are a valid upper bound of the distance to any box point
+_MAX_BOUNDING_BOX_THRESHOLD_M = 1_000_000
+# a window using the 'local' distance method is projected again around a new reference point, once its points deviate
+# more than this from the reference latitude (radians, about 6 km)
+_MAX_REFERENCE_OFFSET = 1e-3
+
+
+CENTROID_METHODS = ('mercator', 'spherical')
+
 
 #class for computation
-def calculate_centroid(route):
+def calculate_centroids(x_lon, y_lat, timestamps, labels, n_groups=None, method='mercator'):
+    """
+    Calculates the centroids and the mean timestamps of many groups of points at once.
+
+    With method 'mercator', the centroid is the mean of the points in the cartesian projection, like in
+    calculate_centroid. With method 'spherical', it is the normalized mean of the points' 3D unit vectors, which
+    is the true center of mass on the sphere. It does not depend on a projection, so it suits large clusters and
+    clusters crossing the antimeridian.
+
+    Parameters
+    ----------
+    x_lon, y_lat : numpy.ndarray
+        The coordinates of the points in radians.
+    timestamps : numpy.ndarray
+        The timestamps of the points in nanoseconds.
+    labels : numpy.ndarray
+        The group of every point, from 0 to n_groups - 1. Points with negative labels belong to no group.
+    n_groups : int, optional
+        The number of groups, each of which needs at least one point. Defaults to the largest label plus one.
+    method : {'mercator', 'spherical'}
+        How the points are averaged.
+
+    Returns
+    -------
+    x_lon, y_lat, timestamps : numpy.ndarray
+        The centroids in radians and their mean timestamps in nanoseconds, one per group.
+    """
+    if method not in CENTROID_METHODS:
+        raise ValueError(f"method needs to be one of {CENTROID_METHODS}.")
+    x_lon, y_lat = np.asarray(x_lon, dtype=np.float64), np.asarray(y_lat, dtype=np.float64)
+    timestamps, labels = np.asarray(timestamps, dtype=np.int64), np.asarray(labels, dtype=np.int64)
+    grouped = labels >= 0
+    if not np.all(grouped):
+        x_lon, y_lat, timestamps, labels = x_lon[grouped], y_lat[grouped], timestamps[grouped], labels[grouped]
+    if n_groups is None:
+        n_groups = int(labels.max()) + 1 if len(labels) > 0 else 0
+    counts = np.bincount(labels, minlength=n_groups)
+    if len(counts) > n_groups or np.any(counts == 0):
+        raise ValueError("Every group needs at least one point and labels need to be below n_groups.")
+    # sums are taken relative to the first point of every group, which keeps them small and precise
+    _, firsts = np.unique(labels, return_index=True)
+
+    def mean(values):
+        references = values[firsts]
+        return references + np.bincount(labels, weights=values - references[labels], minlength=n_groups) / counts
+
+    if method == 'mercator':
+        x, y = pv.to_cartesian(x_lon, y_lat)
+        centroid_x_lon, centroid_y_lat = pv.to_latlon(mean(x), mean(y))
+    else:
+        vectors = pv.get_unit_vectors(x_lon, y_lat)
+        x, y, z = (np.bincount(labels, weights=vectors[:, axis], minlength=n_groups) for axis in range(3))
+        centroid_x_lon, centroid_y_lat = np.arctan2(y, x), np.arctan2(z, np.hypot(x, y))
+    references = timestamps[firsts]
+    offsets = np.bincount(labels, weights=(timestamps - references[labels]).astype(np.float64), minlength=n_groups)
+    return centroid_x_lon, centroid_y_lat, references + np.round(offsets / counts).astype(np.int64)
+
+
+def _to_points(x_lon, y_lat, timestamps):
+    """
+    Returns points in 'latlon' format from coordinates in radians and timestamps in nanoseconds.
+    """
+    return [ptt.PointT([lon, lat], pd.Timestamp(timestamp))
+            for lon, lat, timestamp in zip(x_lon.tolist(), y_lat.tolist(), timestamps.tolist())]
+
+
+def calculate_centroid(route, method='mercator'):
     """
-    Calculates the euclidian centroid of a route.
+    Calculates the euclidian centroid of a route. The route is only read, so it is not copied: its coordinates are
+    projected into the euclidian domain as arrays.
 
     Parameters
     ----------
     route : rt.Route
         The route representing a collection of geographical points in 'latlon' format to calculate the centroid for.
+    method : {'mercator', 'spherical'}
+        How the points are averaged, see calculate_centroids.
 
     Returns
     -------
     centroid : pt.Point
         The centroid of route's points in 'latlon' formate, calculated by averaging the points' coordinates in the
-        euclidian domain.
+        euclidian domain, with their mean timestamp.
+    """
+    if route.get_coordinates_unit() == 'degrees':
+        raise ValueError("When converting into cartesian, the coordinates unit of a point needs to be in 'radians' "
+                         "format.")
+    if len(route) == 0:
+        raise ValueError("The centroid of an empty route is not defined.")
+    if route.get_geo_reference_system() == 'latlon':
+        x_lon, y_lat, _, _, timestamps = get_route_arrays(route)
+    else:
+        coordinates = route.to_numpy()
+        x_lon, y_lat = pv.to_latlon(coordinates[:, 0], coordinates[:, 1])
+        timestamps = np.fromiter((point.timestamp_ns for point in route), dtype=np.int64, count=len(route))
+    centroid = calculate_centroids(x_lon, y_lat, timestamps, np.zeros(len(x_lon), dtype=np.int64), 1, method)
+    return _to_points(*centroid)[0]
+
+
+def get_cluster_centroids(stays, clusters, method='mercator'):
     """
-    route = route.deep_copy()
-    for point in route:
-        point.to_cartesian_()
-    x_mean = np.mean([point.x_lon for point in route])
-    y_mean = np.mean([point.y_lat for point in route])
-    timestamps = [point.timestamp.timestamp() for point in route]
-    average_timestamp = pd.to_datetime((sum(timestamps) / len(timestamps)), unit='s')
+    Calculates the centroid of every cluster of stays, i.e. the POIs.
 
-    centroid = ptt.PointT([x_mean, y_mean], average_timestamp, 'cartesian')
-    centroid.to_latlon_()
-    return centroid
+    Parameters
+    ----------
+    stays : rt.Route or Trajectory
+        The stays with timestamps in 'latlon' format.
+    clusters : list
+        The clusters as lists of stay indices, as returned by aggregate_stays.
+    method : {'mercator', 'spherical'}
+        How the stays are averaged, see calculate_centroids.
 
+    Returns
+    -------
+    pois : list
+        The centroids of the clusters as points in 'latlon' format with the mean timestamps of their stays.
+    """
+    if not clusters:
+        return []
+    x_lon, y_lat, _, _, timestamps = get_route_arrays(stays)
+    indices = np.concatenate([np.asarray(cluster, dtype=np.int64) for cluster in clusters])
+    labels = np.repeat(np.arange(len(clusters)), [len(cluster) for cluster in clusters])
+    return _to_points(*calculate_centroids(x_lon[indices], y_lat[indices], timestamps[indices], labels,
+                                           len(clusters), method))
 
 
 def intersection(route_a, route_b):
@@ -86,7 +205,964 @@ def union(route_a, route_b):
     return union_a_b
 
 
-def extract_pois(route, time_threshold, distance_threshold, min_points=1, merge_threshold=0.5, print_comments=False):
+def _phase(stats, name):
+    """
+    Returns a context manager timing the phase name in stats, or doing nothing if stats is None.
+    """
+    return nullcontext() if stats is None else stats.timer(name)
+
+
+def _unit_vector(lon, lat):
+    """
+    Scalar version of pv.get_unit_vectors for coordinates in radians.
+    """
+    cos_lat = math.cos(lat)
+    return cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat)
+
+
+class StayWindow:
+    """A sliding window over consecutive route points, representing a candidate stay. Points are numbered by the order
+    in which they were appended, the window spans the points [start, end).
+
+    The window keeps monotonic deques of the indices of its minimal and maximal longitudes and latitudes, so appending
+    and evicting a point is amortized O(1). They span the bounding box of the window, which bounds the maximal distance
+    from a new point to any window point from below (distance to the extreme points) and from above (distance to the
+    box corners). Only if neither bound decides whether the new point fits, the distances to all window points are
+    computed in a single vectorized pass. Evicted points are dropped from the buffers, so memory is bounded by the
+    window length.
+
+    Distances are compared as squared chord lengths between the precomputed unit vectors of the points, which takes a
+    few multiplications per pair. The chord lengths from a new point to the window points are kept in a DistanceCache
+    keyed by the index of the new point: when the point is checked again after the first window point was evicted,
+    the remaining chord lengths are reused instead of recomputed.
+
+    With the 'equirectangular' or 'local' distance method, the vectorized pass approximates the distances instead
+    (see point_vector). For 'local', the window points are projected once around the first point of the stay. Only
+    distances whose error bound does not decide the comparison with the threshold are computed exactly, so the result
+    is the same for all methods.
+
+    The window counts the distances computed in vectorized passes and exactly, see DetectionStats.
+    """
+
+    def __init__(self, start=0, cache_size=16, distance_method='haversine'):
+        """
+        Creates a new, empty StayWindow.
+
+        Parameters
+        ----------
+        start : int
+            The index of the first point that will be appended.
+        cache_size : int
+            The number of new points, whose distances to the window points are cached.
+        distance_method : {'haversine', 'equirectangular', 'local'}
+            How the distances from a new point to all window points are computed, if the bounding box does not decide
+            whether the point fits.
+        """
+        if distance_method not in pv.DISTANCE_METHODS:
+            raise ValueError(f"distance_method needs to be one of {pv.DISTANCE_METHODS}.")
+        self.start = start
+        self.end = start
+        self.distance_method = distance_method
+        self._offset = start    # index of the first buffered point
+        self._lon, self._lat, self._lon_deg, self._lat_deg, self._timestamps = [], [], [], [], []
+        self._x, self._y, self._z = [], [], []    # unit vectors
+        self._local_x, self._local_y = [], []    # coordinates in the plane around the reference point
+        self._reference = None
+        self._lon_min, self._lon_max, self._lat_min, self._lat_max = deque(), deque(), deque(), deque()
+        self.cache = DistanceCache(cache_size)
+        self._threshold = None      # distance threshold and the corresponding squared chord length bounds
+        self.distance_evaluations = 0
+        self.exact_evaluations = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    def append(self, lon, lat, lon_deg, lat_deg, timestamp, unit_vector=None):
+        """
+        Extends the window by a point.
+
+        Parameters
+        ----------
+        lon, lat : float
+            The coordinates of the point in radians.
+        lon_deg, lat_deg : float
+            The coordinates of the point in degrees.
+        timestamp : int
+            The timestamp of the point in nanoseconds.
+        unit_vector : tuple, optional
+            The precomputed unit vector of the point, see pv.get_unit_vectors.
+        """
+        idx = self.end
+        offset = self._offset
+        x, y, z = _unit_vector(lon, lat) if unit_vector is None else unit_vector
+        self._x.append(x)
+        self._y.append(y)
+        self._z.append(z)
+        if self.distance_method == 'local':
+            if self.start == self.end:
+                self._reference = (lon, lat, pv.HAVERSINE_EARTH_RADIUS * math.cos(lat))
+            lon_0, lat_0, radius_0 = self._reference
+            self._local_x.append(radius_0 * ((lon - lon_0 + math.pi) % (2 * math.pi) - math.pi))
+            self._local_y.append(pv.HAVERSINE_EARTH_RADIUS * (lat - lat_0))
+        self._lon.append(lon)
+        self._lat.append(lat)
+        self._lon_deg.append(lon_deg)
+        self._lat_deg.append(lat_deg)
+        self._timestamps.append(timestamp)
+        values = self._lon
+        extremes = self._lon_min
+        while extremes and values[extremes[-1] - offset] >= lon:
+            extremes.pop()
+        extremes.append(idx)
+        extremes = self._lon_max
+        while extremes and values[extremes[-1] - offset] <= lon:
+            extremes.pop()
+        extremes.append(idx)
+        values = self._lat
+        extremes = self._lat_min
+        while extremes and values[extremes[-1] - offset] >= lat:
+            extremes.pop()
+        extremes.append(idx)
+        extremes = self._lat_max
+        while extremes and values[extremes[-1] - offset] <= lat:
+            extremes.pop()
+        extremes.append(idx)
+        self.end += 1
+
+    def pop_front(self):
+        """
+        Evicts the first point of the window.
+        """
+        for extremes in (self._lon_min, self._lon_max, self._lat_min, self._lat_max):
+            if extremes[0] == self.start:
+                extremes.popleft()
+        self.start += 1
+        # drop evicted points from the buffers once they make up half of them
+        evicted = self.start - self._offset
+        if evicted >= 64 and 2 * evicted >= len(self._lon):
+            for buffer in (self._lon, self._lat, self._lon_deg, self._lat_deg, self._timestamps, self._x, self._y,
+                           self._z, self._local_x, self._local_y):
+                del buffer[:evicted]
+            self._offset = self.start
+
+    def clear(self):
+        """
+        Empties the window. The next appended point keeps its index.
+        """
+        self.start = self._offset = self.end
+        for buffer in (self._lon, self._lat, self._lon_deg, self._lat_deg, self._timestamps, self._x, self._y,
+                       self._z, self._local_x, self._local_y):
+            buffer.clear()
+        for extremes in (self._lon_min, self._lon_max, self._lat_min, self._lat_max):
+            extremes.clear()
+        self.cache.clear()
+
+    def get_duration(self):
+        """
+        Returns the time between the first and the last point of the window in nanoseconds.
+        """
+        if self.start == self.end:
+            return 0
+        return self._timestamps[self.end - 1 - self._offset] - self._timestamps[self.start - self._offset]
+
+    def get_last_timestamp(self):
+        """
+        Returns the timestamp of the last point of the window in nanoseconds or None, if the window is empty.
+        """
+        return self._timestamps[self.end - 1 - self._offset] if self.start < self.end else None
+
+    def get_points(self):
+        """
+        Returns the points of the window.
+
+        Returns
+        -------
+        x_lon, y_lat, x_lon_deg, y_lat_deg, timestamps : list
+            The coordinates in radians and degrees and the timestamps in nanoseconds of the window points.
+        """
+        first, last = self.start - self._offset, self.end - self._offset
+        return tuple(buffer[first:last] for buffer in (self._lon, self._lat, self._lon_deg, self._lat_deg,
+                                                        self._timestamps))
+
+    def _get_chord_bounds(self, distance_threshold):
+        """
+        Returns the squared chord lengths of distance_threshold minus and plus the distance tolerance.
+        """
+        if self._threshold is None or self._threshold[0] != distance_threshold:
+            tolerance = pv.DISTANCE_TOLERANCE_M + distance_threshold * pv.DISTANCE_TOLERANCE_REL
+            self._threshold = (distance_threshold, chord_length(max(distance_threshold - tolerance, 0)) ** 2,
+                               chord_length(distance_threshold + tolerance) ** 2)
+        return self._threshold[1:]
+
+    def _get_chords(self, lon, lat, x, y, z):
+        """
+        Returns the squared chord lengths from the point (lon, lat) with unit vector (x, y, z), which is checked as the
+        next point of the window, to all window points.
+        """
+        row = self.cache.get(self.end)
+        if row is None or row[0] > self.start or row[1] != lon or row[2] != lat:
+            first, last = self.start - self._offset, self.end - self._offset
+            chords = (np.array(self._x[first:last]) - x) ** 2 + (np.array(self._y[first:last]) - y) ** 2 + \
+                (np.array(self._z[first:last]) - z) ** 2
+            self.distance_evaluations += last - first
+            row = (self.start, lon, lat, chords)
+            self.cache.put(self.end, row)
+        return row[3][self.start - row[0]:]
+
+    def _get_approximate_distances(self, lon, lat):
+        """
+        Returns the approximated distances from the point (lon, lat), which is checked as the next point of the window,
+        to all window points and their error bounds.
+        """
+        row = self.cache.get(self.end)
+        if row is None or row[0] > self.start or row[1] != lon or row[2] != lat:
+            first, last = self.start - self._offset, self.end - self._offset
+            lat_min = self._lat[self._lat_min[0] - self._offset]
+            lat_max = self._lat[self._lat_max[0] - self._offset]
+            max_latitude = max(abs(lat), abs(lat_min), abs(lat_max))
+            if self.distance_method == 'equirectangular':
+                distances = pv.equirectangular(lon, lat, np.array(self._lon[first:last]),
+                                               np.array(self._lat[first:last]))
+                reference_offset = 0.0
+            else:
+                if max(lat_max - self._reference[1], self._reference[1] - lat_min) > _MAX_REFERENCE_OFFSET:
+                    self._set_reference(first, last)
+                lon_0, lat_0, _ = self._reference
+                local_x, local_y = pv.to_local(lon, lat, lon_0, lat_0)
+                distances = np.hypot(np.array(self._local_x[first:last]) - local_x,
+                                     np.array(self._local_y[first:last]) - local_y)
+                reference_offset = max(abs(lat - lat_0), lat_max - lat_0, lat_0 - lat_min)
+                max_latitude = max(max_latitude, abs(lat_0))
+            bounds = pv.get_distance_error_bound(distances, max_latitude, reference_offset)
+            self.distance_evaluations += last - first
+            row = (self.start, lon, lat, distances, bounds)
+            self.cache.put(self.end, row)
+        skip = self.start - row[0]
+        return row[3][skip:], row[4][skip:]
+
+    def _set_reference(self, first, last):
+        """
+        Projects the window points again around the first window point.
+        """
+        lon_0, lat_0 = self._lon[first], self._lat[first]
+        self._reference = (lon_0, lat_0, pv.HAVERSINE_EARTH_RADIUS * math.cos(lat_0))
+        local_x, local_y = pv.to_local(np.array(self._lon[first:last]), np.array(self._lat[first:last]), lon_0, lat_0)
+        self._local_x[first:last] = local_x.tolist()
+        self._local_y[first:last] = local_y.tolist()
+
+    def fits(self, lon, lat, lon_deg, lat_deg, distance_threshold, unit_vector=None):
+        """
+        Checks, if the distances from a point to all points of the window are at most distance_threshold. The result
+        is identical to comparing point.get_distance for every point of the window.
+
+        Parameters
+        ----------
+        lon, lat : float
+            The coordinates of the point in radians.
+        lon_deg, lat_deg : float
+            The coordinates of the point in degrees.
+        distance_threshold : float
+            The maximal allowed distance in meters.
+        unit_vector : tuple, optional
+            The precomputed unit vector of the point, see pv.get_unit_vectors.
+
+        Returns
+        -------
+        bool
+            True, if the window is empty or all its points are within distance_threshold of the point.
+        """
+        if self.start == self.end:
+            return True
+        offset = self._offset
+        window_lon, window_lat = self._lon, self._lat
+        lower_chord, upper_chord = self._get_chord_bounds(distance_threshold)
+        x, y, z = _unit_vector(lon, lat) if unit_vector is None else unit_vector
+        # lower bound: the points spanning the bounding box are part of the window
+        window_x, window_y, window_z = self._x, self._y, self._z
+        for extremes in (self._lon_min, self._lon_max, self._lat_min, self._lat_max):
+            j = extremes[0] - offset
+            if (window_x[j] - x) ** 2 + (window_y[j] - y) ** 2 + (window_z[j] - z) ** 2 > upper_chord:
+                return False
+        # upper bound: for small boxes, no box point is further away than the farthest box corner
+        lon_min, lon_max = window_lon[self._lon_min[0] - offset], window_lon[self._lon_max[0] - offset]
+        if distance_threshold < _MAX_BOUNDING_BOX_THRESHOLD_M and lon - lon_min <= math.pi and \
+                lon_max - lon <= math.pi:
+            # haversine terms of the corners, the cosines of the latitudes are taken from the unit vectors; the
+            # farthest corner combines the larger longitude difference with one of the two latitudes
+            j_min, j_max = self._lat_min[0] - offset, self._lat_max[0] - offset
+            cos_lat = math.hypot(x, y)
+            sin_lon = max(math.sin((lon - lon_min) * 0.5) ** 2, math.sin((lon_max - lon) * 0.5) ** 2)
+            upper_bound = max(
+                math.sin((lat - window_lat[j_min]) * 0.5) ** 2 +
+                cos_lat * math.hypot(window_x[j_min], window_y[j_min]) * sin_lon,
+                math.sin((lat - window_lat[j_max]) * 0.5) ** 2 +
+                cos_lat * math.hypot(window_x[j_max], window_y[j_max]) * sin_lon)
+            # the squared chord length is four times the haversine term
+            if 4 * upper_bound < lower_chord:
+                return True
+        # undecided: compare all distances at once and re-evaluate those close to the threshold exactly
+        first = self.start - offset
+        if self.distance_method == 'haversine':
+            chords = self._get_chords(lon, lat, x, y, z)
+            if np.any(chords > upper_chord):
+                return False
+            undecided = np.flatnonzero(chords >= lower_chord)
+        else:
+            distances, bounds = self._get_approximate_distances(lon, lat)
+            within, undecided = pv.classify_distances(distances, distance_threshold, bounds)
+            if not np.all(within | undecided):
+                return False
+            # distances without a sufficient error bound are computed with haversine first
+            undecided = np.flatnonzero(undecided)
+            if len(undecided) > 0:
+                indices = (first + undecided).tolist()
+                self.distance_evaluations += len(indices)
+                distances = pv.haversine(lon, lat, np.array([self._lon[j] for j in indices]),
+                                         np.array([self._lat[j] for j in indices]))
+                within, exact = pv.classify_distances(distances, distance_threshold)
+                if not np.all(within | exact):
+                    return False
+                undecided = undecided[exact]
+        for j in undecided.tolist():
+            j += first
+            self.exact_evaluations += 1
+            if hs.haversine([lat_deg, lon_deg], [self._lat_deg[j], self._lon_deg[j]], hs.Unit.METERS) > \
+                    distance_threshold:
+                return False
+        return True
+
+
+def extract_stays(route, time_threshold, distance_threshold, distance_method='haversine', stats=None):
+    """
+    Extracts stays from a route of geographical points with timestamps (phase 1 of extract_pois). A candidate stay is
+    extended by the next route point as long as that point is within distance_threshold of all points of the candidate
+    stay. Otherwise, the candidate stay becomes a stay if it lasted at least time_threshold, else its first point is
+    evicted and the route point is checked again.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        A route containing geographical points with timestamps in 'latlon' format.
+    time_threshold : pandas.Timedelta
+        The minimum time duration that has to be spent in every stay.
+    distance_threshold : float
+        The maximal diameter of the stay area in meters.
+    distance_method : {'haversine', 'equirectangular', 'local'}
+        How distances are computed before the exact check near the threshold. All methods give the same result.
+    stats : DetectionStats, optional
+        Receives the counts of this phase and its duration as 'extract_stays'.
+
+    Returns
+    -------
+    stays : list
+        The stays as (start, stop) index ranges into route.
+    """
+    with _phase(stats, 'extract_stays'):
+        x_lon, y_lat, x_lon_deg, y_lat_deg, timestamps = get_route_arrays(route)
+        time_threshold = pd.Timedelta(time_threshold).value
+        window = StayWindow(distance_method=distance_method)
+        stays = []
+        # a candidate stay is opened by the first point and by every point following an emptied window
+        evicted = emptied = 0
+        for point, unit_vector in zip(zip(x_lon.tolist(), y_lat.tolist(), x_lon_deg.tolist(), y_lat_deg.tolist(),
+                                          timestamps.tolist()), pv.get_unit_vectors(x_lon, y_lat).tolist()):
+            while not window.fits(*point[:4], distance_threshold, unit_vector):
+                if window.get_duration() >= time_threshold:
+                    stays.append((window.start, window.end))
+                    window.clear()
+                    emptied += 1
+                else:
+                    window.pop_front()
+                    evicted += 1
+                    if window.start == window.end:
+                        emptied += 1
+            window.append(*point, unit_vector)
+    if stats is not None:
+        stats.add(points=len(x_lon), distance_evaluations=window.distance_evaluations,
+                  exact_evaluations=window.exact_evaluations, cache_hits=window.cache.hits,
+                  cache_misses=window.cache.misses, stays_opened=emptied + (len(x_lon) > 0),
+                  stays_closed=len(stays), points_evicted=evicted)
+    return stays
+
+
+def get_stay_centroids(route, stays, print_comments=False, method='mercator'):
+    """
+    Calculates the centroid of every stay, all stays at once.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        The route the stays were extracted from.
+    stays : list
+        The stays as (start, stop) index ranges into route, as returned by extract_stays.
+    print_comments : bool
+        Indicates whether comments should be printed to help with debugging.
+    method : {'mercator', 'spherical'}
+        How the points of a stay are averaged, see calculate_centroids.
+
+    Returns
+    -------
+    centroids : rt.Route
+        The centroids of the stays, with their average timestamps, in 'latlon' format.
+    """
+    if len(stays) == 0:
+        return rt.Route()
+    x_lon, y_lat, _, _, timestamps = get_route_arrays(route)
+    stays = np.asarray(stays, dtype=np.int64).reshape(-1, 2)
+    counts = stays[:, 1] - stays[:, 0]
+    # the indices of the points of all stays, one stay after the other
+    indices = np.arange(int(counts.sum())) + np.repeat(stays[:, 0] - (np.cumsum(counts) - counts), counts)
+    labels = np.repeat(np.arange(len(stays)), counts)
+    centroids = rt.Route(_to_points(*calculate_centroids(x_lon[indices], y_lat[indices], timestamps[indices],
+                                                         labels, len(stays), method)))
+    if print_comments:
+        for (start, stop), centroid in zip(stays.tolist(), centroids):
+            print("appending centroid of route points", start, "to", stop - 1, "to stays", centroid.to_cartesian())
+    return centroids
+
+
+def _centroid_of(x_lon, y_lat, timestamps, method='mercator'):
+    """
+    Calculates the centroid of points given by their coordinates in radians and timestamps in nanoseconds.
+    """
+    return _to_points(*calculate_centroids(x_lon, y_lat, timestamps, np.zeros(len(x_lon), dtype=np.int64), 1,
+                                           method))[0]
+
+
+class StopDetector:
+    """An online version of phase 1 of extract_pois for live GPS feeds. Fixes are passed one at a time or in
+    micro-batches in chronological order, and a stay is emitted as soon as it is closed, i.e. as soon as a fix does not
+    fit into the candidate stay anymore. Only the open candidate stay is kept in memory.
+
+    Feeding a whole route into a StopDetector emits the same stays as phase 1 of extract_pois.
+    """
+
+    def __init__(self, time_threshold, distance_threshold, distance_method='haversine', centroid_method='mercator'):
+        """
+        Creates a new StopDetector.
+
+        Parameters
+        ----------
+        time_threshold : pandas.Timedelta
+            The minimum time duration that has to be spent in every stay.
+        distance_threshold : float
+            The maximal diameter of the stay area in meters.
+        distance_method : {'haversine', 'equirectangular', 'local'}
+            How distances are computed before the exact check near the threshold. All methods give the same result.
+        centroid_method : {'mercator', 'spherical'}
+            How the fixes of a stay are averaged, see calculate_centroids.
+        """
+        if centroid_method not in CENTROID_METHODS:
+            raise ValueError(f"centroid_method needs to be one of {CENTROID_METHODS}.")
+        self.time_threshold = pd.Timedelta(time_threshold)
+        self.distance_threshold = distance_threshold
+        self.distance_method = distance_method
+        self.centroid_method = centroid_method
+        self._window = StayWindow(distance_method=distance_method)
+        # the counters of get_counts, apart from those kept by the window
+        self._points = self._stays_opened = self._stays_closed = self._points_evicted = 0
+        # the timestamp of the last fix, which is kept when the candidate stay is emptied
+        self._last_timestamp = None
+
+    def _update(self, point, unit_vector=None):
+        """
+        Adds a fix given by its coordinates in radians and degrees and its timestamp in nanoseconds.
+        """
+        window = self._window
+        if self._last_timestamp is not None and point[4] < self._last_timestamp:
+            raise ValueError("Fixes need to be passed in chronological order.")
+        if unit_vector is None:
+            unit_vector = _unit_vector(point[0], point[1])
+        stays = []
+        while not window.fits(*point[:4], self.distance_threshold, unit_vector):
+            if window.get_duration() >= self.time_threshold.value:
+                x_lon, y_lat, _, _, timestamps = window.get_points()
+                stays.append(_centroid_of(x_lon, y_lat, timestamps, self.centroid_method))
+                window.clear()
+                self._stays_closed += 1
+            else:
+                window.pop_front()
+                self._points_evicted += 1
+        if window.start == window.end:
+            self._stays_opened += 1
+        window.append(*point, unit_vector)
+        self._points += 1
+        self._last_timestamp = point[4]
+        return stays
+
+    def update(self, point):
+        """
+        Adds a single fix.
+
+        Parameters
+        ----------
+        point : ptt.PointT
+            The fix in 'latlon' format.
+
+        Returns
+        -------
+        stays : list
+            The centroids (ptt.PointT) of the stays closed by this fix, at most one.
+        """
+        if point.get_geo_reference_system() != 'latlon':
+            raise ValueError("The fix needs to be in 'latlon' format.")
+        if point.get_coordinates_unit() == 'degrees':
+            lon_deg, lat_deg = point.x_lon, point.y_lat
+            lon, lat = math.radians(lon_deg), math.radians(lat_deg)
+        else:
+            lon, lat = point.x_lon, point.y_lat
+            lon_deg, lat_deg = math.degrees(lon), math.degrees(lat)
+        return self._update((lon, lat, lon_deg, lat_deg, point.timestamp_ns))
+
+    def update_batch(self, route):
+        """
+        Adds a micro-batch of fixes.
+
+        Parameters
+        ----------
+        route : rt.Route or Trajectory
+            The fixes with timestamps in 'latlon' format.
+
+        Returns
+        -------
+        stays : list
+            The centroids (ptt.PointT) of the stays closed by these fixes.
+        """
+        arrays = get_route_arrays(route)
+        stays = []
+        for point, unit_vector in zip(zip(*(array.tolist() for array in arrays)),
+                                      pv.get_unit_vectors(arrays[0], arrays[1]).tolist()):
+            stays.extend(self._update(point, unit_vector))
+        return stays
+
+    def get_candidate_stay(self):
+        """
+        Returns the fixes of the open candidate stay.
+
+        Returns
+        -------
+        rt.Route
+            The fixes of the candidate stay in 'latlon' format and 'radians' unit.
+        """
+        x_lon, y_lat, _, _, timestamps = self._window.get_points()
+        return rt.Route([ptt.PointT([lon, lat], pd.Timestamp(timestamp))
+                         for lon, lat, timestamp in zip(x_lon, y_lat, timestamps)])
+
+    def flush(self):
+        """
+        Closes the candidate stay at the end of a feed. Unlike extract_pois, which drops the candidate stay at the end
+        of the route, the candidate stay is emitted if it lasted at least time_threshold.
+
+        Returns
+        -------
+        stays : list
+            The centroid (ptt.PointT) of the candidate stay, if it is a valid stay, else an empty list.
+        """
+        window = self._window
+        stays = []
+        if len(window) > 0 and window.get_duration() >= self.time_threshold.value:
+            x_lon, y_lat, _, _, timestamps = window.get_points()
+            stays.append(_centroid_of(x_lon, y_lat, timestamps, self.centroid_method))
+            self._stays_closed += 1
+        window.clear()
+        return stays
+
+    def get_counts(self):
+        """
+        Returns the counters of all fixes passed to this detector, named like the counters of DetectionStats, so they
+        can be passed on with stats.add(**detector.get_counts()).
+
+        Returns
+        -------
+        counts : dict
+            The counters points, distance_evaluations, exact_evaluations, cache_hits, cache_misses, stays_opened,
+            stays_closed and points_evicted.
+        """
+        window = self._window
+        return {'points': self._points, 'distance_evaluations': window.distance_evaluations,
+                'exact_evaluations': window.exact_evaluations, 'cache_hits': window.cache.hits,
+                'cache_misses': window.cache.misses, 'stays_opened': self._stays_opened,
+                'stays_closed': self._stays_closed, 'points_evicted': self._points_evicted}
+
+    def get_state(self):
+        """
+        Returns a checkpoint of this detector, consisting of builtin types only, so it can be pickled or serialized as
+        JSON.
+
+        Returns
+        -------
+        state : dict
+            The thresholds, the fixes of the open candidate stay, the timestamp of the last fix and the counters of
+            get_counts.
+        """
+        x_lon, y_lat, x_lon_deg, y_lat_deg, timestamps = self._window.get_points()
+        return {'time_threshold': self.time_threshold.value, 'distance_threshold': self.distance_threshold,
+                'distance_method': self.distance_method, 'centroid_method': self.centroid_method,
+                'start': self._window.start, 'x_lon': x_lon, 'y_lat': y_lat, 'x_lon_deg': x_lon_deg,
+                'y_lat_deg': y_lat_deg, 'timestamps': timestamps, 'last_timestamp': self._last_timestamp,
+                'counts': self.get_counts()}
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Restores a StopDetector from a checkpoint created by get_state.
+
+        Parameters
+        ----------
+        state : dict
+            The checkpoint.
+
+        Returns
+        -------
+        StopDetector
+            A detector continuing where the checkpointed one stopped.
+        """
+        distance_method = state.get('distance_method', 'haversine')
+        detector = cls(pd.Timedelta(state['time_threshold']), state['distance_threshold'], distance_method,
+                       state.get('centroid_method', 'mercator'))
+        detector._window = StayWindow(state['start'], distance_method=distance_method)
+        for point in zip(state['x_lon'], state['y_lat'], state['x_lon_deg'], state['y_lat_deg'],
+                         state['timestamps']):
+            detector._window.append(*point)
+        # checkpoints written before the last timestamp was kept continue after their candidate stay
+        detector._last_timestamp = state.get('last_timestamp', detector._window.get_last_timestamp())
+        counts = state.get('counts', {})
+        detector._points = counts.get('points', 0)
+        detector._stays_opened = counts.get('stays_opened', 0)
+        detector._stays_closed = counts.get('stays_closed', 0)
+        detector._points_evicted = counts.get('points_evicted', 0)
+        window = detector._window
+        window.distance_evaluations = counts.get('distance_evaluations', 0)
+        window.exact_evaluations = counts.get('exact_evaluations', 0)
+        window.cache.hits = counts.get('cache_hits', 0)
+        window.cache.misses = counts.get('cache_misses', 0)
+        return detector
+
+
+class UnionFind:
+    """A disjoint-set forest over the integers 0, ..., n - 1 with path halving and union by size.
+    """
+
+    def __init__(self, n):
+        """
+        Creates a new UnionFind structure, where every element forms its own set.
+
+        Parameters
+        ----------
+        n : int
+            The number of elements.
+        """
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, element):
+        """
+        Returns the representative of the set containing element.
+        """
+        parent = self.parent
+        while parent[element] != element:
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return element
+
+    def union(self, element_a, element_b):
+        """
+        Merges the sets containing element_a and element_b and returns the representative of the merged set.
+        """
+        root_a, root_b = self.find(element_a), self.find(element_b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+
+def get_neighbour_pairs(x_lon, y_lat, x_lon_deg, y_lat_deg, radius, distance_method='haversine', stats=None):
+    """
+    Returns all pairs of distinct points within radius of each other. The comparison with radius is identical to
+    comparing point.get_distance.
+
+    Parameters
+    ----------
+    x_lon, y_lat : numpy.ndarray
+        The coordinates of the points in radians.
+    x_lon_deg, y_lat_deg : numpy.ndarray
+        The coordinates of the points in degrees.
+    radius : float
+        The radius in meters.
+    distance_method : {'haversine', 'equirectangular', 'local'}
+        How the distances of the candidate pairs are computed first. 'local' projects every pair around its first
+        point. Pairs the approximation does not decide are computed exactly.
+    stats : DetectionStats, optional
+        Receives the number of distance evaluations.
+
+    Returns
+    -------
+    first, second : numpy.ndarray, numpy.ndarray
+        The indices of the pairs with first < second.
+    """
+    if distance_method not in pv.DISTANCE_METHODS:
+        raise ValueError(f"distance_method needs to be one of {pv.DISTANCE_METHODS}.")
+    tolerance = pv.DISTANCE_TOLERANCE_M + radius * pv.DISTANCE_TOLERANCE_REL
+    first, second = GridIndex(x_lon, y_lat, radius + tolerance).get_candidate_pairs()
+    within = np.zeros(len(first), dtype=bool)
+    pending = np.arange(len(first))
+    evaluations = 0
+    if distance_method != 'haversine' and len(first) > 0:
+        distances = pv.get_distances(np.stack([x_lon[first], y_lat[first]], axis=-1),
+                                     np.stack([x_lon[second], y_lat[second]], axis=-1), method=distance_method)
+        max_latitude = float(np.max(np.abs(y_lat)))
+        # the plane of a pair is centered on its first point
+        reference_offset = float(np.max(np.abs(y_lat[second] - y_lat[first]))) if distance_method == 'local' else 0.0
+        within, undecided = pv.classify_distances(distances, radius,
+                                                  pv.get_distance_error_bound(distances, max_latitude,
+                                                                              reference_offset))
+        pending = np.flatnonzero(undecided)
+        evaluations = len(first)
+    # the remaining pairs are compared with haversine, and with point.get_distance close to the radius
+    distances = pv.haversine(x_lon[first[pending]], y_lat[first[pending]], x_lon[second[pending]],
+                             y_lat[second[pending]])
+    pending_within, undecided = pv.classify_distances(distances, radius)
+    within[pending] = pending_within
+    evaluations += len(pending)
+    exact = pending[undecided].tolist()
+    for k in exact:
+        i, j = first[k], second[k]
+        within[k] = hs.haversine([y_lat_deg[i], x_lon_deg[i]], [y_lat_deg[j], x_lon_deg[j]],
+                                 hs.Unit.METERS) <= radius
+    if stats is not None:
+        stats.add(distance_evaluations=evaluations, exact_evaluations=len(exact))
+    return first[within], second[within]
+
+
+def _get_cores(first, second, n, min_points):
+    """
+    Returns, which stays have at least min_points stays (including themselves) in their neighbourhood.
+    """
+    return 1 + np.bincount(first, minlength=n) + np.bincount(second, minlength=n) >= min_points
+
+
+def aggregate_neighbourhoods(x_lon, y_lat, x_lon_deg, y_lat_deg, radius, min_points=1, distance_method='haversine',
+                             stats=None):
+    """
+    Aggregates stays as in Primault, V. (2018): every stay, whose neighbourhood of stays within radius counts at least
+    min_points stays (including itself), forms a cluster with its neighbourhood. Clusters sharing a stay are merged, so
+    a stay next to two core stays joins their clusters.
+
+    Neighbourhoods are found with a GridIndex and clusters are merged with a UnionFind structure keyed by stay index,
+    which takes O(n log n + p) for n stays and p pairs of stays in neighbouring grid cells.
+
+    Parameters
+    ----------
+    x_lon, y_lat : numpy.ndarray
+        The coordinates of the stays in radians.
+    x_lon_deg, y_lat_deg : numpy.ndarray
+        The coordinates of the stays in degrees.
+    radius : float
+        The distance in meters, under which stays are merged.
+    min_points : int
+        A minimum number of stays necessary to create a cluster.
+    distance_method : {'haversine', 'equirectangular', 'local'}
+        How distances are computed before the exact check near the radius, see get_neighbour_pairs.
+    stats : DetectionStats, optional
+        Receives the counts of the aggregation.
+
+    Returns
+    -------
+    clusters : list
+        The clusters as ascending lists of stay indices, ordered by the last stay that extended them.
+    """
+    n = len(x_lon)
+    first, second = get_neighbour_pairs(x_lon, y_lat, x_lon_deg, y_lat_deg, radius, distance_method, stats)
+    n_pairs = len(first)
+    is_core = _get_cores(first, second, n, min_points)
+    # every edge with at least one core stay joins a cluster
+    edges = is_core[first] | is_core[second]
+    first, second = first[edges].tolist(), second[edges].tolist()
+
+    union_find = UnionFind(n)
+    for i, j in zip(first, second):
+        union_find.union(i, j)
+    in_cluster = is_core.copy()
+    in_cluster[first] = True
+    in_cluster[second] = True
+
+    # a cluster is ordered by the last core stay extending it
+    clusters = {}
+    last_extended = {}
+    for stay_idx in np.flatnonzero(in_cluster).tolist():
+        root = union_find.find(stay_idx)
+        clusters.setdefault(root, []).append(stay_idx)
+        if is_core[stay_idx]:
+            last_extended[root] = stay_idx
+    if stats is not None:
+        # every merge joins two clusters, starting from a cluster per stay
+        stats.add(neighbour_pairs=n_pairs, cluster_merges=int(np.count_nonzero(in_cluster)) - len(clusters))
+    return [clusters[root] for root in sorted(clusters, key=last_extended.get)]
+
+
+def aggregate_dbscan(x_lon, y_lat, x_lon_deg, y_lat_deg, radius, min_points=1, distance_method='haversine',
+                     stats=None):
+    """
+    Aggregates stays with DBSCAN, using radius as eps and min_points as minPts: core stays, which have at least
+    min_points stays (including themselves) within radius, are clustered with the core stays within radius. Any other
+    stay within radius of a core stay joins one of its clusters, without connecting clusters. Stays are visited in
+    order, so a stay next to several clusters joins the cluster of the first core stay, like in the classic algorithm
+    and scikit-learn. With min_points=1, every stay is a core stay and the result equals aggregate_neighbourhoods.
+
+    Neighbourhoods are found with a GridIndex and core stays are joined with a UnionFind structure, which takes
+    O(n log n + p) for n stays and p pairs of stays in neighbouring grid cells.
+
+    Parameters
+    ----------
+    x_lon, y_lat : numpy.ndarray
+        The coordinates of the stays in radians.
+    x_lon_deg, y_lat_deg : numpy.ndarray
+        The coordinates of the stays in degrees.
+    radius : float
+        The distance in meters, under which stays are merged (eps).
+    min_points : int
+        A minimum number of stays within radius of a core stay (minPts).
+    distance_method : {'haversine', 'equirectangular', 'local'}
+        How distances are computed before the exact check near the radius, see get_neighbour_pairs.
+    stats : DetectionStats, optional
+        Receives the counts of the aggregation.
+
+    Returns
+    -------
+    clusters : list
+        The clusters as ascending lists of stay indices, ordered by their first core stay.
+    """
+    n = len(x_lon)
+    first, second = get_neighbour_pairs(x_lon, y_lat, x_lon_deg, y_lat_deg, radius, distance_method, stats)
+    is_core = _get_cores(first, second, n, min_points)
+    core_edges = is_core[first] & is_core[second]
+    union_find = UnionFind(n)
+    for i, j in zip(first[core_edges].tolist(), second[core_edges].tolist()):
+        union_find.union(i, j)
+    cores = np.flatnonzero(is_core)
+    roots = np.array([union_find.find(i) for i in cores.tolist()], dtype=np.int64)
+    # clusters are numbered in the order of their first core stay
+    _, first_cores, core_labels = np.unique(roots, return_index=True, return_inverse=True)
+    ranks = np.empty(len(first_cores), dtype=np.int64)
+    ranks[np.argsort(first_cores)] = np.arange(len(first_cores))
+    labels = np.full(n, n, dtype=np.int64)
+    labels[cores] = ranks[core_labels.reshape(-1)]
+    # every border stay joins the first cluster reaching it
+    border_edges = is_core[first] != is_core[second]
+    first_is_core = is_core[first[border_edges]]
+    borders = np.where(first_is_core, second[border_edges], first[border_edges])
+    np.minimum.at(labels, borders, labels[np.where(first_is_core, first[border_edges], second[border_edges])])
+    clustered = np.flatnonzero(labels < n)
+    order = clustered[np.argsort(labels[clustered], kind='stable')]
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    clusters = [cluster.tolist() for cluster in np.split(order, boundaries)] if len(order) > 0 else []
+    if stats is not None:
+        stats.add(neighbour_pairs=len(first), cluster_merges=len(clustered) - len(clusters))
+    return clusters
+
+
+def aggregate_grid(x_lon, y_lat, x_lon_deg, y_lat_deg, radius, min_points=1, distance_method='haversine',
+                   stats=None):
+    """
+    Aggregates stays by buckets of a fixed grid: the stays in a cell of the grid of a GridIndex with the given radius
+    form a cluster, if they are at least min_points. No distances are computed, so this is an approximation for very
+    large sets of stays: stays closer than radius in neighbouring cells are not merged, and stays in a cell may be up
+    to sqrt(3) times the chord length of radius (about 1.7 * radius) apart. It takes O(n log n) for n stays.
+
+    Parameters
+    ----------
+    x_lon, y_lat : numpy.ndarray
+        The coordinates of the stays in radians.
+    x_lon_deg, y_lat_deg : numpy.ndarray
+        The coordinates of the stays in degrees, which are not used.
+    radius : float
+        The size of the grid cells in meters.
+    min_points : int
+        A minimum number of stays in a cell necessary to create a cluster.
+    distance_method : {'haversine', 'equirectangular', 'local'}
+        Not used, no distances are computed.
+    stats : DetectionStats, optional
+        Receives the counts of the aggregation.
+
+    Returns
+    -------
+    clusters : list
+        The clusters as ascending lists of stay indices, ordered by their last stay.
+    """
+    if len(x_lon) == 0:
+        return []
+    cell_size = max(chord_length(radius), 1e-12)
+    keys = np.floor(pv.get_unit_vectors(x_lon, y_lat) / cell_size).astype(np.int64)
+    _, cells, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    cells = cells.reshape(-1)
+    clustered = np.flatnonzero(counts[cells] >= min_points)
+    order = clustered[np.argsort(cells[clustered], kind='stable')]
+    boundaries = np.flatnonzero(np.diff(cells[order])) + 1
+    clusters = [cluster.tolist() for cluster in np.split(order, boundaries)] if len(order) > 0 else []
+    clusters.sort(key=lambda cluster: cluster[-1])
+    if stats is not None:
+        stats.add(cluster_merges=len(clustered) - len(clusters))
+    return clusters
+
+
+AGGREGATION_METHODS = {'neighbourhood': aggregate_neighbourhoods, 'dbscan': aggregate_dbscan, 'grid': aggregate_grid}
+
+
+def aggregate_stays(stays, distance_threshold, min_points=1, merge_threshold=0.5, distance_method='haversine',
+                    stats=None, aggregation_method='neighbourhood'):
+    """
+    Aggregates stays into clusters (phase 2 of extract_pois) within merge_threshold * distance_threshold of each other.
+
+    The aggregation_method selects the backend:
+        'neighbourhood': every stay with at least min_points stays in its neighbourhood forms a cluster with its
+            neighbourhood, clusters sharing a stay are merged (see aggregate_neighbourhoods). O(n log n + p).
+        'dbscan': DBSCAN with min_points as minPts, where stays at the border of several clusters do not merge them
+            (see aggregate_dbscan). O(n log n + p).
+        'grid': the stays in a cell of a fixed grid form a cluster, an approximation without distance computations for
+            very large sets of stays (see aggregate_grid). O(n log n).
+    Here n is the number of stays and p the number of pairs of stays in neighbouring grid cells. Other backends can be
+    passed as callables with the signature of aggregate_neighbourhoods.
+
+    Parameters
+    ----------
+    stays : rt.Route or Trajectory
+        The stays with timestamps in 'latlon' format.
+    distance_threshold : float
+        The maximal diameter of the stay area in meters.
+    min_points : int
+        A minimum number of stays necessary to create a cluster.
+    merge_threshold : float
+        Defines the maximum distance in percent of distance_threshold, under which stays are merged.
+    distance_method : {'haversine', 'equirectangular', 'local'}
+        How distances are computed before the exact check near the threshold, see get_neighbour_pairs.
+    stats : DetectionStats, optional
+        Receives the counts of this phase and its duration as 'aggregate_stays'.
+    aggregation_method : {'neighbourhood', 'dbscan', 'grid'} or callable
+        The backend aggregating the stays.
+
+    Returns
+    -------
+    clusters : list
+        The clusters as ascending lists of stay indices.
+    """
+    if callable(aggregation_method):
+        aggregate = aggregation_method
+    elif aggregation_method in AGGREGATION_METHODS:
+        aggregate = AGGREGATION_METHODS[aggregation_method]
+    else:
+        raise ValueError(f"aggregation_method needs to be one of {tuple(AGGREGATION_METHODS)} or a callable.")
+    with _phase(stats, 'aggregate_stays'):
+        x_lon, y_lat, x_lon_deg, y_lat_deg, _ = get_route_arrays(stays)
+        return aggregate(x_lon, y_lat, x_lon_deg, y_lat_deg, merge_threshold * distance_threshold, min_points,
+                         distance_method, stats)
+
+
+def extract_pois(route, time_threshold, distance_threshold, min_points=1, merge_threshold=0.5, print_comments=False,
+                 distance_method='haversine', stats=None, aggregation_method='neighbourhood',
+                 centroid_method='mercator'):
     """
     Extracts places of interest from a route of geographical points with timestamps. Implementation according to
     Primault, V. (2018) Practically Preserving and Evaluating Location Privacy, p. 44.
@@ -104,7 +1180,7 @@ def extract_pois(route, time_threshold, distance_threshold, min_points=1, merge_
 
     Parameters
     ----------
-    route : rt.Route
+    route : rt.Route or Trajectory
         A route containing geographical points with timestamps in 'latlon' format, indicating a trajectory of a moving
         object.
     time_threshold : pandas.Timedelta
@@ -119,81 +1195,222 @@ def extract_pois(route, time_threshold, distance_threshold, min_points=1, merge_
         area in common.
     print_comments : bool
         Indicates whether comments should be printed to help with debugging.
+    distance_method : {'haversine', 'equirectangular', 'local'}
+        How distances are computed before the exact check near the threshold. All methods give the same result.
+    stats : DetectionStats, optional
+        Receives the counters and the durations of the phases 'extract_stays', 'stay_centroids', 'aggregate_stays',
+        'poi_centroids' and 'extract_pois' (in total) of this run, which are reported at the end of the run.
+    aggregation_method : {'neighbourhood', 'dbscan', 'grid'} or callable
+        The backend aggregating the stays into POIs, see aggregate_stays. The default follows Primault, V. (2018).
+    centroid_method : {'mercator', 'spherical'}
+        How stays and POIs are averaged, see calculate_centroids.
 
     Returns
     -------
     pois : list
         A list of geodata.point.Point objects each representing a place of interest found in the route.
     """
-    # 1. Extract stays
-    # Route objects are used as point collections
-    stays = rt.Route()      # Stays extracted so far
-    candidate_stay = rt.Route()     # collection of points that form a stay region
-    idx = 0
-    route_len = len(route)
-    route = route.deep_copy()
-    while idx < route_len:
-        # get max distance between current route point and all points in stay
-        candidate_stay_diameter = 0
-        for event in candidate_stay:
-            distance_event_to_route_point = pt.get_distance(route[idx], event)
-            if distance_event_to_route_point > candidate_stay_diameter:
-                candidate_stay_diameter = distance_event_to_route_point
-        if print_comments:
-            print("max distance in stay", candidate_stay_diameter)
-
-        # check if adding this route point to the candidate stay will surpass its allowed diameter
-        # if the candidate stay is still empty, the current route point will be added to it by default
-        if candidate_stay_diameter <= distance_threshold:
-            candidate_stay.append(route[idx])
-            if print_comments:
-                print("appending point to candidate stay", route[idx].to_cartesian())
-            idx += 1
-        # if the diameter is surpassed, check if the elapsed time inside the candidate stay is above the time_threshold
-        else:
-            if print_comments:
-                print("max allowed distance in stay of", distance_threshold, "surpassed")
-            # since Route objects are kept sorted by timestamp, min/max timestamp correlate to first/last route point
-            max_events_time = candidate_stay[len(candidate_stay) - 1].timestamp
-            min_events_time = candidate_stay[0].timestamp
-            # if time_threshold is surpassed, the candidate stay is valid and appended to the valid stays
-            if print_comments:
-                print("max time in candidate stay is", (max_events_time - min_events_time))
-            if max_events_time - min_events_time >= time_threshold:
-                if print_comments:
-                    print("passed time in candidate stay and is bigger than allowed threshold of", time_threshold)
-                centroid = calculate_centroid(candidate_stay)
-                stays.append(centroid)
-                if print_comments:
-                    print("appending centroid to stay", centroid.to_cartesian())
-                # reset candidate stay
-                candidate_stay = rt.Route()
-                if print_comments:
-                    print("")
-            else:
-                if print_comments:
-                    print("passed time in candidate stay and is below the allowed threshold of", time_threshold)
-                    print("removing candidate stay", candidate_stay[0].to_cartesian())
-                candidate_stay.remove(candidate_stay[0])
-
-    # 2. Aggregate POIs
-    clusters = []   # list of Route objects
-    for stay in stays:
-        # get neighbourhood around stay consisting of other stays
-        neighbourhood = rt.Route()
-        for neighbour in stays:
-            if pt.get_distance(neighbour, stay) <= merge_threshold * distance_threshold:
-                neighbourhood.append(neighbour)
-        # if neighbourhood is big enough (number of stays in a region surpasses a threshold)
-        if len(neighbourhood) >= min_points:
-            # if clusters are empty, the first neighbourhood will be appended by default
-            for cluster in clusters:
-                # if at least one stay of the neighbourhood is already in one of the clusters, extend that cluster by
-                # the neighbourhood
-                if len(intersection(neighbourhood, cluster)) > 0:
-                    # extend the cluster by all stays of the neighbourhood
-                    neighbourhood = union(neighbourhood, cluster)
-                    clusters.remove(cluster)
-            clusters.append(neighbourhood)
-    pois = [calculate_centroid(cluster) for cluster in clusters]
+    with _phase(stats, 'extract_pois'):
+        # 1. Extract stays
+        stays = extract_stays(route, time_threshold, distance_threshold, distance_method, stats)
+        with _phase(stats, 'stay_centroids'):
+            stays = get_stay_centroids(route, stays, print_comments, centroid_method)
+
+        # 2. Aggregate POIs
+        clusters = aggregate_stays(stays, distance_threshold, min_points, merge_threshold, distance_method, stats,
+                                   aggregation_method)
+        with _phase(stats, 'poi_centroids'):
+            pois = get_cluster_centroids(stays, clusters, centroid_method)
+    if stats is not None:
+        stats.add(pois=len(pois))
+        stats.report('extract_pois')
     return pois
+
+
+def iter_time_chunks(route, interval):
+    """
+    Splits a route into chunks of consecutive fixes by time, e.g. into days, as input to extract_pois_chunked. Chunks
+    of a Trajectory share its arrays, so chunks of a TrajectoryStore view are read from disk only when processed.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        The route with timestamps in 'latlon' format.
+    interval : pandas.Timedelta
+        The time span of a chunk. Chunks are aligned to multiples of interval since epoch (UTC), so daily chunks
+        start at midnight UTC.
+
+    Yields
+    ------
+    rt.Route or Trajectory
+        The non-empty chunks in chronological order.
+    """
+    interval = pd.Timedelta(interval).value
+    if interval <= 0:
+        raise ValueError("interval needs to be positive.")
+    if len(route) == 0:
+        return
+    if not route.has_timestamps():
+        raise ValueError("The route needs to have timestamps.")
+    timestamps = route.timestamps if isinstance(route, Trajectory) else get_route_arrays(route)[4]
+    buckets = timestamps // interval
+    boundaries = np.flatnonzero(buckets[1:] != buckets[:-1]) + 1
+    for start, stop in zip(np.r_[0, boundaries].tolist(), np.r_[boundaries, len(timestamps)].tolist()):
+        yield route[start:stop] if isinstance(route, Trajectory) else rt.Route(route[start:stop])
+
+
+def _get_chunk(chunk):
+    """
+    Returns a chunk of extract_pois_chunked as rt.Route or Trajectory.
+    """
+    if isinstance(chunk, (rt.Route, Trajectory)):
+        return chunk
+    x_lon, y_lat, timestamps = chunk
+    return Trajectory(x_lon, y_lat, timestamps)
+
+
+def extract_pois_chunked(chunks, time_threshold, distance_threshold, min_points=1, merge_threshold=0.5,
+                         distance_method='haversine', stats=None, aggregation_method='neighbourhood',
+                         centroid_method='mercator'):
+    """
+    Extracts places of interest like extract_pois, but from a route passed in chunks, so only one chunk needs to be in
+    memory at a time. Phase 1 is run chunk by chunk with a StopDetector, which carries the open candidate stay across
+    chunk boundaries, so stays spanning several chunks are found as in a single run. Phase 2 is run once over the
+    stays of all chunks. The result is identical to extract_pois on the concatenated chunks, and the memory needed
+    grows with the chunk size and the longest candidate stay, not with the length of the route.
+
+    Parameters
+    ----------
+    chunks : iterable
+        The chunks in chronological order, each a rt.Route or Trajectory with timestamps in 'latlon' format, or a
+        tuple (x_lon, y_lat, timestamps) of arrays in radians and int64 nanoseconds. Iterables are consumed lazily,
+        e.g. iter_time_chunks or TrajectoryStore.iter_users.
+    time_threshold : pandas.Timedelta
+        The minimum time duration that has to be spent in every stay.
+    distance_threshold : float
+        The maximal diameter of the stay area in meters.
+    min_points : int
+        A minimum number of stays necessary to create a POI.
+    merge_threshold : float
+        Defines the maximum distance in percent of distance_threshold, under which stays are merged.
+    distance_method : {'haversine', 'equirectangular', 'local'}
+        How distances are computed before the exact check near the threshold. All methods give the same result.
+    stats : DetectionStats, optional
+        Receives the counters and the durations of the phases 'extract_stays' (including the time to read the
+        chunks), 'aggregate_stays', 'poi_centroids' and 'extract_pois' (in total) of this run, which are reported at
+        the end of the run.
+    aggregation_method : {'neighbourhood', 'dbscan', 'grid'} or callable
+        The backend aggregating the stays into POIs, see aggregate_stays.
+    centroid_method : {'mercator', 'spherical'}
+        How stays and POIs are averaged, see calculate_centroids.
+
+    Returns
+    -------
+    pois : list
+        A list of geodata.point.Point objects each representing a place of interest found in the route.
+    """
+    detector = StopDetector(time_threshold, distance_threshold, distance_method, centroid_method)
+    stays = []
+    with _phase(stats, 'extract_pois'):
+        with _phase(stats, 'extract_stays'):
+            for chunk in chunks:
+                stays.extend(detector.update_batch(_get_chunk(chunk)))
+        # like in extract_pois, the candidate stay at the end of the route is dropped
+        stays = rt.Route(stays)
+        clusters = aggregate_stays(stays, distance_threshold, min_points, merge_threshold, distance_method, stats,
+                                   aggregation_method)
+        with _phase(stats, 'poi_centroids'):
+            pois = get_cluster_centroids(stays, clusters, centroid_method)
+    if stats is not None:
+        stats.add(**detector.get_counts(), pois=len(pois))
+        stats.report('extract_pois_chunked')
+    return pois
+
+
+def _extract_pois_worker(user_id, trajectory, time_threshold, distance_threshold, min_points, merge_threshold,
+                         distance_method, aggregation_method, centroid_method):
+    """
+    Runs extract_pois for a single user inside a worker process.
+    """
+    return user_id, extract_pois(trajectory, time_threshold, distance_threshold, min_points, merge_threshold,
+                                 distance_method=distance_method, aggregation_method=aggregation_method,
+                                 centroid_method=centroid_method)
+
+
+def extract_pois_batch(routes, time_threshold, distance_threshold, min_points=1, merge_threshold=0.5,
+                       max_workers=None, max_pending=None, distance_method='haversine',
+                       aggregation_method='neighbourhood', centroid_method='mercator'):
+    """
+    Extracts places of interest for many users in parallel, using a pool of worker processes. Routes are sent to the
+    workers as Trajectory objects, i.e. as a few numpy arrays instead of pickled lists of PointT objects. Results are
+    yielded in the order in which the workers finish. A failing user does not affect the other users.
+
+    Parameters
+    ----------
+    routes : dict or iterable
+        A mapping or an iterable of (user_id, route) pairs, where route is a rt.Route or Trajectory with timestamps in
+        'latlon' format. Iterables are consumed lazily.
+    time_threshold : pandas.Timedelta
+        The minimum time duration that has to be spent in every stay.
+    distance_threshold : float
+        The maximal diameter of the stay area in meters.
+    min_points : int
+        A minimum number of stays necessary to create a POI.
+    merge_threshold : float
+        Defines the maximum distance in percent of distance_threshold, under which stays are merged.
+    max_workers : int, optional
+        The number of worker processes. Defaults to the number of processors.
+    max_pending : int, optional
+        The maximal number of routes submitted to the pool but not yet finished, which bounds the memory used for
+        queued routes. Defaults to four times the number of workers.
+    distance_method : {'haversine', 'equirectangular', 'local'}
+        How distances are computed before the exact check near the threshold. All methods give the same result.
+    aggregation_method : {'neighbourhood', 'dbscan', 'grid'} or callable
+        The backend aggregating the stays into POIs, see aggregate_stays. Callables need to be picklable.
+    centroid_method : {'mercator', 'spherical'}
+        How stays and POIs are averaged, see calculate_centroids.
+
+    Yields
+    ------
+    user_id, pois, error : tuple
+        The user_id, the list of POIs found for the user (None on failure) and the exception raised for the user
+        (None on success).
+    """
+    if isinstance(routes, dict):
+        routes = routes.items()
+    routes = iter(routes)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 4 * max_workers
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    user_id, route = next(routes)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if not isinstance(route, Trajectory):
+                    # malformed routes fail for their user only, like errors in the workers
+                    try:
+                        route = Trajectory.from_route(route)
+                    except Exception as error:
+                        yield user_id, None, error
+                        continue
+                future = executor.submit(_extract_pois_worker, user_id, route, time_threshold, distance_threshold,
+                                         min_points, merge_threshold, distance_method, aggregation_method,
+                                         centroid_method)
+                pending[future] = user_id
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                user_id = pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    yield user_id, future.result()[1], None
+                else:
+                    yield user_id, None, error
@@ -1 +1,381 @@
+"""
+Calculates how often and how long places of interest (POIs) are visited. Every stay found by
+stop_detection.extract_stays is a visit of the POI it is assigned to, lasting from its first to its last route point.
 
+Stays are assigned to POIs with a GridIndex and all statistics are aggregated per POI with grouped array operations, so
+location histories spanning years can be processed at once.
+"""
+import numpy as np
+
+from geoDetection import point_vector as pv
+from geoDetection import stop_detection as sd
+from geoDetection.spatial_index import GridIndex
+from geoDetection.trajectory import Trajectory
+from geoDetection.lazy_import import LazyModule
+
+pd = LazyModule('pandas', 'timestamps and data frames')
+
+HOURS_PER_WEEK = 168
+_NS_PER_HOUR = 3_600_000_000_000
+_NS_PER_WEEK = HOURS_PER_WEEK * _NS_PER_HOUR
+# 1970-01-01 was a Thursday, shifting by three days lets weeks start on Monday 00:00
+_MONDAY_OFFSET_NS = 3 * 24 * _NS_PER_HOUR
+
+
+def get_stay_arrays(route, stays):
+    """
+    Returns the centroids and the arrival and departure times of stays as arrays. The centroids are computed with
+    stop_detection.calculate_centroids, as the mean of the stay points in the cartesian projection.
+
+    Parameters
+    ----------
+    route : rt.Route or Trajectory
+        The route with timestamps in 'latlon' format the stays were extracted from.
+    stays : list
+        The stays as (start, stop) index ranges into route, ordered and not overlapping, as returned by
+        stop_detection.extract_stays.
+
+    Returns
+    -------
+    x_lon, y_lat, arrivals, departures : numpy.ndarray
+        The centroids in radians and the timestamps of the first and the last point of each stay in nanoseconds.
+    """
+    x_lon, y_lat, _, _, timestamps = sd.get_route_arrays(route)
+    stays = np.asarray(stays, dtype=np.int64).reshape(-1, 2)
+    starts, stops = stays[:, 0], stays[:, 1]
+    if np.any(stops <= starts) or np.any(starts[1:] < stops[:-1]) or (len(stays) and stops[-1] > len(x_lon)):
+        raise ValueError("Stays need to be ordered, non-empty and non-overlapping (start, stop) ranges into route.")
+    if len(stays) == 0:
+        empty = np.empty(0)
+        return empty, empty, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    counts = stops - starts
+    indices = np.arange(int(counts.sum())) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    centroid_x_lon, centroid_y_lat, _ = sd.calculate_centroids(x_lon[indices], y_lat[indices], timestamps[indices],
+                                                               np.repeat(np.arange(len(stays)), counts), len(stays))
+    return centroid_x_lon, centroid_y_lat, timestamps[starts], timestamps[stops - 1]
+
+
+def assign_stays(x_lon, y_lat, pois, radius):
+    """
+    Assigns every stay to the nearest POI within radius. Ties are resolved in favour of the POI listed first.
+
+    Parameters
+    ----------
+    x_lon, y_lat : numpy.ndarray
+        The stay centroids in radians.
+    pois : array_like, rt.Route or Trajectory
+        The POIs in 'latlon' format, e.g. as returned by stop_detection.extract_pois.
+    radius : float
+        The maximal distance in meters between a stay and its POI.
+
+    Returns
+    -------
+    labels, distances : numpy.ndarray, numpy.ndarray
+        The index of the POI of each stay (-1, if no POI is within radius) and the distance to it in meters (NaN, if
+        no POI is within radius).
+    """
+    labels = np.full(len(x_lon), -1, dtype=np.int64)
+    distances = np.full(len(x_lon), np.inf)
+    if len(pois) > 0 and len(x_lon) > 0:
+        poi_x_lon, poi_y_lat, geo_reference_system = pv.get_coordinates(pois)
+        if geo_reference_system != 'latlon':
+            raise ValueError("The POIs need to be in 'latlon' format.")
+        # POIs are few compared to the stays of a long history, so the stays are indexed and every POI is queried
+        index = GridIndex(x_lon, y_lat, radius)
+        for poi_idx, (lon, lat) in enumerate(zip(np.ravel(poi_x_lon).tolist(), np.ravel(poi_y_lat).tolist())):
+            members, member_distances = index.query_radius(lon, lat)
+            closer = member_distances < distances[members]
+            labels[members[closer]] = poi_idx
+            distances[members[closer]] = member_distances[closer]
+    distances[labels < 0] = np.nan
+    return labels, distances
+
+
+def _as_pois(pois):
+    """
+    Returns POIs given as a coordinate array of shape (2,) or (n, 2) as an array of shape (n, 2), so that their number
+    is len(pois) like for routes, trajectories and lists of points, which are returned unchanged.
+    """
+    if isinstance(pois, Trajectory) or \
+            (isinstance(pois, list) and len(pois) > 0 and hasattr(pois[0], 'get_geo_reference_system')):
+        return pois
+    return np.asarray(pois, dtype=np.float64).reshape(-1, 2)
+
+
+def _get_timezone(route):
+    """
+    Returns the timezone of the timestamps of a route or None, if they are timezone-naive.
+    """
+    if isinstance(route, Trajectory):
+        return route.timezone
+    return route[0].get_timezone() if len(route) > 0 else None
+
+
+def _get_hour_of_week_occupancy(offsets, durations):
+    """
+    Returns the hours spent in every hour of the week by visits arriving offsets hours after the start of the week and
+    lasting durations hours (less than a week each).
+    """
+    edges = np.arange(2 * HOURS_PER_WEEK + 1, dtype=np.float64)
+
+    def time_after(times):
+        # sum of (edge - time) over all sorted times before each edge
+        times = np.sort(times)
+        count = np.searchsorted(times, edges)
+        return count * edges - np.concatenate(([0.0], np.cumsum(times)))[count]
+
+    # the time spent before an edge is the time after all arrivals minus the time after all departures
+    occupancy = np.diff(time_after(offsets) - time_after(offsets + durations))
+    # visits may last into the following week
+    return occupancy[:HOURS_PER_WEEK] + occupancy[HOURS_PER_WEEK:]
+
+
+class VisitFrequency:
+    """Visit statistics of places of interest. One entry per visit (the POI it belongs to and its arrival and
+    departure in nanoseconds since epoch) is stored, statistics are aggregated per POI when they are requested.
+    """
+
+    def __init__(self, labels, arrivals, departures, n_pois, timezone=None, pois=None):
+        """
+        Creates a new VisitFrequency object.
+
+        Parameters
+        ----------
+        labels : array_like
+            The POI index of each visit. Visits labelled -1 do not belong to any POI and are ignored.
+        arrivals, departures : array_like
+            The arrival and departure time of each visit in nanoseconds since epoch.
+        n_pois : int
+            The number of POIs.
+        timezone : str or tzinfo, optional
+            The timezone in which hours of the week are counted and in which timestamps are returned.
+        pois : list, optional
+            The POIs, used to add their coordinates to data frames.
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        arrivals = np.asarray(arrivals, dtype=np.int64)
+        departures = np.asarray(departures, dtype=np.int64)
+        if not len(labels) == len(arrivals) == len(departures):
+            raise ValueError("labels, arrivals and departures need to have the same length.")
+        if np.any(labels >= n_pois) or np.any(departures < arrivals):
+            raise ValueError("Visits need to belong to one of the n_pois POIs and may not end before they start.")
+        valid = labels >= 0
+        # grouping by POI once, every statistic is a reduction over consecutive array segments
+        order = np.argsort(labels[valid], kind='stable')
+        self.labels = labels[valid][order]
+        self.arrivals = arrivals[valid][order]
+        self.departures = departures[valid][order]
+        self.n_pois = n_pois
+        self.timezone = timezone
+        self.pois = pois
+        self._present, self._segment_starts = np.unique(self.labels, return_index=True)
+
+    @classmethod
+    def from_stays(cls, route, stays, pois, radius, timezone=None):
+        """
+        Creates a VisitFrequency object by assigning stays to the nearest POI within radius.
+
+        Parameters
+        ----------
+        route : rt.Route or Trajectory
+            The route with timestamps in 'latlon' format the stays were extracted from.
+        stays : list
+            The stays as (start, stop) index ranges into route, as returned by stop_detection.extract_stays.
+        pois : array_like, rt.Route or Trajectory
+            The POIs in 'latlon' format, a single POI may be given as coordinates of shape (2,).
+        radius : float
+            The maximal distance in meters between a stay and its POI.
+        timezone : str or tzinfo, optional
+            The timezone in which hours of the week are counted. Defaults to the timezone of the route's timestamps.
+
+        Returns
+        -------
+        VisitFrequency
+            The visit statistics of the POIs.
+        """
+        pois = _as_pois(pois)
+        x_lon, y_lat, arrivals, departures = get_stay_arrays(route, stays)
+        labels, _ = assign_stays(x_lon, y_lat, pois, radius)
+        timezone = _get_timezone(route) if timezone is None else timezone
+        return cls(labels, arrivals, departures, len(pois), timezone, pois)
+
+    @classmethod
+    def from_route(cls, route, time_threshold, distance_threshold, min_points=1, merge_threshold=0.5, timezone=None):
+        """
+        Extracts POIs like stop_detection.extract_pois and counts the stays of every POI cluster as its visits.
+
+        Parameters
+        ----------
+        route : rt.Route or Trajectory
+            A route containing geographical points with timestamps in 'latlon' format.
+        time_threshold : pandas.Timedelta
+            The minimum time duration that has to be spent in every stay.
+        distance_threshold : float
+            The maximal diameter of the stay area in meters.
+        min_points : int
+            A minimum number of stays necessary to create a POI.
+        merge_threshold : float
+            Defines the maximum distance in percent of distance_threshold, under which stays are merged.
+        timezone : str or tzinfo, optional
+            The timezone in which hours of the week are counted. Defaults to the timezone of the route's timestamps.
+
+        Returns
+        -------
+        VisitFrequency
+            The visit statistics of the POIs, which are available as its pois attribute.
+        """
+        stays = sd.extract_stays(route, time_threshold, distance_threshold)
+        centroids = sd.get_stay_centroids(route, stays)
+        clusters = sd.aggregate_stays(centroids, distance_threshold, min_points, merge_threshold)
+        pois = sd.get_cluster_centroids(centroids, clusters)
+        labels = np.full(len(stays), -1, dtype=np.int64)
+        for poi_idx, cluster in enumerate(clusters):
+            labels[cluster] = poi_idx
+        _, _, arrivals, departures = get_stay_arrays(route, stays)
+        timezone = _get_timezone(route) if timezone is None else timezone
+        return cls(labels, arrivals, departures, len(pois), timezone, pois)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _reduce(self, ufunc, values, fill_value):
+        """
+        Reduces values per POI with ufunc, POIs without visits get fill_value.
+        """
+        result = np.full(self.n_pois, fill_value, dtype=values.dtype)
+        if len(values) > 0:
+            result[self._present] = ufunc.reduceat(values, self._segment_starts)
+        return result
+
+    def _to_datetimes(self, timestamps):
+        """
+        Converts nanoseconds since epoch into a DatetimeIndex in the timezone of the visits.
+        """
+        datetimes = pd.DatetimeIndex(timestamps.view('datetime64[ns]'))
+        if self.timezone is not None:
+            datetimes = datetimes.tz_localize('UTC').tz_convert(self.timezone)
+        return datetimes
+
+    def _to_local(self, timestamps):
+        """
+        Converts nanoseconds since epoch into nanoseconds of local wall time.
+        """
+        if self.timezone is None:
+            return timestamps
+        return self._to_datetimes(timestamps).tz_localize(None).values.view(np.int64)
+
+    def get_visit_counts(self):
+        """
+        Returns the number of visits of every POI.
+
+        Returns
+        -------
+        numpy.ndarray
+            The visit counts as int64 array of length n_pois.
+        """
+        return np.bincount(self.labels, minlength=self.n_pois).astype(np.int64)
+
+    def get_total_dwell_times(self):
+        """
+        Returns the time spent at every POI.
+
+        Returns
+        -------
+        numpy.ndarray
+            The total dwell times as timedelta64[ns] array of length n_pois.
+        """
+        return self._reduce(np.add, self.departures - self.arrivals, 0).view('timedelta64[ns]')
+
+    def get_mean_dwell_times(self):
+        """
+        Returns the average duration of a visit of every POI.
+
+        Returns
+        -------
+        numpy.ndarray
+            The mean dwell times as timedelta64[ns] array of length n_pois, NaT for POIs without visits.
+        """
+        counts = self.get_visit_counts()
+        totals = self.get_total_dwell_times().view(np.int64)
+        means = np.full(self.n_pois, np.datetime64('NaT').view(np.int64), dtype=np.int64)
+        visited = counts > 0
+        means[visited] = totals[visited] // counts[visited]
+        return means.view('timedelta64[ns]')
+
+    def get_first_visits(self):
+        """
+        Returns the arrival time of the first visit of every POI.
+
+        Returns
+        -------
+        pandas.DatetimeIndex
+            The first arrivals, NaT for POIs without visits.
+        """
+        nat = np.datetime64('NaT').view(np.int64)
+        return self._to_datetimes(self._reduce(np.minimum, self.arrivals, nat))
+
+    def get_last_visits(self):
+        """
+        Returns the arrival time of the last visit of every POI.
+
+        Returns
+        -------
+        pandas.DatetimeIndex
+            The last arrivals, NaT for POIs without visits.
+        """
+        nat = np.datetime64('NaT').view(np.int64)
+        return self._to_datetimes(self._reduce(np.maximum, self.arrivals, nat))
+
+    def get_hour_of_week_histograms(self, weight='visits'):
+        """
+        Returns for every POI, how its visits are distributed over the 168 hours of the week (Monday 00:00 - 01:00
+        being hour 0) in local time.
+
+        Parameters
+        ----------
+        weight : {'visits', 'dwell'}
+            'visits' counts the arrivals within every hour, 'dwell' sums the hours spent at the POI within every
+            hour, splitting visits across all hours they cover.
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of shape (n_pois, 168), int64 visit counts or float64 hours.
+        """
+        if weight not in ('visits', 'dwell'):
+            raise ValueError("weight can only be 'visits' or 'dwell'.")
+        offsets = (self._to_local(self.arrivals) + _MONDAY_OFFSET_NS) % _NS_PER_WEEK
+        if weight == 'visits':
+            hours = offsets // _NS_PER_HOUR
+            return np.bincount(self.labels * HOURS_PER_WEEK + hours,
+                               minlength=self.n_pois * HOURS_PER_WEEK).reshape(self.n_pois, HOURS_PER_WEEK)
+        # whole weeks cover every hour once, only the remainders are distributed
+        full_weeks, remainders = np.divmod(self.departures - self.arrivals, _NS_PER_WEEK)
+        histograms = np.repeat(np.bincount(self.labels, weights=full_weeks, minlength=self.n_pois)[:, np.newaxis],
+                               HOURS_PER_WEEK, axis=1)
+        segments = np.append(self._segment_starts, len(self.labels))
+        for poi_idx, first, last in zip(self._present.tolist(), segments[:-1].tolist(), segments[1:].tolist()):
+            histograms[poi_idx] += _get_hour_of_week_occupancy(offsets[first:last] / _NS_PER_HOUR,
+                                                                remainders[first:last] / _NS_PER_HOUR)
+        return histograms
+
+    def to_dataframe(self):
+        """
+        Returns the statistics of all POIs as a pandas.DataFrame with one row per POI.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The columns visits, total_dwell, mean_dwell, first_visit and last_visit, preceded by the POI coordinates
+            x_lon and y_lat, if the POIs are known.
+        """
+        columns = {}
+        if self.pois is not None:
+            x_lon, y_lat, _ = pv.get_coordinates(self.pois) if len(self.pois) > 0 else (np.empty(0), np.empty(0), None)
+            columns['x_lon'], columns['y_lat'] = x_lon, y_lat
+        columns['visits'] = self.get_visit_counts()
+        columns['total_dwell'] = self.get_total_dwell_times()
+        columns['mean_dwell'] = self.get_mean_dwell_times()
+        columns['first_visit'] = self.get_first_visits()
+        columns['last_visit'] = self.get_last_visits()
+        return pd.DataFrame(columns, index=pd.RangeIndex(self.n_pois, name='poi'))
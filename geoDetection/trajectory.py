@@ -0,0 +1,831 @@
+"""Provides a columnar trajectory datatype, storing geo-coordinates, timestamps and measurements in contiguous arrays.
+"""
+import warnings
+
+import numpy as np
+
+from geoDetection.lazy_import import LazyModule
+from geoDetection.point import Point
+from geoDetection.point_t import PointT
+from geoDetection import point_vector as pv
+
+pd = LazyModule('pandas', 'timestamps')
+
+
+class TrajectoryPoint:
+    """A lightweight, read-only view onto a single fix of a Trajectory. No Point object is built unless to_point is
+    called.
+    """
+
+    __slots__ = ('trajectory', 'idx')
+
+    def __init__(self, trajectory, idx):
+        """
+        Creates a new TrajectoryPoint view.
+
+        Parameters
+        ----------
+        trajectory : Trajectory
+            The trajectory this view refers to.
+        idx : int
+            The position of the fix inside trajectory.
+        """
+        self.trajectory = trajectory
+        self.idx = idx
+
+    @property
+    def x_lon(self):
+        return float(self.trajectory.x_lon[self.idx])
+
+    @property
+    def y_lat(self):
+        return float(self.trajectory.y_lat[self.idx])
+
+    @property
+    def timestamp(self):
+        return self.trajectory.get_timestamp(self.idx)
+
+    @property
+    def measurement_value(self):
+        return self.trajectory.get_measurement(self.idx)[0]
+
+    @property
+    def measurement_type(self):
+        return self.trajectory.get_measurement(self.idx)[1]
+
+    def get_geo_reference_system(self):
+        return self.trajectory.get_geo_reference_system()
+
+    def get_coordinates_unit(self):
+        return self.trajectory.get_coordinates_unit()
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, key):
+        return [self.x_lon, self.y_lat][key]
+
+    def __iter__(self):
+        yield self.x_lon
+        yield self.y_lat
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"TrajectoryPoint({list(self)})"
+
+    def to_point(self):
+        """
+        Builds a Point or PointT object from this view.
+
+        Returns
+        -------
+        Point
+            A PointT, if the trajectory has timestamps, else a Point.
+        """
+        return self.trajectory.get_point(self.idx)
+
+
+class Trajectory:
+    """A sequence of points stored column-wise. Longitudes, latitudes, timestamps (int64 nanoseconds), measurement
+    values and measurement type codes are kept in separate numpy arrays. If timestamps are given, the trajectory is
+    sorted by time.
+    """
+
+    def __init__(self, x_lon, y_lat, timestamps=None, measurement_values=None, measurement_types=None,
+                 geo_reference_system='latlon', coordinates_unit='radians', timezone=None, _validated=False):
+        """
+        Creates a new Trajectory object.
+
+        Parameters
+        ----------
+        x_lon : array_like
+            The x-coordinates respectively longitudes of the fixes.
+        y_lat : array_like
+            The y-coordinates respectively latitudes of the fixes.
+        timestamps : array_like, optional
+            The timestamps of the fixes. Anything pandas.to_datetime accepts, or int64 nanoseconds since epoch.
+        measurement_values : array_like, optional
+            The measurement value of each fix. Missing values are stored as NaN.
+        measurement_types : array_like, optional
+            The measurement type of each fix. Types are stored as int32 codes into measurement_type_names, missing
+            types as -1.
+        geo_reference_system : {'latlon', 'cartesian'}
+            Geographical reference system of the coordinates.
+        coordinates_unit : {'radians', 'degrees'}
+            The coordinates unit of the fixes.
+        timezone : str or tzinfo, optional
+            Timezone that is attached to timestamps when they are converted back into pandas.Timestamp objects.
+        """
+        if geo_reference_system not in ('cartesian', 'latlon'):
+            raise ValueError("Geo reference system can only be 'latlon' or 'cartesian'.")
+        if coordinates_unit not in ('radians', 'degrees'):
+            raise ValueError("Coordinates unit can only be 'radians' or 'degrees'.")
+        if geo_reference_system == 'cartesian' and coordinates_unit == 'degrees':
+            raise ValueError("If the geo_reference_system is 'cartesian', coordinates_unit may only be 'radians'.")
+        self.__geo_reference_system = geo_reference_system
+        self.__coordinates_unit = coordinates_unit
+        self.timezone = timezone
+        self.measurement_type_names = []
+
+        self.x_lon = np.asarray(x_lon, dtype=np.float64)
+        self.y_lat = np.asarray(y_lat, dtype=np.float64)
+        n = len(self.x_lon)
+        if self.x_lon.ndim != 1 or self.y_lat.shape != self.x_lon.shape:
+            raise ValueError("x_lon and y_lat need to be one-dimensional and of same length.")
+
+        self.timestamps = None
+        if timestamps is not None:
+            self.timestamps = self._to_nanoseconds(timestamps)
+            if len(self.timestamps) != n:
+                raise ValueError("Timestamps and coordinates need to be of same length.")
+
+        if measurement_values is None:
+            self.measurement_values = np.full(n, np.nan)
+        elif isinstance(measurement_values, np.ndarray):
+            self.measurement_values = measurement_values.astype(np.float64, copy=False)
+        else:
+            self.measurement_values = np.array([np.nan if value is None else value for value in measurement_values],
+                                               dtype=np.float64)
+        if measurement_types is None:
+            self.measurement_type_codes = np.full(n, -1, dtype=np.int32)
+        else:
+            codes, names = self._encode_measurement_types(measurement_types)
+            self.measurement_type_codes = codes
+            self.measurement_type_names = names
+        if len(self.measurement_values) != n or len(self.measurement_type_codes) != n:
+            raise ValueError("Measurements and coordinates need to be of same length.")
+
+        if not _validated:
+            if not self.is_coordinates_unit_valid():
+                raise Exception(f"Coordinates are not in the valid value range for coordinates_unit '"
+                                f"{self.get_coordinates_unit()}'.")
+            if self.timestamps is not None and n > 1 and np.any(np.diff(self.timestamps) < 0):
+                self.sort_by_time()
+
+    def _to_nanoseconds(self, timestamps):
+        """
+        Converts timestamps into an int64 array of nanoseconds since epoch and remembers their timezone.
+        """
+        if isinstance(timestamps, np.ndarray) and timestamps.dtype == np.int64:
+            return timestamps
+        timestamps = pd.DatetimeIndex(pd.to_datetime(list(timestamps) if not hasattr(timestamps, 'dtype')
+                                                     else timestamps))
+        if timestamps.tz is not None:
+            self.timezone = timestamps.tz
+            timestamps = timestamps.tz_convert('UTC').tz_localize(None)
+        return timestamps.values.astype('datetime64[ns]').view(np.int64).copy()
+
+    @staticmethod
+    def _encode_measurement_types(measurement_types):
+        """
+        Encodes measurement types into int32 codes, missing types (None or NaN) being encoded as -1.
+        """
+        codes, names = pd.factorize(np.asarray(measurement_types, dtype=object))
+        return codes.astype(np.int32), list(names)
+
+    @classmethod
+    def from_route(cls, route):
+        """
+        Creates a Trajectory from a Route or any list of Point objects.
+
+        Parameters
+        ----------
+        route : rt.Route
+            The route to convert.
+
+        Returns
+        -------
+        Trajectory
+            A trajectory holding the coordinates, timestamps and measurements of route's points.
+        """
+        if len(route) == 0:
+            return cls([], [])
+        has_timestamps = all(isinstance(point, PointT) for point in route)
+        timestamps, timezone = None, None
+        if has_timestamps:
+            timestamps = np.fromiter((point.timestamp_ns for point in route), dtype=np.int64, count=len(route))
+            timezone = route[0].get_timezone()
+        return cls([point.x_lon for point in route], [point.y_lat for point in route], timestamps=timestamps,
+                   timezone=timezone,
+                   measurement_values=[point.measurement_value for point in route],
+                   measurement_types=[point.measurement_type for point in route],
+                   geo_reference_system=route[0].get_geo_reference_system(),
+                   coordinates_unit=route[0].get_coordinates_unit())
+
+    @classmethod
+    def from_columns(cls, x_lon, y_lat, timestamps, measurement_values, measurement_type_codes,
+                     measurement_type_names=None, geo_reference_system='latlon', coordinates_unit='radians',
+                     timezone=None):
+        """
+        Creates a Trajectory around arrays that are already in its storage format, e.g. memory-mapped columns. The
+        arrays are neither copied nor validated or sorted.
+
+        Parameters
+        ----------
+        x_lon, y_lat : numpy.ndarray
+            The float64 coordinates of the fixes.
+        timestamps : numpy.ndarray or None
+            The int64 timestamps of the fixes in nanoseconds since epoch, sorted, or None.
+        measurement_values : numpy.ndarray
+            The float64 measurement values of the fixes, NaN if missing.
+        measurement_type_codes : numpy.ndarray
+            The int32 codes of the measurement types into measurement_type_names, -1 if missing.
+        measurement_type_names : list, optional
+            The measurement types.
+        geo_reference_system : {'latlon', 'cartesian'}
+            Geographical reference system of the coordinates.
+        coordinates_unit : {'radians', 'degrees'}
+            The coordinates unit of the fixes.
+        timezone : str or tzinfo, optional
+            Timezone that is attached to timestamps when they are converted back into pandas.Timestamp objects.
+
+        Returns
+        -------
+        Trajectory
+            A trajectory sharing the arrays.
+        """
+        trajectory = cls.__new__(cls)
+        trajectory.__geo_reference_system = geo_reference_system
+        trajectory.__coordinates_unit = coordinates_unit
+        trajectory.timezone = timezone
+        trajectory.measurement_type_names = [] if measurement_type_names is None else measurement_type_names
+        trajectory.x_lon = x_lon
+        trajectory.y_lat = y_lat
+        trajectory.timestamps = timestamps
+        trajectory.measurement_values = measurement_values
+        trajectory.measurement_type_codes = measurement_type_codes
+        return trajectory
+
+    def _new_like(self, x_lon, y_lat, timestamps, measurement_values, measurement_type_codes,
+                  geo_reference_system=None, coordinates_unit=None):
+        """
+        Creates a trajectory sharing this trajectory's metadata around the given (already validated) arrays.
+        """
+        return Trajectory.from_columns(x_lon, y_lat, timestamps, measurement_values, measurement_type_codes,
+                                       self.measurement_type_names, geo_reference_system or self.__geo_reference_system,
+                                       coordinates_unit or self.__coordinates_unit, self.timezone)
+
+    def __len__(self):
+        return len(self.x_lon)
+
+    def __getitem__(self, key):
+        """
+        Returns a view onto a single fix or, for slices and index arrays, a trajectory of the selected fixes. Slices
+        share the underlying arrays with this trajectory.
+
+        Parameters
+        ----------
+        key : int, slice or array_like
+            The position(s) of the fixes.
+
+        Returns
+        -------
+        TrajectoryPoint or Trajectory
+            A view onto the fix at position key, or the trajectory of the selected fixes.
+        """
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("Trajectory index out of range.")
+            return TrajectoryPoint(self, int(key))
+        timestamps = None if self.timestamps is None else self.timestamps[key]
+        return self._new_like(self.x_lon[key], self.y_lat[key], timestamps, self.measurement_values[key],
+                              self.measurement_type_codes[key])
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield TrajectoryPoint(self, idx)
+
+    def __repr__(self):
+        return f"Trajectory(n={len(self)}, geo_reference_system='{self.__geo_reference_system}', " \
+               f"coordinates_unit='{self.__coordinates_unit}')"
+
+    def has_timestamps(self):
+        """
+        Returns True, if the fixes of this trajectory have a timestamp.
+
+        Returns
+        -------
+        bool
+            True, if trajectory is not empty and fixes have timestamps, else False.
+        """
+        return self.timestamps is not None and len(self) > 0
+
+    def get_geo_reference_system(self):
+        """
+        Returns the geographical reference system of this trajectory.
+
+        Returns
+        -------
+        {'latlon', 'cartesian'}
+            The geographical reference system of this trajectory.
+        """
+        return self.__geo_reference_system
+
+    def get_coordinates_unit(self):
+        """
+        Returns the unit of this trajectory's coordinates.
+
+        Returns
+        -------
+        {'radians', 'degrees'}
+            The unit of this trajectory's coordinates.
+        """
+        return self.__coordinates_unit
+
+    def is_coordinates_unit_valid(self):
+        """
+        Checks with a single pass per column, if all coordinates lie in the valid value range of the coordinates unit.
+
+        Returns
+        -------
+        bool
+            True, if all coordinates are valid.
+        """
+        if self.__geo_reference_system == 'cartesian' or len(self) == 0:
+            return True
+        if self.__coordinates_unit == 'degrees':
+            lon_bound, lat_bound = 180, 90
+        else:
+            lon_bound, lat_bound = np.pi, np.pi
+        return bool(np.all(np.abs(self.x_lon) <= lon_bound) and np.all(np.abs(self.y_lat) <= lat_bound))
+
+    def sort_by_time(self):
+        """
+        Sorts the fixes of this trajectory by timestamp. Sorting is stable, so fixes with equal timestamps keep their
+        order.
+
+        Returns
+        -------
+        Trajectory
+            This trajectory sorted by timestamp.
+        """
+        if self.timestamps is None:
+            raise Exception("sort_by_time only applies to trajectories with timestamps.")
+        order = np.argsort(self.timestamps, kind='stable')
+        self.x_lon = self.x_lon[order]
+        self.y_lat = self.y_lat[order]
+        self.timestamps = self.timestamps[order]
+        self.measurement_values = self.measurement_values[order]
+        self.measurement_type_codes = self.measurement_type_codes[order]
+        return self
+
+    def get_timestamp(self, idx):
+        """
+        Returns the timestamp of the fix at position idx.
+
+        Parameters
+        ----------
+        idx : int
+            The position of the fix.
+
+        Returns
+        -------
+        pandas.Timestamp or None
+            The timestamp of the fix or None if this trajectory has no timestamps.
+        """
+        if self.timestamps is None:
+            return None
+        timestamp = pd.Timestamp(int(self.timestamps[idx]))
+        if self.timezone is not None:
+            timestamp = timestamp.tz_localize('UTC').tz_convert(self.timezone)
+        return timestamp
+
+    def get_timestamps(self):
+        """
+        Returns the timestamps of the fixes as a list, if the trajectory has timestamps.
+
+        Returns
+        -------
+        timestamps : List
+            The timestamps of the fixes as a list of pandas.Timestamp or None if the fixes have no timestamps.
+        """
+        if not self.has_timestamps():
+            return None
+        timestamps = pd.DatetimeIndex(self.timestamps.view('datetime64[ns]'))
+        if self.timezone is not None:
+            timestamps = timestamps.tz_localize('UTC').tz_convert(self.timezone)
+        return list(timestamps)
+
+    def get_measurement(self, idx):
+        """
+        Returns the measurement value and type of the fix at position idx.
+
+        Parameters
+        ----------
+        idx : int
+            The position of the fix.
+
+        Returns
+        -------
+        tuple
+            The measurement value and type, each None if not set.
+        """
+        value = self.measurement_values[idx]
+        code = self.measurement_type_codes[idx]
+        return (None if np.isnan(value) else float(value)), (None if code < 0 else self.measurement_type_names[code])
+
+    def get_point(self, idx):
+        """
+        Builds a Point object for the fix at position idx.
+
+        Parameters
+        ----------
+        idx : int
+            The position of the fix.
+
+        Returns
+        -------
+        Point
+            A PointT, if this trajectory has timestamps, else a Point.
+        """
+        measurement_value, measurement_type = self.get_measurement(idx)
+        coordinates = [float(self.x_lon[idx]), float(self.y_lat[idx])]
+        if self.timestamps is not None:
+            return PointT(coordinates, self.get_timestamp(idx), self.__geo_reference_system, self.__coordinates_unit,
+                          measurement_value, measurement_type)
+        return Point(coordinates, self.__geo_reference_system, self.__coordinates_unit, measurement_value,
+                     measurement_type)
+
+    def to_route(self):
+        """
+        Builds a Route of Point objects from this trajectory.
+
+        Returns
+        -------
+        rt.Route
+            A route holding one Point (or PointT) per fix.
+        """
+        from geoDetection.route import Route
+        return Route.from_trajectory(self)
+
+    def to_dataframe(self):
+        """
+        Returns the fixes of this trajectory as a pandas.DataFrame. The coordinate and measurement value columns share
+        memory with this trajectory's arrays where pandas allows it.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A data frame with the columns 'x_lon', 'y_lat', 'timestamp' (if the trajectory has timestamps),
+            'measurement_value' and 'measurement_type'.
+        """
+        columns = {'x_lon': self.x_lon, 'y_lat': self.y_lat}
+        if self.timestamps is not None:
+            timestamps = pd.DatetimeIndex(self.timestamps.view('datetime64[ns]'))
+            if self.timezone is not None:
+                timestamps = timestamps.tz_localize('UTC').tz_convert(self.timezone)
+            columns['timestamp'] = timestamps
+        columns['measurement_value'] = self.measurement_values
+        columns['measurement_type'] = pd.Categorical.from_codes(self.measurement_type_codes,
+                                                                self.measurement_type_names)
+        return pd.DataFrame(columns, copy=False)
+
+    def copy(self):
+        """
+        Creates a copy of this trajectory that shares its arrays (copy-on-write). All methods of Trajectory replace
+        arrays instead of writing into them, so changing the copy does not affect this trajectory and vice versa. Only
+        writing into the arrays directly requires a deep_copy.
+
+        Returns
+        -------
+        Trajectory
+            A copy of this trajectory sharing its arrays.
+        """
+        return self[:]
+
+    def deep_copy(self):
+        """
+        Creates a deep copy of this trajectory by copying its arrays.
+
+        Returns
+        -------
+        Trajectory
+            A deep copy of this trajectory.
+        """
+        timestamps = None if self.timestamps is None else self.timestamps.copy()
+        copy = self._new_like(self.x_lon.copy(), self.y_lat.copy(), timestamps, self.measurement_values.copy(),
+                              self.measurement_type_codes.copy())
+        copy.measurement_type_names = list(self.measurement_type_names)
+        return copy
+
+    def to_cartesian_(self, ignore_warnings=False):
+        """
+        Transforms the coordinates of this trajectory from latitude and longitude (both in radian) into cartesian. If
+        the coordinates unit is 'degrees', an error is thrown. The arrays are replaced, so views onto this trajectory
+        are not affected.
+
+        Parameters
+        ----------
+        ignore_warnings : bool
+            If True, no warning is thrown, when the geo reference system is already cartesian.
+        """
+        if self.__coordinates_unit == 'degrees':
+            raise ValueError("When converting into cartesian, the coordinates unit of a trajectory needs to be in "
+                             "'radians' format.")
+        if self.__geo_reference_system == 'latlon':
+            self.x_lon, self.y_lat = pv.to_cartesian(self.x_lon, self.y_lat)
+            self.__geo_reference_system = 'cartesian'
+        elif not ignore_warnings:
+            warnings.warn("Geo reference system is already cartesian.")
+
+    def to_cartesian(self, ignore_warnings=False):
+        """
+        Returns a copy of this trajectory with coordinates changed from latitude and longitude (both in radian) into
+        cartesian.
+
+        Parameters
+        ----------
+        ignore_warnings : bool
+            If True, no warning is thrown, when the geo reference system is already cartesian.
+
+        Returns
+        -------
+        Trajectory
+            A copy of this trajectory with coordinates transformed into cartesian format.
+        """
+        copy = self.copy()
+        copy.to_cartesian_(ignore_warnings)
+        return copy
+
+    def to_latlon_(self, ignore_warnings=False):
+        """
+        Transforms the coordinates of this trajectory from cartesian into latitude and longitude (both in radians).
+
+        Parameters
+        ----------
+        ignore_warnings : bool
+            If True, no warning is thrown, when the geo reference system is already latlon.
+        """
+        if self.__geo_reference_system == 'cartesian':
+            self.x_lon, self.y_lat = pv.to_latlon(self.x_lon, self.y_lat)
+            self.__geo_reference_system = 'latlon'
+        elif not ignore_warnings:
+            warnings.warn("Geo reference system is already latlon.")
+
+    def to_latlon(self, ignore_warnings=False):
+        """
+        Returns a copy of this trajectory with coordinates changed from cartesian into latitude and longitude (both in
+        radians).
+
+        Parameters
+        ----------
+        ignore_warnings : bool
+            If True, no warning is thrown, when the geo reference system is already latlon.
+
+        Returns
+        -------
+        Trajectory
+            A copy of this trajectory with coordinates transformed into 'latlon' format.
+        """
+        copy = self.copy()
+        copy.to_latlon_(ignore_warnings)
+        return copy
+
+    def to_degrees_(self, ignore_warnings=False):
+        """
+        Converts the coordinates of this trajectory into degrees unit, if the unit is 'radians' and the
+        geo_reference_system is 'latlon'. If the geo_reference_system is 'cartesian', an error is thrown.
+
+        Parameters
+        ----------
+        ignore_warnings : bool
+            If True, no warning is thrown, when the coordinates unit is already 'degrees'.
+        """
+        if self.__geo_reference_system != 'latlon':
+            raise ValueError("The coordinates can only be converted if the geo reference system is 'latlon.")
+        if self.__coordinates_unit == 'degrees':
+            if not ignore_warnings:
+                warnings.warn("Coordinates unit is already 'degrees'.")
+        else:
+            self.x_lon = np.degrees(self.x_lon)
+            self.y_lat = np.degrees(self.y_lat)
+            self.__coordinates_unit = 'degrees'
+
+    def to_degrees(self, ignore_warnings=False):
+        """
+        Returns a copy of this trajectory with the coordinates changed into degrees unit.
+
+        Parameters
+        ----------
+        ignore_warnings : bool
+            If True, no warning is thrown, when the coordinates unit is already 'degrees'.
+
+        Returns
+        -------
+        Trajectory
+            A copy of this trajectory with coordinates in 'degrees'.
+        """
+        copy = self.copy()
+        copy.to_degrees_(ignore_warnings)
+        return copy
+
+    def to_radians_(self, ignore_warnings=False):
+        """
+        Converts the coordinates of this trajectory into radians unit, if the unit is 'degrees' and the
+        geo_reference_system is 'latlon'. If the geo_reference_system is 'cartesian', an error is thrown.
+
+        Parameters
+        ----------
+        ignore_warnings : bool
+            If True, no warning is thrown, when the coordinates unit is already 'radians'.
+        """
+        if self.__geo_reference_system != 'latlon':
+            raise ValueError("The coordinates can only be converted if the geo reference system is 'latlon.")
+        if self.__coordinates_unit == 'radians':
+            if not ignore_warnings:
+                warnings.warn("Coordinates unit is already 'radians'.")
+        else:
+            self.x_lon = np.radians(self.x_lon)
+            self.y_lat = np.radians(self.y_lat)
+            self.__coordinates_unit = 'radians'
+
+    def to_radians(self, ignore_warnings=False):
+        """
+        Returns a copy of this trajectory with the coordinates changed into radians unit.
+
+        Parameters
+        ----------
+        ignore_warnings : bool
+            If True, no warning is thrown, when the coordinates unit is already 'radians'.
+
+        Returns
+        -------
+        Trajectory
+            A copy of this trajectory with coordinates in 'radians'.
+        """
+        copy = self.copy()
+        copy.to_radians_(ignore_warnings)
+        return copy
+
+    def scale(self, scale_values):
+        """
+        Scales coordinates from minimum and maximum values indicated by scale_values parameter to [0,1].
+
+        Parameters
+        ----------
+        scale_values : tuple
+            Minimum and maximum values to scale the coordinates with, provided in format
+            (x minimum, x maximum, y minimum, y maximum) for coordinates x and y.
+
+        Returns
+        -------
+        Trajectory
+            This trajectory scaled by scale_values.
+        """
+        x_min, x_max, y_min, y_max = scale_values
+        self.x_lon = (self.x_lon - x_min) / (x_max - x_min)
+        self.y_lat = (self.y_lat - y_min) / (y_max - y_min)
+        return self
+
+    def inverse_scale(self, scale_values):
+        """
+        Scales coordinates from [0,1] to minimum and maximum values indicated by scale_values parameter.
+
+        Parameters
+        ----------
+        scale_values : tuple
+            Minimum and maximum values to scale the coordinates to, provided in format
+            (x minimum, x maximum, y minimum, y maximum) for coordinates x and y.
+
+        Returns
+        -------
+        Trajectory
+            This trajectory scaled to scale_values.
+        """
+        x_min, x_max, y_min, y_max = scale_values
+        self.x_lon = self.x_lon * (x_max - x_min) + x_min
+        self.y_lat = self.y_lat * (y_max - y_min) + y_min
+        return self
+
+    def segment_distances(self):
+        """
+        Returns the distances between consecutive fixes.
+
+        Returns
+        -------
+        numpy.ndarray
+            len(self) - 1 distances, in meters for 'latlon' trajectories and in coordinate units for 'cartesian' ones.
+        """
+        return pv.get_distances(self, mode='consecutive')
+
+    def get_kinematics(self, time_between_route_points=None):
+        """
+        Returns the segment distances, durations, speeds, accelerations and bearings of this trajectory, computed in
+        one vectorized pass, see point_vector.get_kinematics. The durations are taken from the timestamps of the fixes,
+        unless time_between_route_points is given.
+
+        Parameters
+        ----------
+        time_between_route_points : pd.Timedelta, optional
+            A fixed time between consecutive fixes. Required, if the trajectory has no timestamps.
+
+        Returns
+        -------
+        pv.Kinematics
+            A named tuple of numpy arrays with the distances, durations, speeds, accelerations and bearings.
+        """
+        interval = None
+        if time_between_route_points is not None:
+            interval = time_between_route_points.total_seconds()
+        elif self.timestamps is None:
+            if len(self) > 1:
+                raise ValueError("The trajectory has no timestamps, time_between_route_points needs to be given.")
+            interval = 0.0     # there are no segments
+        return pv.get_kinematics(self, self.timestamps, interval)
+
+    def max_speed(self, time_between_route_points=None, percentile=100):
+        """
+        Returns the maximum speed in kilometers per hour when driving this trajectory. The speeds are computed from the
+        timestamps of the fixes or, if time_between_route_points is given, assuming that the time between consecutive
+        fixes is fixed to the indicated value.
+
+        Parameters
+        ----------
+        time_between_route_points : pd.Timedelta, optional
+            The time between consecutive fixes. Required, if the trajectory has no timestamps.
+        percentile : float
+            A percentile of the segment speeds to return instead of the maximum, e.g. 95 to ignore GPS jumps.
+
+        Returns
+        -------
+        maximum_speed_kmh : float
+            The maximum speed in kilometers per hour.
+        """
+        if len(self) < 2:
+            return 0
+        speeds_ms = self.get_kinematics(time_between_route_points).speeds
+        return max(0, pv.get_speed_percentile(speeds_ms, percentile) * 3_600 / 1_000)
+
+    def simplify(self, tolerance, synchronized=False):
+        """
+        Simplifies this trajectory with the Douglas-Peucker algorithm, see simplification.douglas_peucker.
+
+        Parameters
+        ----------
+        tolerance : float
+            The maximal deviation of a dropped fix in meters.
+        synchronized : bool
+            If True, deviations are measured from the position interpolated at the time of the fix, which keeps
+            stays.
+
+        Returns
+        -------
+        Trajectory
+            A trajectory of the kept fixes.
+        """
+        from geoDetection import simplification
+        return simplification.douglas_peucker(self, tolerance, synchronized)
+
+    def resample(self, interval):
+        """
+        Downsamples this trajectory by keeping the first fix of every interval, see simplification.resample.
+
+        Parameters
+        ----------
+        interval : pd.Timedelta
+            The length of the intervals.
+
+        Returns
+        -------
+        Trajectory
+            A trajectory of the kept fixes.
+        """
+        from geoDetection import simplification
+        return simplification.resample(self, interval)
+
+    def collapse_stationary(self, epsilon):
+        """
+        Collapses every group of consecutive fixes within epsilon of its first fix into its first and last fix,
+        see simplification.collapse_stationary. The result can be passed to extract_pois directly.
+
+        Parameters
+        ----------
+        epsilon : float
+            The radius of a group in meters.
+
+        Returns
+        -------
+        Trajectory
+            A trajectory of the kept fixes.
+        """
+        from geoDetection import simplification
+        return simplification.collapse_stationary(self, epsilon)
+
+    def get_average_point(self):
+        """
+        Calculates the average position from all fixes of this trajectory. Timestamps are ignored.
+
+        Returns
+        -------
+        avg_point : Point or None
+            Average position over all fixes or None if the trajectory is empty.
+        """
+        avg_point = None
+        if len(self) > 0:
+            avg_point = Point([float(np.mean(self.x_lon)), float(np.mean(self.y_lat))], self.__geo_reference_system,
+                              self.__coordinates_unit)
+        return avg_point
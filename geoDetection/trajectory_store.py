@@ -0,0 +1,234 @@
+"""Provides an on-disk store for trajectory histories that do not fit into memory. The fixes of all users are kept in
+fixed-width columnar binary files, one per column, which are opened with numpy.memmap. The fixes of a user are stored
+consecutively and sorted by time, so reading a user or a time range of a user only touches the pages holding its
+fixes.
+"""
+import json
+import os
+
+import numpy as np
+
+from geoDetection.lazy_import import LazyModule
+from geoDetection.trajectory import Trajectory
+
+pd = LazyModule('pandas', 'timestamps')
+
+# the column files of a store and their little-endian fixed-width types
+COLUMNS = {'x_lon': '<f8', 'y_lat': '<f8', 'timestamps': '<i8', 'measurement_values': '<f8',
+           'measurement_type_codes': '<i4'}
+INDEX_FILE = 'index.json'
+_FORMAT_VERSION = 1
+
+
+def _to_nanoseconds(timestamp):
+    """
+    Converts a timestamp into nanoseconds since epoch. Timestamps without timezone are taken as UTC, like in
+    Trajectory.
+    """
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tz is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp.value
+
+
+class TrajectoryStore:
+    """A read-only store of the trajectories of many users, kept on disk. A store is a directory holding a binary file
+    per column (see COLUMNS) and an index (index.json), which maps every user to the range of its fixes.
+
+    Trajectories are returned as views: the arrays of a returned Trajectory are slices of the memory-mapped files, so
+    nothing is read before it is used, and only the pages of the selected fixes are read. The views feed extract_pois
+    and the conversions of Trajectory directly, which replace arrays instead of writing into them. The arrays are
+    read-only, writing into them directly requires a deep_copy.
+
+    Stores are created and extended with TrajectoryStore.write. Coordinates are stored in 'latlon' format and
+    'radians' unit.
+    """
+
+    def __init__(self, path):
+        """
+        Opens a store.
+
+        Parameters
+        ----------
+        path : str
+            The directory of the store.
+        """
+        with open(os.path.join(path, INDEX_FILE)) as file:
+            index = json.load(file)
+        if index.get('version') != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported trajectory store version {index.get('version')}.")
+        self.path = path
+        self.length = index['length']
+        self.measurement_type_names = index['measurement_type_names']
+        self._users = {user_id: (start, stop, timezone) for user_id, start, stop, timezone in index['users']}
+        self._columns = {name: self._open_column(name, dtype) for name, dtype in COLUMNS.items()}
+
+    def _open_column(self, name, dtype):
+        """
+        Maps a column file into memory. Bytes behind the indexed fixes, e.g. of an interrupted write, are ignored.
+        """
+        if self.length == 0:
+            # empty files cannot be mapped
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name), dtype=dtype, mode='r', shape=(self.length,))
+
+    @classmethod
+    def write(cls, path, routes, append=False):
+        """
+        Writes the routes of users into a store. Routes are written one at a time, so only one of them needs to be in
+        memory, e.g. when converting from a database cursor.
+
+        Parameters
+        ----------
+        path : str
+            The directory of the store, which is created if necessary.
+        routes : dict or iterable
+            A mapping or an iterable of (user_id, route) pairs, where user_id is a str or int and route is a rt.Route
+            or Trajectory with timestamps. Iterables are consumed lazily.
+        append : bool
+            If True, the users are added to an existing store, which stays readable by stores opened on it before.
+            Else the store is overwritten, which invalidates the views of stores opened on it. Users already in the
+            store cannot be extended.
+
+        Returns
+        -------
+        TrajectoryStore
+            The store opened for reading.
+        """
+        if isinstance(routes, dict):
+            routes = routes.items()
+        os.makedirs(path, exist_ok=True)
+        index_path = os.path.join(path, INDEX_FILE)
+        if append and os.path.exists(index_path):
+            with open(index_path) as file:
+                index = json.load(file)
+            if index.get('version') != _FORMAT_VERSION:
+                raise ValueError(f"Unsupported trajectory store version {index.get('version')}.")
+        else:
+            index = {'version': _FORMAT_VERSION, 'length': 0, 'measurement_type_names': [], 'users': []}
+        user_ids = {user_id for user_id, *_ in index['users']}
+        type_codes = {name: code for code, name in enumerate(index['measurement_type_names'])}
+        files = {}
+        try:
+            for name in COLUMNS:
+                files[name] = open(os.path.join(path, name), 'ab' if append else 'wb')
+                # drop the bytes of an interrupted write, so the columns stay aligned with the index
+                files[name].truncate(index['length'] * np.dtype(COLUMNS[name]).itemsize)
+            for user_id, route in routes:
+                if not isinstance(user_id, (str, int)):
+                    raise ValueError(f"User ids need to be of type str or int, not {type(user_id).__name__}.")
+                if user_id in user_ids:
+                    raise ValueError(f"User {user_id!r} is already in the store.")
+                trajectory = route if isinstance(route, Trajectory) else Trajectory.from_route(route)
+                if len(trajectory) > 0 and not trajectory.has_timestamps():
+                    raise ValueError("Routes need to have timestamps.")
+                if trajectory.get_geo_reference_system() == 'cartesian':
+                    trajectory = trajectory.to_latlon()
+                if trajectory.get_coordinates_unit() == 'degrees':
+                    trajectory = trajectory.to_radians()
+                # measurement types are numbered across the store, missing types (-1) stay missing
+                codes = np.array([type_codes.setdefault(name, len(type_codes))
+                                  for name in trajectory.measurement_type_names] + [-1], dtype=np.int32)
+                columns = {'x_lon': trajectory.x_lon, 'y_lat': trajectory.y_lat,
+                           'timestamps': trajectory.timestamps if len(trajectory) > 0 else np.empty(0, np.int64),
+                           'measurement_values': trajectory.measurement_values,
+                           'measurement_type_codes': codes[trajectory.measurement_type_codes]}
+                for name, dtype in COLUMNS.items():
+                    np.ascontiguousarray(columns[name], dtype=dtype).tofile(files[name])
+                timezone = None if trajectory.timezone is None else str(trajectory.timezone)
+                index['users'].append([user_id, index['length'], index['length'] + len(trajectory), timezone])
+                index['length'] += len(trajectory)
+                user_ids.add(user_id)
+        finally:
+            for file in files.values():
+                file.close()
+            # the index is replaced at once, so readers never see a partially written index
+            index['measurement_type_names'] = list(type_codes)
+            with open(index_path + '.tmp', 'w') as file:
+                json.dump(index, file)
+            os.replace(index_path + '.tmp', index_path)
+        return cls(path)
+
+    def __len__(self):
+        return len(self._users)
+
+    def __contains__(self, user_id):
+        return user_id in self._users
+
+    def __iter__(self):
+        return iter(self._users)
+
+    def get_users(self):
+        """
+        Returns the ids of the users in the store, in the order they were written.
+        """
+        return list(self._users)
+
+    def get_length(self, user_id):
+        """
+        Returns the number of fixes of a user.
+        """
+        start, stop, _ = self._get_user(user_id)
+        return stop - start
+
+    def _get_user(self, user_id):
+        if user_id not in self._users:
+            raise KeyError(f"User {user_id!r} is not in the store.")
+        return self._users[user_id]
+
+    def _view(self, start, stop, timezone):
+        """
+        Returns the fixes start to stop - 1 as a Trajectory sharing the memory-mapped arrays.
+        """
+        columns = {name: column[start:stop].view(np.ndarray) for name, column in self._columns.items()}
+        return Trajectory.from_columns(columns['x_lon'], columns['y_lat'], columns['timestamps'],
+                                       columns['measurement_values'], columns['measurement_type_codes'],
+                                       self.measurement_type_names, timezone=timezone)
+
+    def get(self, user_id, start=None, end=None):
+        """
+        Returns the fixes of a user as a Trajectory view, optionally restricted to a time range. The range is found by
+        binary search on the timestamps, which reads only a few pages.
+
+        Parameters
+        ----------
+        user_id : str or int
+            The user.
+        start : pandas.Timestamp, optional
+            The earliest timestamp of the range (inclusive). Anything pandas.Timestamp accepts, timestamps without
+            timezone are taken as UTC.
+        end : pandas.Timestamp, optional
+            The end of the range (exclusive).
+
+        Returns
+        -------
+        Trajectory
+            A trajectory in 'latlon' format and 'radians' unit, whose arrays are views onto the store.
+        """
+        first, stop, timezone = self._get_user(user_id)
+        timestamps = self._columns['timestamps'][first:stop]
+        low, high = 0, stop - first
+        if start is not None:
+            low = int(np.searchsorted(timestamps, _to_nanoseconds(start)))
+        if end is not None:
+            high = max(low, int(np.searchsorted(timestamps, _to_nanoseconds(end))))
+        return self._view(first + low, first + high, timezone)
+
+    def iter_users(self, start=None, end=None, user_ids=None):
+        """
+        Yields the fixes of users within a time range, e.g. as input to extract_pois_batch.
+
+        Parameters
+        ----------
+        start, end : pandas.Timestamp, optional
+            The time range, see get.
+        user_ids : iterable, optional
+            The users to read. Defaults to all users in the store.
+
+        Yields
+        ------
+        user_id, trajectory : tuple
+            The user and the Trajectory view of its fixes.
+        """
+        for user_id in (self._users if user_ids is None else user_ids):
+            yield user_id, self.get(user_id, start, end)
@@ -0,0 +1,35 @@
+"""Tests that importing the stop detection stays fast, i.e. that its heavy dependencies are imported lazily."""
+import os
+import subprocess
+import sys
+
+# the cumulative import time of geoDetection.stop_detection in microseconds, including numpy: about 0.12 s were
+# measured, importing pandas eagerly would add about 0.3 s
+IMPORT_TIME_BUDGET_US = 250_000
+LAZY_MODULES = ('torch', 'pandas', 'haversine')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import_stop_detection():
+    """
+    Imports geoDetection.stop_detection in a fresh interpreter. Returns the lazy modules it loaded and its cumulative
+    import time in microseconds, as reported by -X importtime.
+    """
+    code = f"import sys, geoDetection.stop_detection; print(*[m for m in {LAZY_MODULES!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    # lines look like 'import time:  self [us] | cumulative | imported package'
+    cumulative = [int(line.split('|')[1]) for line in result.stderr.splitlines()
+                  if line.startswith('import time:') and line.split('|')[-1].strip() == 'geoDetection.stop_detection']
+    return result.stdout.split(), cumulative[0]
+
+
+def test_stop_detection_does_not_import_heavy_dependencies():
+    loaded, _ = _import_stop_detection()
+    assert loaded == []
+
+
+def test_stop_detection_import_time_within_budget():
+    # the best of a few runs, so a busy machine does not fail the test
+    import_time = min(_import_stop_detection()[1] for _ in range(3))
+    assert import_time < IMPORT_TIME_BUDGET_US, f"importing stop_detection took {import_time / 1e6:.3f} s"
@@ -0,0 +1,25 @@
+"""Tests of building PointT objects from validated values."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from geoDetection.point_t import PointT
+
+TIMESTAMP = pd.Timestamp('2021-01-04 08:00', tz='Europe/Berlin')
+
+
+@pytest.mark.parametrize('timestamp', [TIMESTAMP.value, np.int64(TIMESTAMP.value), np.int32(0)])
+def test_from_validated_takes_integer_nanoseconds(timestamp):
+    point = PointT.from_validated(0.1, 0.2, 'latlon', 'radians', timestamp=timestamp, timezone=TIMESTAMP.tz)
+    assert type(point.timestamp_ns) is int
+    assert point.timestamp == pd.Timestamp(int(timestamp), tz=TIMESTAMP.tz)
+
+
+def test_from_validated_takes_timestamps():
+    point = PointT.from_validated(0.1, 0.2, 'latlon', 'radians', timestamp=TIMESTAMP)
+    assert point.timestamp == TIMESTAMP and point.get_timezone() == TIMESTAMP.tz
+
+
+def test_from_validated_requires_timestamp():
+    with pytest.raises(ValueError):
+        PointT.from_validated(0.1, 0.2, 'latlon', 'radians')
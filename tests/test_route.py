@@ -0,0 +1,32 @@
+"""Tests of the vectorized conversions of Route."""
+import pandas as pd
+import pytest
+
+from geoDetection.point import Point
+from geoDetection.point_t import PointT
+from geoDetection.route import Route
+
+TIMESTAMP = pd.Timestamp('2021-01-04 08:00', tz='Europe/Berlin')
+
+
+def _describe(route):
+    return [(type(point), point.x_lon, point.y_lat, point.get_geo_reference_system(), point.get_coordinates_unit(),
+             getattr(point, 'timestamp', None)) for point in route]
+
+
+def _routes():
+    timed = Route([PointT([0.1, 0.2], TIMESTAMP), PointT([0.11, 0.2], TIMESTAMP + pd.Timedelta('1min'))])
+    mixed = Route([PointT([0.1, 0.2], TIMESTAMP), Point([0.1, 0.21])])
+    return {'timed': timed, 'mixed': mixed, 'untimed': Route([Point([0.1, 0.2]), Point([0.1, 0.21])])}
+
+
+@pytest.mark.parametrize('target', ['cartesian', 'degrees'])
+@pytest.mark.parametrize('name', ['timed', 'mixed', 'untimed'])
+def test_copying_conversion_matches_in_place_conversion(name, target):
+    route = _routes()[name]
+    converted = getattr(route, f'to_{target}')()
+    in_place = route.deep_copy()
+    getattr(in_place, f'to_{target}_')()
+    assert _describe(converted) == _describe(in_place)
+    assert converted.has_timestamps() == route.has_timestamps()
+    assert _describe(route) == _describe(_routes()[name])
@@ -0,0 +1,159 @@
+"""Regression tests of the stay extraction against the original point by point implementation of extract_pois."""
+import haversine as hs
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generators import commuting, dense_urban, random_walk
+from geoDetection import point_vector as pv
+from geoDetection import stop_detection as sd
+from geoDetection.detection_stats import DetectionStats
+from geoDetection.trajectory import Trajectory
+
+TIME_THRESHOLD = pd.Timedelta('5min')
+
+
+def reference_stays(trajectory, time_threshold, distance_threshold):
+    """
+    Phase 1 of the original extract_pois: a candidate stay grows while the next point is within distance_threshold of
+    all its points, else it becomes a stay if it lasted time_threshold or loses its first point.
+    """
+    lon, lat = np.degrees(trajectory.x_lon).tolist(), np.degrees(trajectory.y_lat).tolist()
+    timestamps = trajectory.timestamps.tolist()
+    time_threshold = time_threshold.value
+    stays = []
+    start = end = 0
+    while end < len(lon):
+        diameter = max((hs.haversine([lat[end], lon[end]], [lat[j], lon[j]], hs.Unit.METERS)
+                        for j in range(start, end)), default=0)
+        if diameter <= distance_threshold:
+            end += 1
+        elif timestamps[end - 1] - timestamps[start] >= time_threshold:
+            stays.append((start, end))
+            start = end
+        else:
+            start += 1
+    return stays
+
+
+def _describe(points):
+    return [(point.x_lon, point.y_lat, point.timestamp) for point in points]
+
+
+def _wrap(x_lon):
+    return (x_lon + np.pi) % (2 * np.pi) - np.pi
+
+
+def antimeridian_walk(n):
+    # a walk around longitude 0 moved onto the antimeridian
+    trace = random_walk(n, seed=1, origin=(0, -16.5))
+    return Trajectory(_wrap(trace.x_lon + np.pi), trace.y_lat, trace.timestamps)
+
+
+def pole_walk(n):
+    # points within a few hundred meters of the north pole, at all longitudes
+    rng = np.random.default_rng(2)
+    trace = random_walk(n, seed=2)
+    distances = np.abs(np.cumsum(rng.normal(0, 20, n))) % 500
+    return Trajectory(_wrap(rng.uniform(-np.pi, np.pi) + np.cumsum(rng.normal(0, 0.3, n))),
+                      np.pi / 2 - distances / pv.HAVERSINE_EARTH_RADIUS, trace.timestamps)
+
+
+TRACES = {'random_walk': lambda n: random_walk(n, seed=3), 'commuting': lambda n: commuting(n, seed=4, interval=20),
+          'dense_urban': lambda n: dense_urban(n, seed=5), 'antimeridian': antimeridian_walk, 'pole': pole_walk}
+
+
+@pytest.mark.parametrize('distance_method', pv.DISTANCE_METHODS)
+@pytest.mark.parametrize('distance_threshold', [50, 100, 400])
+@pytest.mark.parametrize('trace', list(TRACES))
+def test_extract_stays_matches_reference(trace, distance_threshold, distance_method):
+    trajectory = TRACES[trace](2_000)
+    expected = reference_stays(trajectory, TIME_THRESHOLD, distance_threshold)
+    assert expected, "the trace should contain stays"
+    assert sd.extract_stays(trajectory, TIME_THRESHOLD, distance_threshold, distance_method) == expected
+
+
+def test_extract_stays_of_route_matches_trajectory():
+    trajectory = random_walk(1_000, seed=6)
+    assert sd.extract_stays(trajectory.to_route(), TIME_THRESHOLD, 100) == \
+        sd.extract_stays(trajectory, TIME_THRESHOLD, 100)
+
+
+def test_extract_stays_of_empty_route():
+    assert sd.extract_stays(Trajectory([], [], []), TIME_THRESHOLD, 100) == []
+
+
+def test_extract_pois_batch_isolates_malformed_routes():
+    trajectory = random_walk(1_000, seed=7)
+    results = {user_id: (pois, error) for user_id, pois, error in
+               sd.extract_pois_batch({'valid': trajectory, 'malformed': [1, 2]}, TIME_THRESHOLD, 100, max_workers=1)}
+    assert len(results['valid'][0]) == len(sd.extract_pois(trajectory, TIME_THRESHOLD, 100))
+    assert results['valid'][1] is None
+    assert results['malformed'][0] is None and results['malformed'][1] is not None
+
+
+def test_stop_detector_rejects_out_of_order_fix_after_flush():
+    trajectory = random_walk(1_000, seed=8)
+    detector = sd.StopDetector(TIME_THRESHOLD, 100)
+    detector.update_batch(trajectory[:500])
+    detector.flush()
+    with pytest.raises(ValueError):
+        detector.update_batch(trajectory[498:499])
+
+
+def test_stop_detector_checkpoint_resumes_the_feed():
+    trajectory = random_walk(2_000, seed=9)
+    half = len(trajectory) // 2
+    detector = sd.StopDetector(TIME_THRESHOLD, 100)
+    stays = detector.update_batch(trajectory[:half])
+    assert len(detector.get_candidate_stay()) > 1, "the checkpoint should carry a candidate stay"
+    restored = sd.StopDetector.from_state(detector.get_state())
+    assert restored.get_state() == detector.get_state()
+    with pytest.raises(ValueError):
+        restored.update_batch(trajectory[half - 2:half - 1])
+    stays += restored.update_batch(trajectory[half:])
+    expected = sd.StopDetector(TIME_THRESHOLD, 100).update_batch(trajectory)
+    assert len(expected) == len(sd.extract_stays(trajectory, TIME_THRESHOLD, 100)) > 1
+    assert _describe(stays) == _describe(expected)
+
+
+def _tuple_chunks(trajectory, size):
+    for start in range(0, len(trajectory), size):
+        stop = start + size
+        yield trajectory.x_lon[start:stop], trajectory.y_lat[start:stop], trajectory.timestamps[start:stop]
+
+
+CHUNKINGS = {'1h': lambda trajectory: sd.iter_time_chunks(trajectory, pd.Timedelta('1h')),
+             '1D': lambda trajectory: sd.iter_time_chunks(trajectory, pd.Timedelta('1D')),
+             'tuples': lambda trajectory: _tuple_chunks(trajectory, 777)}
+
+
+@pytest.mark.parametrize('chunking', list(CHUNKINGS))
+@pytest.mark.parametrize('distance_threshold', [100, 400])
+@pytest.mark.parametrize('trace', ['random_walk', 'commuting', 'dense_urban'])
+def test_extract_pois_chunked_matches_extract_pois(trace, distance_threshold, chunking):
+    trajectory = TRACES[trace](10_000)
+    expected = sd.extract_pois(trajectory, TIME_THRESHOLD, distance_threshold)
+    assert expected, "the trace should contain POIs"
+    pois = sd.extract_pois_chunked(CHUNKINGS[chunking](trajectory), TIME_THRESHOLD, distance_threshold)
+    assert _describe(pois) == _describe(expected)
+
+
+def test_extract_pois_chunked_reports_the_counters_of_extract_pois():
+    trajectory = commuting(10_000, seed=10)
+    stats, chunked_stats = DetectionStats(), DetectionStats()
+    sd.extract_pois(trajectory, TIME_THRESHOLD, 100, stats=stats)
+    sd.extract_pois_chunked(sd.iter_time_chunks(trajectory, pd.Timedelta('1D')), TIME_THRESHOLD, 100,
+                            stats=chunked_stats)
+    assert chunked_stats.counters == stats.counters
+
+
+def test_stop_detector_checkpoint_keeps_the_counters():
+    trajectory = random_walk(2_000, seed=11)
+    detector = sd.StopDetector(TIME_THRESHOLD, 100)
+    detector.update_batch(trajectory[:1_000])
+    restored = sd.StopDetector.from_state(detector.get_state())
+    for feed in (detector, restored):
+        feed.update_batch(trajectory[1_000:])
+    assert restored.get_counts() == detector.get_counts()
+    assert detector.get_counts()['points'] == len(trajectory)
@@ -0,0 +1,44 @@
+"""Tests of the visit statistics of POIs."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generators import commuting
+from geoDetection import stop_detection as sd
+from geoDetection.route import Route
+from geoDetection.stop_frequency import VisitFrequency, assign_stays, get_stay_arrays
+
+TIME_THRESHOLD = pd.Timedelta('30min')
+
+
+@pytest.fixture(scope='module')
+def history():
+    trajectory = commuting(20_000, seed=1)
+    stays = sd.extract_stays(trajectory, TIME_THRESHOLD, 200)
+    pois = sd.extract_pois(trajectory, TIME_THRESHOLD, 200)
+    return trajectory, stays, Route(pois)
+
+
+@pytest.mark.parametrize('as_array', [False, True])
+def test_from_stays_counts_a_single_poi_once(history, as_array):
+    trajectory, stays, pois = history
+    poi = pois[0]
+    single = np.array([poi.x_lon, poi.y_lat]) if as_array else Route([poi])
+    frequency = VisitFrequency.from_stays(trajectory, stays, single, 200)
+    assert frequency.n_pois == 1
+    assert frequency.get_hour_of_week_histograms().shape[0] == 1
+    assert frequency.get_visit_counts()[0] == VisitFrequency.from_stays(trajectory, stays, pois, 200) \
+        .get_visit_counts()[0]
+    assert len(frequency.to_dataframe()) == 1
+
+
+def test_from_stays_without_pois(history):
+    trajectory, stays, _ = history
+    x_lon, y_lat, _, _ = get_stay_arrays(trajectory, stays)
+    labels, distances = assign_stays(x_lon, y_lat, np.empty((0, 2)), 200)
+    assert len(labels) == len(stays) > 0
+    assert np.all(labels == -1) and np.all(np.isnan(distances))
+    frequency = VisitFrequency.from_stays(trajectory, stays, np.empty((0, 2)), 200)
+    assert frequency.n_pois == 0 and len(frequency.labels) == 0
+    assert len(frequency.get_visit_counts()) == 0
+    assert len(frequency.to_dataframe()) == 0
@@ -0,0 +1,28 @@
+"""Tests of reading trajectories back from a TrajectoryStore."""
+import numpy as np
+import pandas as pd
+
+from benchmarks.generators import random_walk
+from geoDetection.trajectory import Trajectory
+from geoDetection.trajectory_store import TrajectoryStore
+
+
+def test_store_returns_views_equal_to_the_written_trajectories(tmp_path):
+    first = random_walk(1_000, seed=1)
+    second = Trajectory(first.x_lon[:10], first.y_lat[:10], first.timestamps[:10], measurement_values=np.arange(10),
+                        measurement_types=['speed'] * 5 + [None] * 5, timezone='Europe/Berlin')
+    store = TrajectoryStore.write(str(tmp_path), {'first': first, 'second': second})
+    view = store.get('first')
+    assert isinstance(view, Trajectory) and not view.x_lon.flags.writeable
+    np.testing.assert_array_equal(view.x_lon, first.x_lon)
+    np.testing.assert_array_equal(view.timestamps, first.timestamps)
+    view = store.get('second')
+    assert view.get_point(0).timestamp == second.get_point(0).timestamp
+    assert [view.get_measurement(idx) for idx in (0, 9)] == [second.get_measurement(idx) for idx in (0, 9)]
+
+
+def test_store_reads_time_ranges(tmp_path):
+    trajectory = random_walk(1_000, seed=2)
+    store = TrajectoryStore.write(str(tmp_path), {'user': trajectory})
+    start, end = pd.Timestamp(trajectory.timestamps[100]), pd.Timestamp(trajectory.timestamps[200])
+    np.testing.assert_array_equal(store.get('user', start, end).timestamps, trajectory.timestamps[100:200])